@@ -1,28 +1,40 @@
 import numpy as np
 
-def boustrophedon(grid, dir1, dir2):
+def boustrophedon(grid, dir1, dir2, query='tour'):
     """
     This function plans an observation tour over a specified grid, creating a
     path that covers the area in alternating rows/columns, according to a
-    specified input direction.
+    specified input direction. The grid is handled as a masked cell array:
+    the rows (or columns) are ordered and alternately reversed by slicing,
+    and the resulting sequence is compressed with the occupancy mask.
 
     Programmers:  Paula Betriu (UPC/ESEIAAT)
     Date:         09/2022
 
-    Usage:        tour = boustrophedon(grid, dir1, dir2)
+    Usage:        tour, tourind = boustrophedon(grid, dir1, dir2)
+                  dir1, dir2 = boustrophedon(grid, dir1, dir2, 'bearing')
 
     Inputs:
       > grid:        2D list where each cell contains the coordinates of
                      an observation point or is empty if there is no point.
+                     It can also be input as a (R, C, 2) numpy.ndarray, where
+                     empty cells are NaN
       > dir1:        primary direction of the sweep ('north', 'south', 'east', 'west').
       > dir2:        secondary direction of the sweep. This defines if the
                      traversal is going to be performed either in
                      alternating rows or columns.
+      > query:       string 'tour' (default) or 'bearing'. If 'bearing', the
+                     function returns the sweeping directions at the first
+                     observation point of the tour, i.e., the secondary
+                     direction is updated according to the row (or column)
+                     where the tour starts
 
     Outputs:
-      > tour:        ordered list of points representing the planned
-                     tour. Each element is a 2-element numpy.array indicating
-                     a point on the grid to be observed.
+      > tour:        (K, 2) numpy.ndarray with the ordered points
+                     representing the planned tour. Each row indicates a
+                     point on the grid to be observed.
+      > tourind:     (K, 2) numpy.ndarray of int with the [row, column]
+                     index of each tour point in the grid
     """
 
     # Previous check...
@@ -33,75 +45,80 @@ def boustrophedon(grid, dir1, dir2):
         if dir2 not in ['north', 'south']:
             raise ValueError("Sweeping direction is not well defined")
 
-    # Pre-allocate variables
-    tour = []
-
-    # Particular case: len(grid) == 1
-
-    if len(grid) == 1 and len(grid[0]) == 1:
-        tour=grid[0]
+    # Masked cell array: coordinates of the observation points and occupancy
+    # mask of the grid
+    cells, mask = gridcells(grid)
+    rowind, colind = np.indices(mask.shape)
 
     sweep = dir2 in ['east', 'south']
 
     # Plan tour over the grid discretization
     # The origin of the coverage path depends on the spacecraft ground track position
     if dir1 in ['north', 'south']:  # Horizontal sweep
-        if sweep:
-            bearing = True #left -> right
-        else:
-            bearing = False #right -> left
-
-        tour = [[] for _ in range(np.count_nonzero([item is not None for row in grid for item in row]))] #list of planned observations
-        ii = 0
-        for i in range(len(grid)):
-            #Sweep across latitude
-            if dir1 == 'south':
-                irow = i
-            else:
-                irow = len(grid) - i - 1
-
-            for j in range(len(grid[0])):
-                if not bearing:
-                    icol = len(grid[0]) - j - 1
-                else:
-                    icol = j
-
-                if grid[irow][icol] is not None:
-                    x, y = grid[irow][icol][0], grid[irow][icol][1]
-                    tour[ii] = np.array([x, y])#Save it in the coverage tour
-                    ii += 1
-
-            bearing = not bearing  # Switch coverage direction after each row sweeping, i.e. left (highest lon) to right
-            # (lowest lon) or vice versa
-
+        # Sweep across latitude: each row is a sweeping line
+        lines = [rowind, colind, mask]
+        if dir1 == 'north':
+            lines = [line[::-1] for line in lines]
     elif dir1 in ['east', 'west']:  # Vertical sweep
-        if sweep:
-            bearing = True # top -> down
+        # Sweep across longitude: each column is a sweeping line
+        lines = [rowind.T, colind.T, mask.T]
+        if dir1 == 'west':
+            lines = [line[::-1] for line in lines]
+    else:
+        lines = [np.zeros((0, 0), dtype=int), np.zeros((0, 0), dtype=int), np.zeros((0, 0), dtype=bool)]
+    lines = [line.copy() for line in lines]
+
+    if query == 'bearing':
+        # The coverage direction switches after each line, whether it is empty
+        # or not. Find the first line with an observation point
+        occupied = lines[2].any(axis=1)
+        nflips = np.argmax(occupied) if occupied.any() else len(occupied)
+        bearing = sweep != (nflips % 2 == 1)
+
+        # Adjust direction after sweeping
+        currdir2 = dir2
+        if bearing:
+            if dir2 == 'west':
+                currdir2 = 'east'
+            elif dir2 == 'north':
+                currdir2 = 'south'
         else:
-            bearing = False # down -> top
+            if dir2 == 'east':
+                currdir2 = 'west'
+            elif dir2 == 'south':
+                currdir2 = 'north'
+        return dir1, currdir2
 
-        tour = [[] for _ in range(np.count_nonzero([item is not None for row in grid for item in row]))] #list of planned observations
-        ii = 0
-        if grid != []:
-            for i in range(len(grid[0])):
-                if dir1 == 'west':
-                    icol = len(grid[0]) - i - 1
-                else:
-                    icol = i
+    # Switch coverage direction after each line, i.e., left -> right and right
+    # -> left (rows) or top -> down and down -> top (columns)
+    flip = slice(1, None, 2) if sweep else slice(0, None, 2)
+    for line in lines:
+        line[flip] = line[flip, ::-1]
 
-                for j in range(len(grid)):
-                    if bearing:
-                        irow = j
-                    else:
-                        irow = len(grid) - j - 1
+    # Compress the sweeping sequence with the occupancy mask
+    irow, icol, occupied = lines
+    tourind = np.column_stack((irow[occupied], icol[occupied])).astype(int)
+    tour = cells[tourind[:, 0], tourind[:, 1]]
 
-                    if grid[irow][icol] is not None:
-                        x, y = grid[irow][icol][0], grid[irow][icol][1]
-                        tour[ii] = np.array([x, y])
-                        ii += 1
+    return tour, tourind
 
-                bearing = not bearing  # Switch coverage direction after each column sweeping, i.e. up (highest lat) to down
-                # (lowest lat) or vice versa
-
-    return tour
 
+def gridcells(grid):
+    """
+    Masked cell array of a grid: (R, C, 2) array with the coordinates of the
+    observation points (NaN where the cell is empty) and (R, C) boolean
+    occupancy mask
+    """
+    if isinstance(grid, np.ndarray):
+        cells = np.array(grid, dtype=float).reshape(np.shape(grid)[0], -1, 2)
+    else:
+        nrows = len(grid)
+        ncols = len(grid[0]) if nrows > 0 else 0
+        mask = np.array([[item is not None for item in row] for row in grid], dtype=bool).reshape(nrows, ncols)
+        cells = np.full((nrows, ncols, 2), np.nan)
+        if mask.any():
+            cells[mask] = np.array([np.reshape(item, 2) for row in grid for item in row if item is not None],
+                                   dtype=float)
+    mask = ~np.isnan(cells).any(axis=2)
+
+    return cells, mask
@@ -0,0 +1,348 @@
+import math
+
+import numpy as np
+import shapely
+from shapely.geometry import MultiPolygon, box
+from shapely.geometry.polygon import orient
+
+
+class coverageRaster:
+    """
+    Raster representation of a region of interest in the instrument focal
+    plane, used to evaluate the fraction of a rectangular tile (footprint)
+    that is covered by the region in O(1). The polygon is rasterized once and
+    a summed-area table is built from it. Pixels crossed by the polygon
+    boundary store their exact covered fraction, so the only error source is
+    the distribution of area within the boundary pixels that straddle the
+    tile edges. This error is bounded tile by tile, which allows the caller
+    to fall back to the exact polygon computation whenever a keep/discard
+    decision is ambiguous.
+
+    The raster is sparse: it is split into blocks of blocksize x blocksize
+    pixels, and the blocks that are not crossed by the polygon boundary,
+    which are either fully covered or empty, are stored as a single value.
+    Only the boundary blocks keep their pixels, as two (blocksize + 1)^2
+    summed-area tables (of the pixel coverage and of the boundary pixels),
+    i.e., about 12 bytes per pixel. The memory thus grows linearly with the
+    ROI perimeter measured in footprints, instead of quadratically with its
+    extent, and the resolution (32 pixels per footprint side by default)
+    does not need to be coarsened for large ROIs, which would widen the
+    error bounds and make most decisions fall back to the exact computation.
+
+    Usage:        raster = coverageRaster(polygon, w, h, res)
+                  fraction, bound = raster.fraction(centers)
+
+    Inputs:
+      > polygon:      shapely Polygon or MultiPolygon of the region of
+                      interest, in the instrument focal plane
+      > w:            tile (footprint) width. Units are irrelevant as long
+                      as they are consistent with the polygon
+      > h:            tile (footprint) height
+      > res:          accuracy knob: number of raster pixels per side of the
+                      footprint (the pixel size is min(w, h)/res). It is set
+                      to 'auto' (32 pixels) by default
+
+    Attributes:
+      > polygon:      input polygon
+      > pxsize:       raster pixel size
+      > npixels:      number of stored pixels (those of the boundary blocks)
+      > maxerror:     worst-case error of a tile coverage fraction for the
+                      chosen resolution, in fraction of the tile area. A
+                      boundary pixel that overlaps a fraction o of its area
+                      with the tile contributes at most o*(1 - o) <= 1/4
+                      pixel areas, and at most 2*(w/pxsize + h/pxsize + 4)
+                      pixels straddle the tile edges. The worst case is only
+                      reached when the region boundary runs along the tile
+                      edges; the bound of every tile (see fraction) is
+                      usually much smaller, and is the one that decides the
+                      fallbacks to the exact computation
+    """
+
+    blocksize = 16  # pixels per side of the raster blocks
+
+    def __init__(self, polygon, w, h, res='auto'):
+        self.polygon = polygon
+        self.w = w
+        self.h = h
+
+        if isinstance(res, str) and res == 'auto':
+            res = 32
+        elif isinstance(res, str):
+            raise ValueError("Raster resolution is not well defined")
+        self.pxsize = min(w, h) / res
+        px, B = self.pxsize, self.blocksize
+        self.maxerror = (2 * (np.ceil(w / px) + 1) + 2 * (np.ceil(h / px) + 1)) / 4 * px ** 2 / (w * h)
+
+        # Raster extent: polygon bounds padded by one footprint, so that tiles
+        # partially outside the region are queried within the raster
+        minx, miny, maxx, maxy = polygon.bounds if not polygon.is_empty else (0., 0., 0., 0.)
+        pad = max(w, h) + px
+        self.x0, self.y0 = minx - pad, miny - pad
+        self.nbx = int(np.ceil((maxx - minx + 2 * pad) / px / B))
+        self.nby = int(np.ceil((maxy - miny + 2 * pad) / px / B))
+        self.nx, self.ny = self.nbx * B, self.nby * B
+
+        # Rasterization: block values, and pixels of the boundary blocks. Pixels
+        # that are only touched by the boundary carry no error
+        self.value, self.slot, pixels, boundary = rasterize(polygon, self.x0, self.y0, px, self.nbx, self.nby, B)
+        boundary &= (pixels > 0) & (pixels < 1)
+        self.npixels = (len(pixels) - 1) * B ** 2
+
+        # Summed-area tables of the boundary blocks (the first one, of the
+        # blocks without pixels, is empty)
+        self.sat = np.zeros((len(pixels), B + 1, B + 1))
+        self.sat[:, 1:, 1:] = np.cumsum(np.cumsum(pixels, axis=1), axis=2)
+        self.bsat = np.zeros((len(pixels), B + 1, B + 1), dtype=np.int32)
+        self.bsat[:, 1:, 1:] = np.cumsum(np.cumsum(boundary, axis=1), axis=2)
+
+        # Blocks spanned by a tile in each direction
+        self.span = [int(np.ceil(w / px / B)) + 1, int(np.ceil(h / px / B)) + 1]
+
+        # Round-off margin of the error bounds: the window sums are differences
+        # of summed-area table values, whose magnitude grows with the blocks
+        self.roundoff = 64 * np.finfo(float).eps * self.span[0] * self.span[1] * (B ** 2 + 1) * px ** 2 / (w * h)
+
+    def fraction(self, centers):
+        """
+        Coverage fraction of the tiles centered at the input points, i.e.,
+        the area of the region of interest inside each tile divided by the
+        tile area, together with an upper bound of its error
+
+        Usage:        fraction, bound = raster.fraction(centers)
+
+        Inputs:
+          > centers:      [x, y] center of the tile, or (N, 2) array of
+                          tile centers
+
+        Outputs:
+          > fraction:     coverage fraction of the tile(s). Scalar if a
+                          single center is input, (N,) array otherwise
+          > bound:        upper bound of the absolute error of 'fraction'
+        """
+        centers = np.asarray(centers, dtype=float)
+        B = self.blocksize
+        tarea = self.w * self.h / self.pxsize ** 2  # tile area in pixel units
+        du, dv = self.w / 2 / self.pxsize, self.h / 2 / self.pxsize
+        if centers.ndim == 1:
+            # Single tile: the same computation with scalars, which avoids the
+            # array overhead in sequential queries
+            u = (float(centers[0]) - self.x0) / self.pxsize
+            v = (float(centers[1]) - self.y0) / self.pxsize
+            ua, ub = min(max(u - du, 0), self.nx), min(max(u + du, 0), self.nx)
+            va, vb = min(max(v - dv, 0), self.ny), min(max(v + dv, 0), self.ny)
+            fraction = bound = 0.
+            for bj in range(min(int(va // B), self.nby - 1), min(int(vb // B), self.nby - 1) + 1):
+                wa, wb = min(max(va - bj * B, 0), B), min(max(vb - bj * B, 0), B)
+                for bi in range(min(int(ua // B), self.nbx - 1), min(int(ub // B), self.nbx - 1) + 1):
+                    la, lb = min(max(ua - bi * B, 0), B), min(max(ub - bi * B, 0), B)
+                    fraction += self.value.item(bj, bi) * (lb - la) * (wb - wa)
+                    k = self.slot.item(bj, bi)
+                    if k:
+                        total, partial = blocksum(self.sat, self.bsat, k, la, lb, wa, wb)
+                        fraction += total
+                        bound += partial
+            bound = max(bound / tarea, 0.) * (1 + 1e-9) + self.roundoff
+            return float(fraction / tarea), float(bound)
+
+        # Window limits in continuous pixel coordinates (clipped to the
+        # raster, outside of which the region is empty)
+        u = (centers[:, 0] - self.x0) / self.pxsize
+        v = (centers[:, 1] - self.y0) / self.pxsize
+        ua, ub = np.minimum(np.maximum(u - du, 0), self.nx), np.minimum(np.maximum(u + du, 0), self.nx)
+        va, vb = np.minimum(np.maximum(v - dv, 0), self.ny), np.minimum(np.maximum(v + dv, 0), self.ny)
+
+        # Sum over the blocks spanned by the windows: uniform blocks contribute
+        # their value times the overlap area, and boundary blocks the window
+        # sum of their pixels. Blocks beyond the window get an empty overlap
+        fraction, bound = np.zeros(len(centers)), np.zeros(len(centers))
+        bi0 = np.minimum(ua // B, self.nbx - 1).astype(int)
+        bj0 = np.minimum(va // B, self.nby - 1).astype(int)
+        for dj in range(self.span[1]):
+            bj = bj0 + dj
+            wa, wb = np.clip(va - bj * B, 0, B), np.clip(vb - bj * B, 0, B)
+            bj = np.minimum(bj, self.nby - 1)
+            for di in range(self.span[0]):
+                bi = bi0 + di
+                la, lb = np.clip(ua - bi * B, 0, B), np.clip(ub - bi * B, 0, B)
+                bi = np.minimum(bi, self.nbx - 1)
+                fraction += self.value[bj, bi] * (lb - la) * (wb - wa)
+                k = self.slot[bj, bi]
+                ind = np.nonzero(k)[0]
+                total, partial = blocksum(self.sat, self.bsat, k[ind], la[ind], lb[ind], wa[ind], wb[ind])
+                fraction[ind] += total
+                bound[ind] += partial
+
+        # Error bound: boundary pixels that partially overlap the window (see
+        # blocksum)
+        bound = np.maximum(bound / tarea, 0.) * (1 + 1e-9) + self.roundoff  # round-off margin
+
+        return fraction / tarea, bound
+
+    def exact(self, center):
+        """
+        Exact coverage fraction of the tile centered at the input point,
+        computed with polygon operations
+
+        Usage:        fraction = raster.exact(center)
+        """
+        fpshape = box(center[0] - self.w / 2, center[1] - self.h / 2, center[0] + self.w / 2,
+                      center[1] + self.h / 2)
+        areaI = (self.polygon.difference(fpshape)).buffer(0).area
+        return abs(self.polygon.area - areaI) / fpshape.area
+
+    @staticmethod
+    def resolution(coverage):
+        """
+        Raster resolution (pixels per footprint side, or 'auto') of a
+        coverage mode. Returns None if the coverage mode is 'exact'
+
+        Usage:        res = coverageRaster.resolution(coverage)
+
+        Inputs:
+          > coverage:     string 'exact' or 'raster' (raster mode with the
+                          'auto' resolution), or number of raster pixels per
+                          footprint side (raster mode)
+        """
+        if coverage is None or (isinstance(coverage, str) and coverage == 'exact'):
+            return None
+        elif isinstance(coverage, str) and coverage == 'raster':
+            return 'auto'
+        elif isinstance(coverage, str):
+            raise ValueError("Coverage mode is not well defined")
+        return int(coverage)
+
+
+def rasterize(polygon, x0, y0, px, nbx, nby, B):
+    """
+    Exact area coverage of a polygon over a raster of (nby, nbx) blocks of
+    (B, B) pixels of size px, with origin [x0, y0]. Returns the value of
+    the blocks that are not crossed by the polygon boundary (0 or 1), the
+    slot of the boundary blocks (0 for the other ones), and the covered
+    fraction of each pixel and the mask of the pixels crossed by the
+    polygon boundary, of every slot (the first one is empty)
+    """
+    nx = nbx * B
+    value = np.zeros((nby, nbx))
+    slot = np.zeros((nby, nbx), dtype=int)
+    if polygon.is_empty:
+        return value, slot, np.zeros((1, B, B)), np.zeros((1, B, B), dtype=bool)
+
+    # Polygon rings (exterior counterclockwise, interiors clockwise), in
+    # pixel units
+    parts = polygon.geoms if isinstance(polygon, MultiPolygon) else [polygon]
+    rings = []
+    for part in parts:
+        part = orient(part, 1.0)
+        rings += [np.array(part.exterior.coords)] + [np.array(ring.coords) for ring in part.interiors]
+    edges = np.vstack([np.column_stack((ring[:-1], ring[1:])) for ring in rings])
+    u0, v0 = (edges[:, 0] - x0) / px, (edges[:, 1] - y0) / px
+    u1, v1 = (edges[:, 2] - x0) / px, (edges[:, 3] - y0) / px
+
+    # Split the edges at the pixel lines: parameters of the crossings with
+    # the vertical and horizontal lines
+    t = [np.zeros(len(edges)), np.ones(len(edges))]
+    eid = [np.arange(len(edges)), np.arange(len(edges))]
+    for a, b in [(u0, u1), (v0, v1)]:
+        kmin = np.floor(np.minimum(a, b)) + 1
+        count = np.maximum(np.ceil(np.maximum(a, b)) - kmin, 0).astype(int)
+        ind = np.repeat(np.arange(len(edges)), count)
+        k = np.repeat(kmin, count) + np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+        t.append((k - a[ind]) / (b[ind] - a[ind]))
+        eid.append(ind)
+    t, eid = np.concatenate(t), np.concatenate(eid)
+    order = np.lexsort((t, eid))
+    t, eid = t[order], eid[order]
+
+    # Sub-segments (each one within a single pixel)
+    same = eid[1:] == eid[:-1]
+    ta, tb, ind = t[:-1][same], t[1:][same], eid[:-1][same]
+    ua, ub = u0[ind] + ta * (u1[ind] - u0[ind]), u0[ind] + tb * (u1[ind] - u0[ind])
+    va, vb = v0[ind] + ta * (v1[ind] - v0[ind]), v0[ind] + tb * (v1[ind] - v0[ind])
+    icol = np.clip(np.floor((ua + ub) / 2).astype(int), 0, nx - 1)
+    irow = np.clip(np.floor((va + vb) / 2).astype(int), 0, nby * B - 1)
+
+    # Boundary blocks: the ones that contain sub-segments
+    blocks = np.unique(irow // B * nbx + icol // B)
+    slot.flat[blocks] = np.arange(1, len(blocks) + 1)
+
+    # Signed area to the right of each sub-segment within its pixel row: the
+    # fraction inside its own pixel, and the full height to the next ones.
+    # The coverage of a pixel is the sum of the areas of the sub-segments to
+    # its left in the same row, which is accumulated within each boundary
+    # block, starting from the sum of the ones to the left of the block
+    dv = va - vb
+    xm = (ua + ub) / 2 - icol
+    key = irow * nx + icol  # row-major pixel index
+    order = np.argsort(key, kind='stable')
+    key, cumdv = key[order], np.concatenate(([0.], np.cumsum(dv[order])))
+
+    def carry(rows, cols):
+        # Sum of the areas of the sub-segments of the rows, left of the columns
+        return cumdv[np.searchsorted(key, rows * nx + cols)] - cumdv[np.searchsorted(key, rows * nx)]
+
+    # Blocks without sub-segments are either fully covered or empty
+    rows, cols = np.meshgrid(np.arange(nby) * B, np.arange(nbx) * B, indexing='ij')
+    value[:] = np.round(np.clip(carry(rows, cols), 0., 1.))
+    value[slot > 0] = 0.
+
+    k, r, c = slot[irow // B, icol // B], irow % B, icol % B
+    pixels = np.zeros((len(blocks) + 1, B, B + 1))
+    np.add.at(pixels, (k, r, c), dv * (1 - xm))
+    np.add.at(pixels, (k, r, c + 1), dv * xm)
+    bj, bi = np.divmod(blocks, nbx)
+    pixels[1:, :, 0] += carry(bj[:, None] * B + np.arange(B), bi[:, None] * B)
+    pixels = np.clip(np.cumsum(pixels, axis=2)[:, :, :-1], 0., 1.)
+    touched = np.zeros((len(blocks) + 1, B, B), dtype=bool)
+    touched[k, r, c] = True
+
+    return value, slot, pixels, touched
+
+
+def blocksum(sat, bsat, k, ua, ub, va, vb):
+    """
+    Integral of the raster blocks of slots k over the windows [ua, ub] x
+    [va, vb] (continuous pixel coordinates within the blocks), and number
+    of boundary pixels that partially overlap the windows (the ones that
+    are completely inside the windows are exactly accounted for)
+    """
+    if not isinstance(ua, np.ndarray):
+        # Single window: scalar computation on the tables of its block
+        sat, bsat, k = sat[k], bsat[k], ()
+        ia, ib = math.ceil(ua), math.floor(ub)
+        ja, jb = math.ceil(va), math.floor(vb)
+        ib, jb = max(ib, ia), max(jb, ja)
+        inner = bsat.item(jb, ib) - bsat.item(ja, ib) - bsat.item(jb, ia) + bsat.item(ja, ia)
+        return windowsum(sat, k, ua, ub, va, vb), windowsum(bsat, k, ua, ub, va, vb) - inner
+    k = (k,)
+    ia, ib = np.ceil(ua).astype(int), np.floor(ub).astype(int)
+    ja, jb = np.ceil(va).astype(int), np.floor(vb).astype(int)
+    ib, jb = np.maximum(ib, ia), np.maximum(jb, ja)
+    inner = bsat[k + (jb, ib)] - bsat[k + (ja, ib)] - bsat[k + (jb, ia)] + bsat[k + (ja, ia)]
+    return windowsum(sat, k, ua, ub, va, vb), windowsum(bsat, k, ua, ub, va, vb) - inner
+
+
+def windowsum(sat, k, ua, ub, va, vb):
+    """
+    Integral of the raster blocks of slots k over the windows [ua, ub] x
+    [va, vb] (continuous pixel coordinates within the blocks), from their
+    summed-area tables. The summed-area table of a piecewise-constant
+    raster is bilinear within each pixel, so the bilinear interpolation of
+    its nodes is exact. For a single window, sat is the table of its block
+    and k is empty
+    """
+    return satinterp(sat, k, ub, vb) - satinterp(sat, k, ua, vb) - satinterp(sat, k, ub, va) + \
+        satinterp(sat, k, ua, va)
+
+
+def satinterp(sat, k, u, v):
+    n = sat.shape[-1] - 1
+    if not isinstance(u, np.ndarray):
+        i, j = min(math.floor(u), n - 1), min(math.floor(v), n - 1)
+        fu, fv = u - i, v - j
+        return (1 - fu) * (1 - fv) * sat.item(j, i) + fu * (1 - fv) * sat.item(j, i + 1) + \
+            (1 - fu) * fv * sat.item(j + 1, i) + fu * fv * sat.item(j + 1, i + 1)
+    i = np.minimum(np.floor(u).astype(int), n - 1)
+    j = np.minimum(np.floor(v).astype(int), n - 1)
+    fu, fv = u - i, v - j
+    return (1 - fu) * (1 - fv) * sat[k + (j, i)] + fu * (1 - fv) * sat[k + (j, i + 1)] + \
+        (1 - fu) * fv * sat[k + (j + 1, i)] + fu * fv * sat[k + (j + 1, i + 1)]
@@ -1,11 +1,13 @@
 import copy
 
 import numpy as np
+import shapely
 from shapely.geometry import MultiPolygon, Polygon, Point
 
 
 
-def floodFillAlgorithm(w, h, olapx, olapy, gamma, targetArea, perimeterArea, gridPoints_, vPoints_, method):
+def floodFillAlgorithm(w, h, olapx, olapy, gamma, targetArea, perimeterArea, gridPoints_, vPoints_, method,
+                       rasters=None):
     """
     Flood-fill recursive algorithm that discretizes the target area by
     "flooding" the region with 2D rectangular elements. The grid is determined
@@ -15,7 +17,7 @@ def floodFillAlgorithm(w, h, olapx, olapy, gamma, targetArea, perimeterArea, gri
     Date:        10/2022
 
     Usage:        gridPoints,vPoints = floodFillAlgorithm(w,h,ovlapx,ovlapy,gamma,targetArea,
-                                                          gridPoints,method)
+                                                          gridPoints,method,rasters)
 
     Inputs:
         - w:            horizontal resolution. Units are irrelevant as long as they are consistent.
@@ -39,6 +41,13 @@ def floodFillAlgorithm(w, h, olapx, olapy, gamma, targetArea, perimeterArea, gri
         - method:       string name of the method. '4fill' fills the roi by
                         searching the cardinal directions.'8fill' considers
                         also the diagonal neighbors.
+        - rasters:      (optional) dict with the coverageRaster objects of
+                        the target area ('target') and the perimeter area
+                        ('perimeter'). If provided, the tile coverage
+                        fractions are evaluated from the rasters, and the
+                        exact polygon operations are only performed when the
+                        raster error bound does not allow to decide on the
+                        tile. Default: None (exact evaluation)
 
 
     Returns:
@@ -83,66 +92,87 @@ def floodFillAlgorithm(w, h, olapx, olapy, gamma, targetArea, perimeterArea, gri
     fpy = [gamma[1] + h / 2, gamma[1] - h / 2, gamma[1] - h / 2, gamma[1] + h / 2]
 
 
-    # Subtract the allocated cell (footprint) from the perimeterArea
-    if (np.isnan(perimeterArea[:, 0])).any():
-        nanindex = np.where(np.isnan(perimeterArea[:, 0]))[0]
-        polygon_list = []
-        for i in range(len(nanindex)):
-            if i == 0:
-                polygon_list.append(Polygon(list(zip(perimeterArea[:nanindex[0], 0], perimeterArea[:nanindex[0], 1]))))
-            else:
-                polygon_list.append(Polygon(
-                    list(zip(perimeterArea[nanindex[i - 1] + 1:nanindex[i], 0], perimeterArea[nanindex[i - 1] + 1:nanindex[i], 1]))))
-        if ~ np.isnan(perimeterArea[-1, 0]):
-            polygon_list.append(Polygon(list(zip(perimeterArea[nanindex[-1] + 1:, 0], perimeterArea[nanindex[-1] + 1:, 1]))))
-        peripshape = MultiPolygon(polygon_list)
-    else:
-        peripshape = Polygon(perimeterArea)
-
-    fpshape = Polygon(zip(fpx, fpy))
-    inter = (peripshape.difference(fpshape)).buffer(0)
-    areaI = inter.area
-    areaP = peripshape.area
-
-    # Check: the footprint is larger than the region of interest...
-    if areaI == 0:
-        gridPoints.append(np.array(gamma))
-        return np.array(gridPoints), np.array(vPoints)
-
-    # Check if the rectangle at gamma and size [w,h] is contained in
-    # the perimeter area (either partially or totally)
-    if (np.isnan(targetArea[:, 0])).any():
-        nanindex = np.where(np.isnan(targetArea[:, 0]))[0]
-        polygon_list = []
-        for i in range(len(nanindex)):
-            if i == 0:
-                polygon_list.append(Polygon(list(zip(targetArea[:nanindex[0], 0], targetArea[:nanindex[0], 1]))))
-            else:
-                polygon_list.append(Polygon(
-                    list(zip(targetArea[nanindex[i - 1] + 1:nanindex[i], 0],
-                             targetArea[nanindex[i - 1] + 1:nanindex[i], 1]))))
-        if ~ np.isnan(targetArea[-1, 0]):
-            polygon_list.append(Polygon(list(zip(targetArea[nanindex[-1] + 1:, 0], targetArea[nanindex[-1] + 1:, 1]))))
-        target_polygon = MultiPolygon(polygon_list)
+    if rasters is None:
+        # Subtract the allocated cell (footprint) from the perimeterArea
+        if (np.isnan(perimeterArea[:, 0])).any():
+            nanindex = np.where(np.isnan(perimeterArea[:, 0]))[0]
+            polygon_list = []
+            for i in range(len(nanindex)):
+                if i == 0:
+                    polygon_list.append(Polygon(list(zip(perimeterArea[:nanindex[0], 0], perimeterArea[:nanindex[0], 1]))))
+                else:
+                    polygon_list.append(Polygon(
+                        list(zip(perimeterArea[nanindex[i - 1] + 1:nanindex[i], 0], perimeterArea[nanindex[i - 1] + 1:nanindex[i], 1]))))
+            if ~ np.isnan(perimeterArea[-1, 0]):
+                polygon_list.append(Polygon(list(zip(perimeterArea[nanindex[-1] + 1:, 0], perimeterArea[nanindex[-1] + 1:, 1]))))
+            peripshape = MultiPolygon(polygon_list)
+        else:
+            peripshape = Polygon(perimeterArea)
+
+        fpshape = Polygon(zip(fpx, fpy))
+        inter = (peripshape.difference(fpshape)).buffer(0)
+        areaI = inter.area
+        areaP = peripshape.area
+
+        # Check: the footprint is larger than the region of interest...
+        if areaI == 0:
+            gridPoints.append(np.array(gamma))
+            return np.array(gridPoints), np.array(vPoints)
+
+        # Check if the rectangle at gamma and size [w,h] is contained in
+        # the perimeter area (either partially or totally)
+        if (np.isnan(targetArea[:, 0])).any():
+            nanindex = np.where(np.isnan(targetArea[:, 0]))[0]
+            polygon_list = []
+            for i in range(len(nanindex)):
+                if i == 0:
+                    polygon_list.append(Polygon(list(zip(targetArea[:nanindex[0], 0], targetArea[:nanindex[0], 1]))))
+                else:
+                    polygon_list.append(Polygon(
+                        list(zip(targetArea[nanindex[i - 1] + 1:nanindex[i], 0],
+                                 targetArea[nanindex[i - 1] + 1:nanindex[i], 1]))))
+            if ~ np.isnan(targetArea[-1, 0]):
+                polygon_list.append(Polygon(list(zip(targetArea[nanindex[-1] + 1:, 0], targetArea[nanindex[-1] + 1:, 1]))))
+            target_polygon = MultiPolygon(polygon_list)
+        else:
+            target_polygon = Polygon(targetArea)
+        target_polygon = target_polygon.buffer(0)
+        if target_polygon.intersects(Point(gamma)) or abs(areaI - areaP) / fpshape.area > epsilon:
+            inside = True
+
     else:
-        target_polygon = Polygon(targetArea)
-    target_polygon = target_polygon.buffer(0)
-    if target_polygon.intersects(Point(gamma)) or abs(areaI - areaP) / fpshape.area > epsilon:
-        inside = True
+        # Check: the footprint is larger than the region of interest...
+        hxmin, hymin, hxmax, hymax = rasters['perimeter'].polygon.bounds
+        if hxmin >= min(fpx) and hxmax <= max(fpx) and hymin >= min(fpy) and hymax <= max(fpy):
+            gridPoints.append(np.array(gamma))
+            return np.array(gridPoints), np.array(vPoints)
+
+        # Check if the rectangle at gamma and size [w,h] is contained in
+        # the perimeter area (either partially or totally)
+        fraction, bound = rasters['perimeter'].fraction(gamma)
+        if abs(fraction - epsilon) <= bound:
+            fraction = rasters['perimeter'].exact(gamma)
+        if shapely.intersects_xy(rasters['target'].polygon, gamma[0], gamma[1]) or fraction > epsilon:
+            inside = True
 
 
     if inside:
         # Disregard those cases where the footprint does not cover a certain
         # minimum of the roi (this also avoids sub-optimality in the
         # optimization algorithms)
-        areaT = target_polygon.area
-        inter = (target_polygon.difference(fpshape)).buffer(0)
-        areaI = inter.area
-        areaInter = areaT - areaI
-        fpArea = fpshape.area
-
+        if rasters is None:
+            areaT = target_polygon.area
+            inter = (target_polygon.difference(fpshape)).buffer(0)
+            areaI = inter.area
+            areaInter = areaT - areaI
+            fpArea = fpshape.area
+            fraction = areaInter / fpArea
+        else:
+            fraction, bound = rasters['target'].fraction(gamma)
+            if abs(fraction - epsilon) <= bound:
+                fraction = rasters['target'].exact(gamma)
 
-        if areaInter / fpArea > epsilon:
+        if fraction > epsilon:
             gridPoints.append(np.array(gamma))
             # coordinates = [(gamma(0)-w/2, gamma(1)+ h/2),
             #                (gamma(0)-w/2, gamma(1)- h/2),
@@ -164,22 +194,22 @@ def floodFillAlgorithm(w, h, olapx, olapy, gamma, targetArea, perimeterArea, gri
         gridPoints, vPoints = floodFillAlgorithm(w, h, olapx, olapy,
                                                      np.array([gamma[0] - w + ovlapx, gamma[1]]),
                                                      targetArea, perimeterArea,
-                                                     gridPoints, vPoints, method)
+                                                     gridPoints, vPoints, method, rasters)
         # South
         gridPoints, vPoints = floodFillAlgorithm(w, h, olapx, olapy,
                                                      np.array([gamma[0], gamma[1] - h + ovlapy]),
                                                      targetArea, perimeterArea,
-                                                     gridPoints, vPoints, method)
+                                                     gridPoints, vPoints, method, rasters)
         # North
         gridPoints, vPoints = floodFillAlgorithm(w, h, olapx, olapy,
                                                      np.array([gamma[0], gamma[1] + h - ovlapy]),
                                                      targetArea, perimeterArea,
-                                                     gridPoints, vPoints, method)
+                                                     gridPoints, vPoints, method, rasters)
         # East
         gridPoints, vPoints = floodFillAlgorithm(w, h, olapx, olapy,
                                                      np.array([gamma[0] + w - ovlapx, gamma[1]]),
                                                      targetArea, perimeterArea,
-                                                     gridPoints, vPoints, method)
+                                                     gridPoints, vPoints, method, rasters)
 
         # If method is '8fill', check diagonal neighbors
         if method == '8fill':
@@ -187,21 +217,21 @@ def floodFillAlgorithm(w, h, olapx, olapy, gamma, targetArea, perimeterArea, gri
             gridPoints, vPoints = floodFillAlgorithm(w, h, olapx, olapy,
                                                          np.array([gamma[0] - w + ovlapx, gamma[1] + h - ovlapy]),
                                                          targetArea, perimeterArea,
-                                                         gridPoints, vPoints, method)
+                                                         gridPoints, vPoints, method, rasters)
             # Southwest
             gridPoints, vPoints = floodFillAlgorithm(w, h, olapx, olapy,
                                                          np.array([gamma[0] - w + ovlapx, gamma[1] - h + ovlapy]),
                                                          targetArea, perimeterArea,
-                                                         gridPoints, vPoints, method)
+                                                         gridPoints, vPoints, method, rasters)
             # Northeast
             gridPoints, vPoints = floodFillAlgorithm(w, h, olapx, olapy,
                                                          np.array([gamma[0] + w - ovlapx, gamma[1] + h - ovlapy]),
                                                          targetArea, perimeterArea,
-                                                         gridPoints, vPoints, method)
+                                                         gridPoints, vPoints, method, rasters)
             # Southeast
             gridPoints, vPoints = floodFillAlgorithm(w, h, olapx, olapy,
                                                          np.array([gamma[0] + w - ovlapx, gamma[1] - h + ovlapy]),
                                                          targetArea, perimeterArea,
-                                                         gridPoints, vPoints, method)
+                                                         gridPoints, vPoints, method, rasters)
 
     return np.array(gridPoints), np.array(vPoints)
\ No newline at end of file
@@ -4,9 +4,11 @@ import numpy as np
 from scipy.spatial import ConvexHull
 from shapely.geometry import MultiPolygon, Polygon, Point
 from mosaic_algorithms.auxiliar_functions.grid_functions.floodFillAlgorithm import floodFillAlgorithm
+from mosaic_algorithms.auxiliar_functions.grid_functions.multiresFill import multiresFill
+from mosaic_algorithms.auxiliar_functions.grid_functions.coverageRaster import coverageRaster
 
 
-def grid2D(fpref, olapx, olapy, gamma_, targetArea):
+def grid2D(fpref, olapx, olapy, gamma_, targetArea, coverage='exact', fill='floodfill'):
     """
     Grid discretization (using flood-fill algorithm) of a region of interest
     given a reference footprint (unit measure to create the allocatable cells)
@@ -14,7 +16,7 @@ def grid2D(fpref, olapx, olapy, gamma_, targetArea):
     Programmers:  Paula Betriu (UPC/ESEIAAT)
     Date:         10/2022
 
-    Usage:        matrixGrid = grid2D(fpref, ovlapx, ovlapy, gamma, targetArea)
+    Usage:        matrixGrid = grid2D(fpref, ovlapx, ovlapy, gamma, targetArea, coverage, fill)
 
     Inputs:
     > fpref:        dict containing the parameters that define the footprint.
@@ -30,6 +32,18 @@ def grid2D(fpref, olapx, olapy, gamma_, targetArea):
                     The vertex points are expressed in 2D.
         # targetArea[:,0] correspond to the x values of the vertices
         # targetArea[:,1] correspond to the y values of the vertices
+    > coverage:     (optional) string 'exact' or 'raster' that determines
+                    how the tile coverage fractions are evaluated in the
+                    flood-fill: with polygon operations ('exact', default)
+                    or from a raster of the oriented area (see
+                    coverageRaster), with 32 pixels per footprint side. A
+                    number sets the raster mode with that number of pixels
+                    per footprint side (accuracy knob)
+    > fill:         (optional) string 'floodfill' or 'multires' that
+                    determines the discretization algorithm: recursive
+                    flood-fill (default) or its coarse-to-fine counterpart
+                    (see multiresFill), which yields the same grid and is
+                    recommended for very large ROIs
 
     Outputs:
     > matrixGrid:   list of lists containing the grid discretization of the
@@ -112,8 +126,38 @@ def grid2D(fpref, olapx, olapy, gamma_, targetArea):
     # Flood-fill algorithm to get the grid points of the oriented roi
     # gridPoints = floodFillAlgorithm(fpref['sizex'], fpref['sizey'], ovlapx, ovlapy, gamma, orientedArea, gridPoints,np.array([]),
     #                               np.array([]),'8fill')
-    gridPoints,_ = floodFillAlgorithm(fpref['width'], fpref['height'], olapx, olapy, gamma, orientedArea, periArea,
-                                    np.array([]), np.array([]),'4fill')
+    res = coverageRaster.resolution(coverage)
+    if res is not None:
+        # Rasterize the oriented area and its convex hull once, so that the
+        # flood-fill evaluates the tile coverage fractions in O(1)
+        if (np.isnan(orientedArea[:, 0])).any():
+            nanindex = np.where(np.isnan(orientedArea[:, 0]))[0]
+            polygon_list = []
+            for i in range(len(nanindex)):
+                if i == 0:
+                    polygon_list.append(Polygon(list(zip(orientedArea[:nanindex[0], 0], orientedArea[:nanindex[0], 1]))))
+                else:
+                    polygon_list.append(Polygon(
+                        list(zip(orientedArea[nanindex[i - 1] + 1:nanindex[i], 0],
+                                 orientedArea[nanindex[i - 1] + 1:nanindex[i], 1]))))
+            if ~ np.isnan(orientedArea[-1, 0]):
+                polygon_list.append(Polygon(list(zip(orientedArea[nanindex[-1] + 1:, 0], orientedArea[nanindex[-1] + 1:, 1]))))
+            target_polygon = MultiPolygon(polygon_list)
+        else:
+            target_polygon = Polygon(orientedArea)
+        rasters = {
+            'target': coverageRaster(target_polygon.buffer(0), fpref['width'], fpref['height'], res),
+            'perimeter': coverageRaster(Polygon(periArea), fpref['width'], fpref['height'], res)
+        }
+    else:
+        rasters = None
+
+    if fill == 'multires':
+        gridPoints = multiresFill(fpref['width'], fpref['height'], olapx, olapy, gamma, orientedArea, periArea,
+                                  rasters)
+    else:
+        gridPoints,_ = floodFillAlgorithm(fpref['width'], fpref['height'], olapx, olapy, gamma, orientedArea, periArea,
+                                        np.array([]), np.array([]),'4fill', rasters)
 
 
     if gridPoints.size != 0:
@@ -144,19 +188,24 @@ def grid2D(fpref, olapx, olapy, gamma_, targetArea):
         uniqueLon = uniqueLon[~ind]
 
         # Sort and rotate the grid points and insert them in the grid matrix
-        matrixGrid = [[None for _ in range(max(np.shape(uniqueLon)))] for _ in range(max(np.shape(uniqueLat)))]
-        for i in range(max(np.shape(uniqueLat))):
-            # We will sweep across the grid by, first, latitude and, second, longitude
-            lat = uniqueLat[max(np.shape(uniqueLat)) - 1 - i]
-            indlat = np.abs(sortedGrid[:, 1] - lat) < 1e-5
-            mrow = sortedGrid[indlat]
-            mrow = np.sort(mrow[:,0], axis=0)
-            for j in range(max(np.shape(mrow))):
-                indlon=np.abs(uniqueLon-mrow[j]) < 1e-5
-                lon = mrow[j]
-                for k in range(max(np.shape(uniqueLon))):
-                    if indlon[k]:
-                        matrixGrid[i][k] = np.array([cx, cy]) + rotmat.T @ (np.array([lon, lat]) - np.array([cx, cy]))
+        # We will sweep across the grid by, first, latitude and, second, longitude
+        nlat, nlon = max(np.shape(uniqueLat)), max(np.shape(uniqueLon))
+        matrixGrid = [[None for _ in range(nlon)] for _ in range(nlat)]
+        ilat = nearest(uniqueLat, sortedGrid[:, 1])
+        ilon = nearest(uniqueLon, sortedGrid[:, 0])
+        valid = (np.abs(sortedGrid[:, 1] - uniqueLat[ilat]) < 1e-5) & (np.abs(sortedGrid[:, 0] - uniqueLon[ilon]) < 1e-5)
+        points = np.column_stack((sortedGrid[:, 0], uniqueLat[ilat]))  # latitude is snapped to the unique values
+        points = np.array([cx, cy]) + (points - np.array([cx, cy])) @ rotmat
+        order = np.lexsort((sortedGrid[:, 0], -ilat))  # rows from top to bottom, longitude ascending
+        for k in order[valid[order]]:
+            matrixGrid[nlat - 1 - ilat[k]][ilon[k]] = points[k]
 
     return matrixGrid, dirx, diry
 
+
+def nearest(values, queries):
+    # Index of the nearest element of the (sorted) array 'values' to each query
+    ind = np.clip(np.searchsorted(values, queries), 1, max(len(values) - 1, 1))
+    left = np.clip(ind - 1, 0, len(values) - 1)
+    right = np.clip(ind, 0, len(values) - 1)
+    return np.where(np.abs(queries - values[left]) <= np.abs(values[right] - queries), left, right)
@@ -0,0 +1,118 @@
+import multiprocessing
+import time
+
+import numpy as np
+
+from mosaic_algorithms.auxiliar_functions.grid_functions.grid2D import grid2D
+
+
+def gridSearch(fpref, olapx, olapy, gamma, targetArea, noffsets=4, angles=(0.,), budget=None, processes=None,
+               coverage='raster', fill='multires'):
+    """
+    Search of the grid origin and orientation that minimize the number of
+    tiles needed to discretize a region of interest. The candidate
+    configurations are the lattice origins obtained by shifting the seed by
+    fractions (1/noffsets) of the lattice step in both directions, for each
+    one of the candidate orientation angles. Each candidate is ranked by the
+    number of tiles of its grid, counted with a fast grid builder (raster
+    coverage and multi-resolution fill, see grid2D), and the one with the
+    fewest tiles is kept (the input configuration wins ties). The raster
+    falls back to the exact coverage of the ambiguous tiles and the
+    multi-resolution fill yields the flood-fill grid, so the counts are the
+    ones of the exact grid builder, which the caller only runs for the
+    selected configuration.
+
+    Usage:        gamma, angle, ntiles = gridSearch(fpref, olapx, olapy, gamma, targetArea,
+                                                    noffsets, angles, budget, processes, coverage, fill)
+
+    Inputs:
+    > fpref:        dict containing the parameters that define the footprint
+                    ('width', 'height', 'angle'). See grid2D
+    > olapx:        grid footprint overlap in the x direction, in percentage
+    > olapy:        grid footprint overlap in the y direction, in percentage
+    > gamma:        input seed of the grid
+    > targetArea:   matrix containing the vertices of the ROI polygon
+    > noffsets:     number of origin offsets per lattice step in each
+                    direction (noffsets^2 origins per angle). Default: 4
+    > angles:       candidate orientation angles of the footprint, in deg.
+                    Note that a non-zero angle implies that the instrument
+                    rolls about its boresight, which is not modelled by the
+                    pointing functions, nor by the grid updates of the
+                    online frontier repair (see frontierRepair).
+                    Default: (0,)
+    > budget:       time budget of the search, in seconds. The candidates
+                    that have not been evaluated when the budget is
+                    exhausted are discarded (the input configuration is
+                    always evaluated). Default: None (no budget)
+    > processes:    number of worker processes. If None or 1, the
+                    candidates are evaluated sequentially. The workers
+                    that are still running when the budget is exhausted
+                    are terminated. Default: None
+    > coverage:     tile coverage evaluation mode of the grid builder that
+                    ranks the candidates. See grid2D. Default: 'raster'
+    > fill:         grid discretization algorithm of the grid builder that
+                    ranks the candidates. See grid2D. Default: 'multires'
+
+    Outputs:
+    > gamma:        seed of the best grid
+    > angle:        orientation angle of the best grid, in deg
+    > ntiles:       number of tiles of the best grid
+    """
+    t0 = time.time()
+    w, h = fpref['width'], fpref['height']
+    dx, dy = w * (1 - olapx / 100), h * (1 - olapy / 100)  # lattice steps
+
+    # Candidate configurations: the input one goes first
+    candidates = []
+    for angle in angles:
+        # Offsets along the (rotated) grid directions
+        rad = np.deg2rad(-angle)
+        dirx = np.array([np.cos(rad), -np.sin(rad)])
+        diry = np.array([np.sin(rad), np.cos(rad)])
+        for i in range(noffsets):
+            for j in range(noffsets):
+                offset = i / noffsets * dx * dirx + j / noffsets * dy * diry
+                candidates.append((np.array(gamma, dtype=float) + offset, float(angle)))
+    base = (np.array(gamma, dtype=float), float(fpref['angle']))
+    candidates = [base] + [c for c in candidates if not (np.allclose(c[0], base[0]) and c[1] == base[1])]
+
+    # Evaluated candidates: [ntiles, index]. Ties are broken by the candidate
+    # order, so the result does not depend on the evaluation order
+    results = []
+
+    results.append((tileCount(fpref, olapx, olapy, candidates[0], targetArea, coverage, fill), 0))
+    if processes is None or processes <= 1:
+        for k in range(1, len(candidates)):
+            if budget is not None and time.time() - t0 > budget:
+                break
+            results.append((tileCount(fpref, olapx, olapy, candidates[k], targetArea, coverage, fill), k))
+    else:
+        # The evaluations that have not finished when the budget is exhausted
+        # are discarded, and their workers terminated (and joined) on exit
+        with multiprocessing.Pool(processes) as pool:
+            pending = [(pool.apply_async(tileCount, (fpref, olapx, olapy, candidates[k], targetArea, coverage, fill)),
+                        k) for k in range(1, len(candidates))]
+            for result, k in pending:
+                if budget is not None:
+                    result.wait(max(budget - (time.time() - t0), 0.))
+                else:
+                    result.wait()
+                if result.ready():
+                    results.append((result.get(), k))
+            pool.terminate()
+            pool.join()
+
+    # Empty grids (the seed falls outside of the ROI) are not valid
+    results = [result for result in results if result[0] > 0]
+    if not results:
+        return base[0], base[1], 0
+    ntiles, k = min(results)
+    return candidates[k][0], candidates[k][1], ntiles
+
+
+def tileCount(fpref, olapx, olapy, candidate, targetArea, coverage='exact', fill='floodfill'):
+    # Number of tiles of the grid with the candidate (seed, angle)
+    fp = dict(fpref)
+    fp['angle'] = candidate[1]
+    grid, _, _ = grid2D(fp, olapx, olapy, candidate[0], targetArea, coverage, fill)
+    return sum(cell is not None for row in grid for cell in row)
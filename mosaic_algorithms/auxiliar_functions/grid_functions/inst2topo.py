@@ -1,12 +1,9 @@
 import numpy as np
 
-from conversion_functions.mat2py_dpr import mat2py_dpr
-from conversion_functions.mat2py_reclat import mat2py_reclat
-from conversion_functions.mat2py_sincpt import mat2py_sincpt
-from mosaic_algorithms.auxiliar_functions.spacecraft_operation.instpointing import instpointing
-from conversion_functions.mat2py_cnmfrm import mat2py_cnmfrm
+from mosaic_algorithms.auxiliar_functions.spacecraft_operation.projectionContext import projectionContext
+from mosaic_algorithms.auxiliar_functions.observation_geometry.surfaceIntercept import surfaceIntercept
 
-def inst2topo(grid, lon, lat, target, sc, inst, et):
+def inst2topo(grid, lon, lat, target, sc, inst, et, context=None):
     """
     This function transforms a set of points from the instrument frame to the
     topographic coordinate system (latitude and longitude on the target body)
@@ -14,7 +11,7 @@ def inst2topo(grid, lon, lat, target, sc, inst, et):
     Programmers:  Paula Betriu (UPC/ESEIAAT)
     Date:         09/2022
 
-    Usage:        grid_topo = inst2topo(grid, lon, lat, target, sc, inst, et)
+    Usage:        grid_topo, visible = inst2topo(grid, lon, lat, target, sc, inst, et, context=context)
 
     Inputs:
         grid:          A list of grid points in instrument frame coordinates.
@@ -27,39 +24,55 @@ def inst2topo(grid, lon, lat, target, sc, inst, et):
         sc:            String name of the spacecraft.
         inst:          String name of the instrument.
         et:            Ephemeris time, TDB seconds past J2000 epoch.
+        context:       (optional) projectionContext of the same instrument,
+                       spacecraft, target, epoch and pointing, that is
+                       reused instead of querying the pointing again.
 
     Returns:
         grid_topo:     A list of the input grid points transformed to topographic
                        coordinates on the target body. Each element contains a 2D point
-                       [lon,lat], in [deg]
+                       [lon,lat], in [deg]. The points that are not visible
+                       from the instrument (their line of sight does not
+                       intersect the target body) are None, and the empty
+                       cells of the input grid are empty lists
+        visible:       Boolean matrix with the shape of the grid, True for
+                       the grid points that are visible from the instrument
     """
 
     # Pre-allocate
-    _, _, rotmat, _ = instpointing(inst, target, sc, et, lon, lat)  # Assuming instpointing function is defined
-    grid_topo = [[[] for _ in range(np.shape(grid)[1])] for _ in range(np.shape(grid)[0])]  # Pre-allocate grid_topo array
-    method = 'ELLIPSOID'
-    _, targetframe, _ = mat2py_cnmfrm(target)  # Get target frame ID in SPICE
+    context = projectionContext.get(context, inst, sc, target, et, lon, lat)
+    rotmat = context.rotmat
+    grid_topo = [[[] for _ in range(len(grid[i]))] for i in range(len(grid))]  # Pre-allocate grid_topo array
+    visible = np.zeros((len(grid), max([len(row) for row in grid], default=0)), dtype=bool)
 
-    # Convert grid into topographical coordinates
+    # Collect the grid points (non-empty cells)
+    ii, jj, points = [], [], []
     for i in range(len(grid)):
         for j in range(len(grid[i])):
             instp = grid[i][j]  # retrieve current point in instrument frame
-            if instp is not None and not np.all(np.isnan(instp)):  # check for empty or NaN
-                p = np.zeros(3)  # initialize 3D points for conversion
-                p[0:2] = instp  # assign [x, y] coordinates
-                p[2] = 1.  # set z to 1 for surface projection calculation
-                p_body = np.dot(rotmat, p)  # apply rotation matrix
+            if instp is not None and len(instp) > 0 and not np.all(np.isnan(instp)):  # check for empty or NaN
+                ii.append(i)
+                jj.append(j)
+                points.append(instp)
+    if not points:
+        return grid_topo, visible
 
-                # Compute surface intersection of the point on the target body
-                xpoint, _, _, found = mat2py_sincpt(method,target,et,targetframe,
-                                            'NONE',sc,targetframe,p_body)
+    # Body-fixed directions of all the points at once: [x, y] coordinates in
+    # the focal plane, z set to 1, and rotation to the body-fixed frame
+    p = np.column_stack((np.reshape(np.array(points, dtype=float), (-1, 2)), np.ones(len(points))))
+    p_body = p @ rotmat.T
 
-                if found:
-                    # Convert rectangular coordinates to latitudinal
-                    _, lon, lat = mat2py_reclat(xpoint)
-                    grid_topo[i][j] = [lon*mat2py_dpr(), lat*mat2py_dpr()]
-                else:
-                    print("Point not visible from the instrument")
-                    grid_topo[i][j] = None
+    # Compute surface intersection of the points on the target body
+    xpoints, found = surfaceIntercept(target, sc, et, p_body, context=context)
 
-    return grid_topo
\ No newline at end of file
+    # Convert rectangular coordinates to latitudinal
+    tlon = np.degrees(np.arctan2(xpoints[:, 1], xpoints[:, 0]))
+    tlat = np.degrees(np.arctan2(xpoints[:, 2], np.hypot(xpoints[:, 0], xpoints[:, 1])))
+    for k in range(len(points)):
+        if found[k]:
+            grid_topo[ii[k]][jj[k]] = [tlon[k], tlat[k]]
+        else:
+            grid_topo[ii[k]][jj[k]] = None  # point not visible from the instrument
+    visible[ii, jj] = found
+
+    return grid_topo, visible
@@ -0,0 +1,188 @@
+import numpy as np
+import shapely
+from scipy.ndimage import label
+from shapely.geometry import MultiPolygon, Polygon
+
+
+def multiresFill(w, h, olapx, olapy, gamma, targetArea, perimeterArea, rasters=None):
+    """
+    Coarse-to-fine (multi-resolution) counterpart of the flood-fill
+    algorithm: it discretizes the target area with the same lattice of 2D
+    rectangular elements and returns the same grid points, but the lattice
+    cells are classified by blocks. Large blocks of cells are classified as
+    fully inside the target area, fully outside the perimeter area or
+    boundary, using prepared polygons, and blocks at the boundary are
+    recursively subdivided (quadtree). Only the cells of the smallest
+    boundary blocks are tested individually, so the number of polygon
+    operations grows with the ROI perimeter rather than its area. The
+    connectivity of the flood-fill ('4fill') is then reproduced by labelling
+    the cells that the flood-fill would expand from.
+
+    Usage:        gridPoints = multiresFill(w, h, olapx, olapy, gamma, targetArea,
+                                            perimeterArea, rasters)
+
+    Inputs:
+        - w:            horizontal resolution. Units are irrelevant as long as they are consistent.
+        - h:            vertical resolution. Units are irrelevant as long as they are consistent.
+        - olapx:        grid footprint overlap in the horizontal direction. Units are in percentage of width.
+        - olapy:        grid footprint overlap in the vertical direction. Units are in percentage of the height.
+        - gamma:        grid origin point (seed)
+        - targetArea:   matrix containing the vertices of the ROI polygon. The vertex points are expressed in 2D.
+        - perimeterArea:matrix containing the vertices of the polygon that encloses all of the uncovered
+                        area (convex hull of the target area). See floodFillAlgorithm
+        - rasters:      (optional) dict with the coverageRaster objects of
+                        the target area ('target') and the perimeter area
+                        ('perimeter'), used to evaluate the coverage of the
+                        boundary cells. Default: None (exact evaluation)
+
+    Returns:
+        - gridPoints:   matrix containing the discretized gridPoints of the
+                        region-of-interest. Same points as the ones returned
+                        by floodFillAlgorithm (with '4fill' method), up to
+                        the floating point rounding of the lattice
+                        coordinates
+    """
+    epsilon = 0.05
+    ovlapx = olapx * w / 100; ovlapy = olapy * h / 100  # convert overlaps from percentage
+    dx, dy = w - ovlapx, h - ovlapy  # lattice steps
+    gamma = np.array(gamma, dtype=float).reshape(2)
+
+    target_polygon = polygonshape(targetArea).buffer(0)
+    peripshape = polygonshape(perimeterArea)
+    shapely.prepare(target_polygon)
+    shapely.prepare(peripshape)
+
+    # Lattice range: cells whose element may overlap the perimeter area (with
+    # a one-cell margin of outside cells)
+    hxmin, hymin, hxmax, hymax = peripshape.bounds
+    imin = min(int(np.floor((hxmin - w / 2 - gamma[0]) / dx)), 0) - 1
+    imax = max(int(np.ceil((hxmax + w / 2 - gamma[0]) / dx)), 0) + 1
+    jmin = min(int(np.floor((hymin - h / 2 - gamma[1]) / dy)), 0) - 1
+    jmax = max(int(np.ceil((hymax + h / 2 - gamma[1]) / dy)), 0) + 1
+    ncol, nrow = imax - imin + 1, jmax - jmin + 1
+
+    # Cell states: 0 (outside: not explored further), 1 (inside and
+    # included), 2 (inside but not included: the flood-fill explores its
+    # neighbours but does not allocate the cell), 3 (the element covers the
+    # whole perimeter area: included, but not explored further)
+    state = np.zeros((nrow, ncol), dtype=int)
+
+    # Quadtree classification of the lattice blocks [i0, i1) x [j0, j1)
+    blocks = np.array([[0, ncol, 0, nrow]])
+    leaves = []
+    while len(blocks) > 0:
+        xa = gamma[0] + (blocks[:, 0] + imin) * dx - w / 2
+        xb = gamma[0] + (blocks[:, 1] - 1 + imin) * dx + w / 2
+        ya = gamma[1] + (blocks[:, 2] + jmin) * dy - h / 2
+        yb = gamma[1] + (blocks[:, 3] - 1 + jmin) * dy + h / 2
+        rects = shapely.box(xa, ya, xb, yb)
+
+        # Blocks outside the perimeter area: all the cells are outside
+        outside = ~shapely.intersects(peripshape, rects)
+        # Blocks inside the target area: all the cells are inside and
+        # completely covered
+        inside = ~outside & shapely.contains(target_polygon, rects)
+        for i0, i1, j0, j1 in blocks[inside]:
+            state[j0:j1, i0:i1] = 1
+
+        # Boundary blocks: subdivide them, or test their cells
+        boundary = blocks[~outside & ~inside]
+        small = ((boundary[:, 1] - boundary[:, 0]) <= 4) & ((boundary[:, 3] - boundary[:, 2]) <= 4)
+        leaves += list(boundary[small])
+        blocks = []
+        for i0, i1, j0, j1 in boundary[~small]:
+            im, jm = (i0 + i1) // 2, (j0 + j1) // 2
+            for child in [[i0, im, j0, jm], [im, i1, j0, jm], [i0, im, jm, j1], [im, i1, jm, j1]]:
+                if child[1] > child[0] and child[3] > child[2]:
+                    blocks.append(child)
+        blocks = np.array(blocks, dtype=int).reshape(-1, 4)
+
+    # Cell by cell evaluation of the boundary blocks
+    if leaves:
+        jj, ii = [], []
+        for i0, i1, j0, j1 in leaves:
+            jgrid, igrid = np.mgrid[j0:j1, i0:i1]
+            jj.append(jgrid.ravel()); ii.append(igrid.ravel())
+        jj, ii = np.concatenate(jj), np.concatenate(ii)
+        x = gamma[0] + (ii + imin) * dx
+        y = gamma[1] + (jj + jmin) * dy
+        state[jj, ii] = cellstate(x, y, w, h, epsilon, target_polygon, peripshape, rasters)
+
+    # Elements that cover the whole perimeter area (the footprint is larger
+    # than the region of interest)
+    xc = gamma[0] + (np.arange(ncol) + imin) * dx
+    yc = gamma[1] + (np.arange(nrow) + jmin) * dy
+    terminal = np.logical_and.outer((hymin >= yc - h / 2) & (hymax <= yc + h / 2),
+                                    (hxmin >= xc - w / 2) & (hxmax <= xc + w / 2))
+    state[terminal] = 3
+
+    # Flood-fill connectivity: the seed is the first cell to be evaluated; if it
+    # is not included, the flood-fill stops
+    iseed, jseed = -imin, -jmin
+    if state[jseed, iseed] == 3:
+        return gamma.reshape(1, 2)
+    if state[jseed, iseed] != 1:
+        return np.array([])
+
+    # Cells that are explored by the flood-fill: the connected set of inside
+    # cells that contains the seed, and their cardinal neighbours
+    labels, _ = label((state == 1) | (state == 2))
+    expanded = labels == labels[jseed, iseed]
+    reached = expanded.copy()
+    reached[1:, :] |= expanded[:-1, :]
+    reached[:-1, :] |= expanded[1:, :]
+    reached[:, 1:] |= expanded[:, :-1]
+    reached[:, :-1] |= expanded[:, 1:]
+
+    jj, ii = np.nonzero(reached & ((state == 1) | (state == 3)))
+    gridPoints = np.column_stack((gamma[0] + (ii + imin) * dx, gamma[1] + (jj + jmin) * dy))
+
+    return gridPoints
+
+
+def cellstate(x, y, w, h, epsilon, target_polygon, peripshape, rasters):
+    # Flood-fill classification of the lattice cells centered at [x, y]
+    # (see multiresFill for the state values)
+    if rasters is None:
+        boxes = shapely.box(x - w / 2, y - h / 2, x + w / 2, y + h / 2)
+        fpArea = shapely.area(boxes)
+        areaI = shapely.area(shapely.buffer(shapely.difference(peripshape, boxes), 0))
+        perifraction = np.abs(areaI - peripshape.area) / fpArea
+        areaI = shapely.area(shapely.buffer(shapely.difference(target_polygon, boxes), 0))
+        fraction = (target_polygon.area - areaI) / fpArea
+    else:
+        centers = np.column_stack((x, y))
+        perifraction = exactfallback(rasters['perimeter'], centers, epsilon)
+        fraction = exactfallback(rasters['target'], centers, epsilon)
+
+    inside = shapely.intersects_xy(target_polygon, x, y) | (perifraction > epsilon)
+    state = np.zeros(len(x), dtype=int)
+    state[inside] = 2
+    state[inside & (fraction > epsilon)] = 1
+    return state
+
+
+def exactfallback(raster, centers, epsilon):
+    # Raster coverage fractions, recomputed exactly when the error bound does
+    # not allow to decide with respect to the threshold
+    fraction, bound = raster.fraction(centers)
+    for k in np.nonzero(np.abs(fraction - epsilon) <= bound)[0]:
+        fraction[k] = raster.exact(centers[k])
+    return fraction
+
+
+def polygonshape(area):
+    # Polygon (or multipolygon, if the vertices are separated by NaN)
+    if (np.isnan(area[:, 0])).any():
+        nanindex = np.where(np.isnan(area[:, 0]))[0]
+        polygon_list = []
+        for i in range(len(nanindex)):
+            if i == 0:
+                polygon_list.append(Polygon(list(zip(area[:nanindex[0], 0], area[:nanindex[0], 1]))))
+            else:
+                polygon_list.append(Polygon(
+                    list(zip(area[nanindex[i - 1] + 1:nanindex[i], 0], area[nanindex[i - 1] + 1:nanindex[i], 1]))))
+        if ~ np.isnan(area[-1, 0]):
+            polygon_list.append(Polygon(list(zip(area[nanindex[-1] + 1:, 0], area[nanindex[-1] + 1:, 1]))))
+        return MultiPolygon(polygon_list)
+    return Polygon(area)
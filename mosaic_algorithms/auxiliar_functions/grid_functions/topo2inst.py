@@ -1,12 +1,11 @@
 import copy
 from conversion_functions import *
 import numpy as np
-from mosaic_algorithms.auxiliar_functions.spacecraft_operation.instpointing import  instpointing
-from mosaic_algorithms.auxiliar_functions.plot.trgobsvec import trgobsvec
+from mosaic_algorithms.auxiliar_functions.spacecraft_operation.projectionContext import projectionContext
 from mosaic_algorithms.auxiliar_functions.observation_geometry.emissionang import emissionang
 from mosaic_algorithms.auxiliar_functions.polygon_functions.sortcw import sortcw
 
-def topo2inst(inputdata_, lon, lat, target, sc, inst, et):
+def topo2inst(inputdata_, lon, lat, target, sc, inst, et, context=None):
     """
     This function transforms a set of points from the topographic coordinate
     system(latitude and longitude on the target body) to the instrument frame
@@ -15,7 +14,7 @@ def topo2inst(inputdata_, lon, lat, target, sc, inst, et):
     Programmers:  Paula Betriu (UPC/ESEIAAT)
     Date:         09/2022
 
-    Usage:        outputData = topo2inst(inputdata, lon, lat, target, sc, inst, et)
+    Usage:        outputData = topo2inst(inputdata, lon, lat, target, sc, inst, et, context=context)
 
     Inputs:
       > inputdata:     A list of lists  or ndarray of points in topographic
@@ -29,6 +28,9 @@ def topo2inst(inputdata_, lon, lat, target, sc, inst, et):
       > sc:            string name of the spacecraft
       > inst:          string name of the instrument
       > et:            ephemeris time, TDB seconds past J2000 epoch
+      > context:       (optional) projectionContext of the same instrument,
+                       spacecraft, target, epoch and pointing, that is
+                       reused instead of querying the pointing again
 
     Outputs:
       > outputData:    A list of lists or ndarray of the input points transformed
@@ -42,7 +44,7 @@ def topo2inst(inputdata_, lon, lat, target, sc, inst, et):
     ii, jj,aux = [], [], []
 
     if isinstance(inputdata, list):
-        aux = [[point if point else [np.nan, np.nan] for point in row] for row in inputdata]
+        aux = [[point if point is not None and len(point) else [np.nan, np.nan] for point in row] for row in inputdata]
         topoPoints = np.vstack([[point for point in sublist] for sublist in aux])
         for i in range(len(inputdata)):
             for j in range(len(inputdata[i])):
@@ -53,39 +55,40 @@ def topo2inst(inputdata_, lon, lat, target, sc, inst, et):
             inputdata = inputdata.reshape(1,2)
         topoPoints = copy.deepcopy(inputdata)
 
-    # Pre-allocate variables
-    _, targetframe,_ = mat2py_cnmfrm(target)  # target frame ID in SPICE
+    # Build focal plane (instrument pointing, observer position and focal
+    # plane are the same for all the topographic points)
+    context = projectionContext.get(context, inst, sc, target, et, lon, lat)
+    boresight, rotmat = context.boresight, context.rotmat
+    vertex, point = context.vertex, context.point
 
-    # Build focal plane
-    fovbounds, boresight, rotmat ,_ = instpointing(inst, target, sc, et, lon, lat)
+    # Surface points in rectangular coordinates (same as srfrec: the point on
+    # the reference ellipsoid with the input planetocentric longitude and
+    # latitude), all at once
+    radii = context.radii
+    rlon, rlat = np.radians(topoPoints[:, 0]), np.radians(topoPoints[:, 1])
+    u = np.column_stack((np.cos(rlat) * np.cos(rlon), np.cos(rlat) * np.sin(rlon), np.sin(rlat)))
+    srfpoints = u / np.sqrt(np.sum((u / radii) ** 2, axis=1))[:, np.newaxis]
 
-    vertex,_ = mat2py_spkpos(sc, et, targetframe, 'NONE', target)
-    point = vertex + fovbounds[:, 0]
-
-    # Create a plane based on the boresight and a point in the focal plane
-    plane = mat2py_nvp2pl (boresight, point)
-
-    # For each topographic point, find its intersection with the focal plane
+    # Intersection of the rays from the observer to each topographic point
+    # with the focal plane (plane normal to the boresight that contains
+    # 'point'), in closed form: vertex + s*dir, s >= 0
+    dirs = srfpoints - vertex
+    num = np.dot(boresight, point - vertex)
+    den = dirs @ boresight
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s = num / den
+    found = (den != 0) & (s >= 0)
+    valid = ~np.isnan(topoPoints).any(axis=1)
+    if (valid & ~found).any():
+        print('No intersection')
     spoint = np.zeros((topoPoints.shape[0], 3))
+    spoint[found] = vertex + s[found, np.newaxis] * dirs[found]
+    spoint[~valid] = np.nan
 
-    for i in range(topoPoints.shape[0]):
-        if not np.isnan(topoPoints[i]).any():
-            dir = -(trgobsvec(topoPoints[i], et, target, sc))[0]
-            found, spoint[i, :] = mat2py_inrypl(vertex, dir, plane)
-            if not found:
-                print('No intersection')
-        else:
-            spoint[i, :] = np.full(3, np.nan)
-
-    # Transform coordinates from body-fixed to instrument frame
-    tArea = np.zeros([spoint.shape[0],3])
-    for i in range(spoint.shape[0]):
-        if not np.isnan(spoint[i,:]).any():
-            vpoint = -(vertex - spoint[i,:].T) # vector from spacecraft to intersection point
-            tArea[i, :] = np.linalg.inv(rotmat).dot(vpoint) # apply inverse rotation to transform
-                                                              # to instrument frame
-        else:
-            tArea[i, :] = np.full(3, np.nan)
+    # Transform coordinates from body-fixed to instrument frame: vector from
+    # spacecraft to intersection point, rotated with the inverse (transpose)
+    # of the instrument rotation matrix
+    tArea = (spoint - vertex) @ rotmat
 
     instcoord = tArea[:, :2]  # extract 2D instrument frame coordinates
     # Prepare output data matching the format of the input,i.e., cell array or
@@ -6,7 +6,8 @@ def emissionang(srfpoint, t, target, obs):
     """
     This function returns the phase angle between the target normal to
     surface and the distance vector to the observer, from the target surface
-    point srfpoint, at time t.
+    point srfpoint, at time t. It is evaluated for all the surface points
+    and epochs at once, with the ellipsoid normals computed analytically.
 
     Programmers: Paula Betriu (UPC/ESEIAAT)
     Date: 10/2022
@@ -16,44 +17,47 @@ def emissionang(srfpoint, t, target, obs):
     Inputs:
       srfpoint: target surface point. It can be input either in latitudinal
                 coordinates (in [deg]) or Cartesian coordinates (in [km]).
+                A set of N points can be input as a (N,2) or (N,3) matrix.
       t:        time epoch in TDB seconds past J2000 epoch. It can be
                 either a single point in time or a discretized vector of
-                different time values.
+                M different time values.
       target:   string SPICE name of the target body.
       obs:      string SPICE name of the observer body.
 
     Outputs:
       angle:    angle between the normal surface and the distance vector to
-                the observer, in [deg].
+                the observer, in [deg]. (1,M) array for a single surface
+                point, or (M,N) matrix for a set of N surface points.
     """
 
-    # Parameters
-    method = 'ELLIPSOID'  # assumption: tri-axial ellipsoid modeling of the target body
-    _, targetframe, _ = mat2py_cnmfrm(target)  # target frame ID in SPICE
-
-    # If srfpoint has been input with the latitudinal coordinates, change to rectangular
-    if len(srfpoint) == 2:
-        srfpoint = np.deg2rad(srfpoint)  # [deg] to [rad]
-        srfpoint = mat2py_srfrec(mat2py_bodn2c(target)[0], srfpoint[0], srfpoint[1]) # surface point in rectangular
-        # coordinates (body modeled as a tri-axial ellipsoid)
-    else:
-        # if srfpoint is input as a (1,3) or (3,1), make it (3,)
-        srfpoint = srfpoint.reshape(3,)
-
-    # Compute the observer position as seen from the srfpoint
-    obsvec,_ = trgobsvec(srfpoint, t, target, obs)
-
-    # Obtain the outwards surface normal vector
-    nrmvec = np.zeros((3, np.size(t)))
-    if np.size(t)==1:
-        nrmvec[:,0] = (mat2py_srfnrm(method, target, t, targetframe, srfpoint)) # normal to surface
-        obsvec = obsvec.reshape(3,1)
-    else:
-        for i in range(len(t)):
-            nrmvec[:, i] = mat2py_srfnrm(method, target, t[i], targetframe, srfpoint)  # normal to surface
-
-    # Angle between the two vectors
-    angle = mat2py_vsep(obsvec, nrmvec)
-    angle = angle * mat2py_dpr()  # [rad] to [deg]
-
-    return angle
\ No newline at end of file
+    # Parameters: tri-axial ellipsoid modeling of the target body
+    radii = mat2py_bodvrd(target, 'RADII', 3)
+
+    srfpoint = np.array(srfpoint, dtype=float)
+    single = srfpoint.ndim == 1 or srfpoint.shape == (3, 1)
+    if single:
+        srfpoint = srfpoint.reshape(1, -1)
+
+    # If srfpoint has been input with the latitudinal coordinates, change to
+    # rectangular (surface point on the ellipsoid, same as srfrec)
+    if srfpoint.shape[1] == 2:
+        lon, lat = np.deg2rad(srfpoint[:, 0]), np.deg2rad(srfpoint[:, 1])  # [deg] to [rad]
+        u = np.column_stack((np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)))
+        srfpoint = u / np.sqrt(np.sum((u / radii) ** 2, axis=1))[:, np.newaxis]
+
+    # Outwards surface normal vectors of the ellipsoid (same as srfnrm)
+    nrmvec = srfpoint / radii ** 2
+    nrmvec = nrmvec / np.linalg.norm(nrmvec, axis=1)[:, np.newaxis]
+
+    # Observer position as seen from the srfpoints, for all epochs: (M,N,3)
+    obsvec, _ = trgobsvec(srfpoint, t, target, obs)
+
+    # Angle between the two vectors (same formulation as vsep, numerically
+    # stable for small and large angles)
+    cos = np.sum(obsvec * nrmvec, axis=2)
+    sin = np.linalg.norm(np.cross(obsvec, nrmvec), axis=2)
+    angle = np.degrees(np.arctan2(sin, cos))  # [rad] to [deg]
+
+    if single:
+        return angle.T
+    return angle
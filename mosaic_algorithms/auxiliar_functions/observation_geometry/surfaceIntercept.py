@@ -0,0 +1,58 @@
+import numpy as np
+from conversion_functions import *
+
+
+def surfaceIntercept(target, obs, t, dirs, context=None):
+    """
+    This function returns the surface intercept points of a set of rays
+    emanating from the observer, with the target body modeled as a tri-axial
+    ellipsoid. It is the batched counterpart of sincpt ('ELLIPSOID' method,
+    no aberration corrections, directions in the body-fixed frame): all the
+    rays are intersected at once, in closed form
+
+    Usage: xpoints, found = surfaceIntercept(target, obs, t, dirs, context=context)
+
+    Inputs:
+      target:   string SPICE name of the target body.
+      obs:      string SPICE name of the observer body.
+      t:        time epoch in TDB seconds past J2000 epoch.
+      dirs:     (N,3) or (3,) array of ray directions, expressed in the
+                target body-fixed reference frame.
+      context:  (optional) projectionContext of the same observer, target
+                and epoch, from which the observer position and the body
+                radii are retrieved.
+
+    Outputs:
+      xpoints:  (N,3) array of surface intercept points in the body-fixed
+                reference frame, in [km]. The rays that do not intersect
+                the target body have a zero vector (as in sincpt).
+      found:    (N,) boolean array, True if the ray intersects the target
+                body.
+    """
+    dirs = np.array(dirs, dtype=float).reshape(-1, 3)
+
+    # Observer position in the target body-fixed frame
+    if context is not None:
+        obspos, radii = context.vertex, context.radii
+    else:
+        _, targetframe, _ = mat2py_cnmfrm(target)
+        obspos, _ = mat2py_spkpos(obs, t, targetframe, 'NONE', target)
+        radii = mat2py_bodvrd(target, 'RADII', 3)
+
+    # Scaling the axes by the radii turns the ellipsoid into the unit sphere:
+    # |o + s*d|^2 = 1, with o and d the scaled observer position and ray
+    # directions. The intercept is the nearest root with s >= 0
+    o = obspos / radii
+    d = dirs / radii
+    a = np.sum(d ** 2, axis=1)
+    b = d @ o
+    c = np.dot(o, o) - 1
+    disc = b ** 2 - a * c
+    found = (disc >= 0) & (a > 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        s = (-b - np.sqrt(disc)) / a
+    found &= s >= 0
+
+    xpoints = np.zeros((len(dirs), 3))
+    xpoints[found] = obspos + s[found, np.newaxis] * dirs[found]
+    return xpoints, found
@@ -0,0 +1,162 @@
+import bisect
+
+import numpy as np
+import shapely
+from scipy.optimize import brentq
+from shapely.geometry import MultiPolygon, Polygon, box
+
+from mosaic_algorithms.auxiliar_functions.observation_geometry.emissionang import emissionang
+from mosaic_algorithms.auxiliar_functions.polygon_functions.visibleroi import visibleroi
+
+
+class visibilityIndex:
+    """
+    Visibility windows of a region of interest (ROI) from an observer over a
+    time window. The ROI is sampled (densified boundary and interior points)
+    and the emission angles of the samples are evaluated at a coarse time
+    step; the epochs at which the ROI becomes fully visible, partially
+    visible or not visible at all are refined with a root search. Between
+    those transitions the visibility state is constant, so the planner only
+    needs the exact visible area (visibleroi, limb computation) while the
+    ROI is partially visible. The index is also valid for any subset of the
+    ROI, e.g., its uncovered area.
+
+    Usage:        index = visibilityIndex(roi, target, obs, t0, t1, step, margin)
+                  state = index.state(t)
+                  vroi, inter, flag = index.visibleroi(roi, t)
+
+    Inputs:
+      > roi:          matrix containing the vertices of the ROI polygon, in
+                      latitudinal coordinates [deg]. Several regions are
+                      separated by NaN rows
+      > target:       string name of the target body
+      > obs:          string name of the observer
+      > t0, t1:       time window, in TDB seconds past J2000 epoch
+      > step:         coarse sampling step, in [s]. It is set to 60 s by
+                      default
+      > margin:       emission angle margin of the full visibility and the
+                      non visibility, in [deg]: the ROI is fully visible if
+                      all the samples have emission angles below
+                      90 - margin, and not visible if all of them are above
+                      90 + margin, so that the limb does not cut the ROI
+                      between samples. It is set to 5 deg by default
+
+    Attributes:
+      > transitions:  sorted array of the epochs at which the visibility
+                      state changes
+      > windows:      list of (start, end) epochs in which the ROI is (at
+                      least partially) visible
+      > exact:        number of exact visibleroi computations requested
+                      through the index
+    """
+
+    def __init__(self, roi, target, obs, t0, t1, step=60., margin=5.):
+        self.target, self.obs = target, obs
+        self.t0, self.t1 = float(t0), float(t1)
+        self.margin = margin
+        self.points = roisamples(roi)
+        self.exact = 0
+
+        # Coarse sampling of the extreme emission angles: the ROI is fully
+        # visible if fvisible < 0, and not visible at all if fnone > 0
+        n = max(int(np.ceil((self.t1 - self.t0) / step)), 1) + 1
+        ets = np.linspace(self.t0, self.t1, n)
+        angles = np.atleast_2d(emissionang(self.points, ets, target, obs)).reshape(n, -1)
+        fvisible = np.max(angles, axis=1) - (90 - margin)
+        fnone = np.min(angles, axis=1) - (90 + margin)
+
+        # Root refinement of the sign changes
+        transitions = []
+        for f, fun in ((fvisible, self.fvisible), (fnone, self.fnone)):
+            for k in np.nonzero(np.sign(f[:-1]) * np.sign(f[1:]) < 0)[0]:
+                transitions.append(brentq(fun, ets[k], ets[k + 1], xtol=1e-3))
+        self.transitions = np.sort(transitions)
+
+        # Visibility state in each interval between transitions
+        bounds = np.concatenate(([self.t0], self.transitions, [self.t1]))
+        self.states = [self.evaluate(0.5 * (a + b)) for a, b in zip(bounds[:-1], bounds[1:])]
+        self.windows = []
+        for a, b, state in zip(bounds[:-1], bounds[1:], self.states):
+            if state != 'none':
+                if self.windows and self.windows[-1][1] == a:
+                    self.windows[-1] = (self.windows[-1][0], b)
+                else:
+                    self.windows.append((a, b))
+
+    def fvisible(self, t):
+        return np.max(emissionang(self.points, t, self.target, self.obs)) - (90 - self.margin)
+
+    def fnone(self, t):
+        return np.min(emissionang(self.points, t, self.target, self.obs)) - (90 + self.margin)
+
+    def evaluate(self, t):
+        # Visibility state at epoch t, from the ROI samples
+        if self.fvisible(t) < 0:
+            return 'full'
+        if self.fnone(t) > 0:
+            return 'none'
+        return 'partial'
+
+    def state(self, t):
+        """
+        Visibility state of the ROI at the input epoch
+
+        Usage:        state = index.state(t)
+
+        Outputs:
+          > state:    string 'full' (the whole ROI is visible), 'partial'
+                      or 'none'. None if t is outside of the time window
+        """
+        t = float(np.squeeze(t))
+        if t < self.t0 or t > self.t1:
+            return None
+        return self.states[bisect.bisect_right(self.transitions.tolist(), t)]
+
+    def visibleroi(self, roi, t):
+        """
+        Visible portion of a subset of the ROI (see visibleroi). The limb is
+        only computed if the ROI is partially visible at t (or if t is
+        outside of the time window)
+
+        Usage:        vroi, inter, flag = index.visibleroi(roi, t)
+        """
+        state = self.state(t)
+        if state == 'full':
+            # The limb encloses the ROI: same overlay as visibleroi, with a
+            # polygon that encloses the whole map instead of the limb
+            rings = np.split(roi, np.nonzero(np.isnan(roi[:, 0]))[0])
+            rings = [ring[~np.isnan(ring[:, 0])] for ring in rings]
+            if len(rings) > 1:
+                poly = MultiPolygon([Polygon(ring) for ring in rings]).buffer(0)
+            else:
+                poly = Polygon(rings[0]).buffer(0)
+            inter = poly.intersection(box(-360, -90, 360, 90)).buffer(0)
+            if isinstance(inter, MultiPolygon):
+                vroi = np.vstack([np.vstack((np.array(geom.exterior.coords), [np.nan, np.nan]))
+                                  for geom in inter.geoms])[:-1, :]
+            else:
+                vroi = np.array(inter.exterior.coords)
+            return vroi, inter, vroi.size == 0
+        if state == 'none':
+            return np.empty((0, 2)), Polygon(), True
+        self.exact += 1
+        return visibleroi(roi, t, self.target, self.obs)
+
+    def __repr__(self):
+        return 'visibilityIndex([%s, %s], %d transitions, %d windows, %d exact)' % (
+            self.t0, self.t1, len(self.transitions), len(self.windows), self.exact)
+
+
+def roisamples(roi, n=20):
+    # ROI sample points: vertices, boundary points (n per edge at most) and
+    # interior points (n x n grid), in latitudinal coordinates [deg]
+    rings = np.split(roi, np.nonzero(np.isnan(roi[:, 0]))[0])
+    rings = [ring[~np.isnan(ring[:, 0])] for ring in rings]
+    poly = shapely.union_all([Polygon(ring).buffer(0) for ring in rings if len(ring) > 2])
+    boundary = shapely.segmentize(poly.boundary, max(poly.length / (n * len(rings)) / 4, 1e-3))
+    points = [shapely.get_coordinates(boundary)]
+    xmin, ymin, xmax, ymax = poly.bounds
+    x, y = np.meshgrid(np.linspace(xmin, xmax, n), np.linspace(ymin, ymax, n))
+    inside = shapely.contains_xy(poly, x.ravel(), y.ravel())
+    points.append(np.column_stack((x.ravel()[inside], y.ravel()[inside])))
+    return np.unique(np.vstack(points), axis=0)
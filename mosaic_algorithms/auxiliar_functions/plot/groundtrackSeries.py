@@ -0,0 +1,92 @@
+import numpy as np
+from scipy.interpolate import CubicSpline
+
+from conversion_functions import *
+from mosaic_algorithms.auxiliar_functions.plot.groundtrack import groundtrack
+
+
+class groundtrackSeries:
+    """
+    Spacecraft ground track across the target surface, pre-sampled over a
+    time window. The sub-spacecraft point ('INTERCEPT/ELLIPSOID' method, no
+    aberration corrections) lies on the line from the spacecraft to the
+    target center, so its latitudinal coordinates are those of the
+    spacecraft position direction. The directions are sampled with a single
+    state query and interpolated with a cubic spline, so that ground track
+    positions and velocities are retrieved without any SPICE call. Epochs
+    outside of the window are computed with groundtrack.
+
+    Usage:        track = groundtrackSeries(obs, target, t0, t1, step)
+                  gtlon, gtlat = track(t)
+                  vlon, vlat = track.velocity(t)
+
+    Inputs:
+      > obs:      string SPICE name of the observer body
+      > target:   string SPICE name of the target body
+      > t0:       start of the time window, in TDB seconds past J2000 epoch
+      > t1:       end of the time window, in TDB seconds past J2000 epoch
+      > step:     sampling step, in [s]. It is set to 60 s by default
+    """
+
+    def __init__(self, obs, target, t0, t1, step=60.):
+        self.obs = obs
+        self.target = target
+        self.t0, self.t1 = float(t0), float(t1)
+        n = max(int(np.ceil((self.t1 - self.t0) / step)), 3) + 1
+        self.t = np.linspace(self.t0, self.t1, n)
+
+        # Spacecraft position directions in the body-fixed frame
+        _, tframe, _ = mat2py_cnmfrm(target)  # body-fixed frame
+        obspos, _ = mat2py_spkpos(obs, self.t, tframe, 'NONE', target)
+        u = np.array(obspos).reshape(3, -1).T
+        self.u = u / np.linalg.norm(u, axis=1)[:, np.newaxis]
+        self.spline = CubicSpline(self.t, self.u, axis=0)
+
+    def __call__(self, t):
+        """
+        Ground track position at the input epoch(s)
+
+        Usage:        gtlon, gtlat = track(t)
+
+        Outputs:
+          > gtlon:    longitude coordinate of the observer ground track, in
+                      [deg]. Scalar or array, as the input t
+          > gtlat:    latitude coordinate of the observer ground track, in
+                      [deg]
+        """
+        tt = np.array(t, dtype=float).reshape(-1)
+        inside = (tt >= self.t0) & (tt <= self.t1)
+        u = self.spline(tt)
+        gtlon = np.degrees(np.arctan2(u[:, 1], u[:, 0]))
+        gtlat = np.degrees(np.arctan2(u[:, 2], np.hypot(u[:, 0], u[:, 1])))
+        for k in np.nonzero(~inside)[0]:
+            gtlon[k], gtlat[k] = groundtrack(self.obs, tt[k], self.target)
+        if np.ndim(t) == 0:
+            return gtlon[0], gtlat[0]
+        return gtlon, gtlat
+
+    def velocity(self, t):
+        """
+        Ground track velocity at the input epoch(s), within the time window
+
+        Usage:        vlon, vlat = track.velocity(t)
+
+        Outputs:
+          > vlon:     rate of change of the ground track longitude, in
+                      [deg/s]
+          > vlat:     rate of change of the ground track latitude, in
+                      [deg/s]
+        """
+        tt = np.array(t, dtype=float).reshape(-1)
+        x, y, z = self.spline(tt).T
+        dx, dy, dz = self.spline(tt, 1).T
+        rxy2 = x ** 2 + y ** 2
+        vlon = np.degrees((x * dy - y * dx) / rxy2)
+        vlat = np.degrees((dz * rxy2 - z * (x * dx + y * dy)) / (np.sqrt(rxy2) * (rxy2 + z ** 2)))
+        if np.ndim(t) == 0:
+            return vlon[0], vlat[0]
+        return vlon, vlat
+
+    def __repr__(self):
+        return 'groundtrackSeries(%s, %s, [%s, %s], %d samples)' % (self.obs, self.target, self.t0, self.t1,
+                                                                      len(self.t))
@@ -6,7 +6,7 @@ from mosaic_algorithms.auxiliar_functions.plot.mapPlot import mapPlot
 from mosaic_algorithms.auxiliar_functions.polygon_functions.amsplit import amsplit
 
 
-def plotTour(tour, fplist, roistruct, sc, target, *args):
+def plotTour(tour, fplist, roistruct, sc, target, *args, track=None):
 
     # Pre-allocate variables
     filename = f"../../auxiliar_functions/plot/global-maps/{target.lower()}-map.jpg"
@@ -94,7 +94,10 @@ def plotTour(tour, fplist, roistruct, sc, target, *args):
 
         # Plot ground track
         t = fplist[i]['t']
-        sclon, sclat = groundtrack(sc, t, target)
+        if track is not None:
+            sclon, sclat = track(t)  # interpolated from the pre-sampled ground track
+        else:
+            sclon, sclat = groundtrack(sc, t, target)
         if i > 0:
             h4 = ax.scatter(sclon, sclat, s=8, color='c', marker='o', label='Ground track')
             #plt.pause(0.5)
@@ -4,19 +4,23 @@ import numpy as np
 
 def trgobsvec(srfpoint, t, target, obs, inputframe=None):
     """
-    Distance vector between the target point P and the observer at time t
+    Distance vector between the target point P and the observer at time t. It is broadcast over a
+    set of surface points and epochs, with the observer states fetched once
 
     :param srfpoint: target surface point. It can be input either in latitudinal coordinates (in [deg])
-                     or Cartesian coordinates (in [km]) with respect to the body-fixed reference frame
+                     or Cartesian coordinates (in [km]) with respect to the body-fixed reference frame.
+                     A set of N points can be input as a (N,2) or (N,3) matrix
     :param t: time epoch in TDB seconds past J2000 epoch. It can be either a single point in time or
-              a discretized vector of different time values
+              a discretized vector of M different time values
     :param target: string SPICE name of the target body
     :param obs: string SPICE name of the observer body
     :param frame: string SPICE name of the reference frame with respect to which the vector is going to be
                   expressed. If this variable is not input, the body-fixed reference frame is used by default
     :return: obsvec: observer position vector as seen from the target surface point in the target body-fixed
-                     reference frame, in [km]
-             dist: distance between the observer and the surface point
+                     reference frame, in [km]. For a single surface point, (3,) array (single epoch) or (3,M)
+                     matrix. For a set of N surface points, (M,N,3) array
+             dist: distance between the observer and the surface point. For a single surface point, scalar
+                   (single epoch) or (M,) array. For a set of N surface points, (M,N) matrix
     """
 
     # Target frame
@@ -24,41 +28,37 @@ def trgobsvec(srfpoint, t, target, obs, inputframe=None):
 
     abcorr = 'NONE'  # Assumption: geometric positions, no light aberrations
 
-    # Convert latitudinal coordinates to rectangular if needed
-    if len(srfpoint) == 2:
-        srfpoint = np.radians(srfpoint)  # [deg] to [rad]
-        srfpoint = mat2py_srfrec(mat2py_bodn2c(target)[0], srfpoint[0], srfpoint[1])
-    else:
-            srfpoint = np.array(srfpoint).reshape(3,)
+    srfpoint = np.array(srfpoint, dtype=float)
+    single = srfpoint.ndim == 1 or srfpoint.shape == (3, 1)
+    if single:
+        srfpoint = srfpoint.reshape(1, -1)
 
-    # Compute the observer position as seen from the srfpoint
-    obspos, _ = mat2py_spkpos(obs, t, frame, abcorr, target)
-    if np.size(t) == 1:
-        obsvec = obspos - srfpoint
-    else:
-        obsvec = obspos - srfpoint.reshape(3,1)  # srfpoint-observer distance vector
+    # Convert latitudinal coordinates to rectangular if needed (surface point
+    # on the reference ellipsoid, same as srfrec)
+    if srfpoint.shape[1] == 2:
+        radii = mat2py_bodvrd(target, 'RADII', 3)
+        lon, lat = np.radians(srfpoint[:, 0]), np.radians(srfpoint[:, 1])  # [deg] to [rad]
+        u = np.column_stack((np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)))
+        srfpoint = u / np.sqrt(np.sum((u / radii) ** 2, axis=1))[:, np.newaxis]
 
-    # If a different reference frame is requested
+    # Compute the observer position as seen from the srfpoints, for all
+    # epochs at once: (M,N,3) srfpoint-observer distance vectors
+    ets = np.array(t, dtype=float).reshape(-1)
+    obspos, _ = mat2py_spkpos(obs, ets if len(ets) > 1 else ets[0], frame, abcorr, target)
+    obspos = np.array(obspos).reshape(3, -1).T
+    obsvec = obspos[:, np.newaxis, :] - srfpoint[np.newaxis, :, :]
+
+    # If a different reference frame is requested, rotate the vectors of each
+    # epoch with its rotation matrix from the body-fixed reference frame
     if inputframe:
-        # Process each time point if t is an array of times
-        if np.size(t) > 1:
-            # Initialize a rotation matrix list
-            rotmat_list = [mat2py_pxform(frame, inputframe, time_point) for time_point in t] # rotation matrix from body-fixed reference frame to the requested one
-            # Apply rotation for each time point
-            for i, rotmat in enumerate(rotmat_list):
-                # Ensure obsvec[:, i] is a 3D vector
-                obsvec[:,i] = np.dot(rotmat, obsvec[:,i])
-        else:
-            # Process a single time point
-            rotmat = mat2py_pxform(frame, inputframe, t)
-            obsvec = np.dot(rotmat, obsvec)
+        rotmat = np.array([mat2py_pxform(frame, inputframe, time_point) for time_point in ets])
+        obsvec = np.einsum('mij,mnj->mni', rotmat, obsvec)
 
     # Compute distance
-    if np.size(t) >1:
-        dist = np.zeros(obsvec.shape[1])
-        for i in range(obsvec.shape[1]):
-            dist[i] = np.linalg.norm(obsvec[:,i])
-    else:
-        dist = np.linalg.norm(obsvec)
+    dist = np.linalg.norm(obsvec, axis=2)
 
+    if single:
+        if np.size(t) == 1:
+            return obsvec[0, 0], dist[0, 0]
+        return obsvec[:, 0].T, dist[:, 0]
     return obsvec, dist
@@ -3,20 +3,27 @@ import math
 from geopy.distance import geodesic
 from mosaic_algorithms.auxiliar_functions.polygon_functions.sortcw import  sortcw
 
-def interppolygon(roi0):
+def interppolygon(roi0, tol=None):
     """
     This function interpolates a polygon defined by longitude and latitude
     points. The interpolation distance is defined according to the minimum
-    Euclidean distance between the points that enclose the polygon
+    Euclidean distance between the points that enclose the polygon. If a
+    tolerance is provided, the polygon is only densified where the great
+    circle arcs between consecutive points deviate from the straight
+    segments in latitudinal coordinates by more than the tolerance (so that
+    the vertex count does not grow with repeated interpolations)
 
     Programmers:  Paula Betriu (UPC/ESEIAAT)
     Date:         1/2024
 
     Usage:        roi = interppolygon(roi0)
+                  roi = interppolygon(roi0, tol)
 
     Input:
       > roi0:     A Nx2 matrix where each row represents a point in 2D space,
                   typically [longitude, latitude]
+      > tol:      (optional) maximum deviation between the great circle
+                  arcs and the polygon segments, in [deg]
 
     Output:
       > roi:      Updated roi with interpolated coordinates
@@ -52,7 +59,10 @@ def interppolygon(roi0):
             # on the minimum distance found
             latd = lat[from_idx:to]
             lond = lon[from_idx:to]
-            auxlat, auxlon = interpm(latd, lond, math.ceil(epsilon / 2), 'gc')
+            if tol is not None:
+                auxlat, auxlon = gcdensify(latd, lond, tol)
+            else:
+                auxlat, auxlon = interpm(latd, lond, math.ceil(epsilon / 2), 'gc')
             newlat.extend(auxlat)
             newlat.append(np.nan)
             newlon.extend(auxlon)
@@ -61,7 +71,10 @@ def interppolygon(roi0):
     else:
         # Perform great circles interpolation of the latitude and longitude based
         # on the minimum distance found
-        newlat, newlon = interpm(lat, lon, math.ceil(epsilon / 2), 'gc')
+        if tol is not None:
+            newlat, newlon = gcdensify(lat, lon, tol)
+        else:
+            newlat, newlon = interpm(lat, lon, math.ceil(epsilon / 2), 'gc')
 
     # Update the roi array with the interpolated latitude and longitude values
     roi = np.column_stack((newlon, newlat))
@@ -127,3 +140,36 @@ def interpm(lat, lon, maxdiff, method='gc'):
     return latout, lonout
 
 
+def gcdensify(lat, lon, tol, depth=8):
+    # Great circle interpolation of the polygon segments whose arc deviates
+    # more than tol [deg] from the straight segment (recursive bisection)
+    latout = [lat[0]]
+    lonout = [lon[0]]
+    for i in range(1, len(lat)):
+        for p in gcsplit((lon[i - 1], lat[i - 1]), (lon[i], lat[i]), tol, depth):
+            lonout.append(p[0])
+            latout.append(p[1])
+    return latout, lonout
+
+
+def gcsplit(p, q, tol, depth):
+    # Points of the segment (p, q] bisected along the great circle arc
+    if depth == 0 or abs(q[0] - p[0]) > 180:
+        return [q]
+    vp = lonlat2vec(p)
+    vq = lonlat2vec(q)
+    v = vp + vq
+    if np.linalg.norm(v) < 1e-12:
+        return [q]
+    v = v / np.linalg.norm(v)
+    m = (math.degrees(math.atan2(v[1], v[0])), math.degrees(math.asin(np.clip(v[2], -1, 1))))
+    if abs(m[0] - (p[0] + q[0]) / 2) > 180:
+        m = (m[0] - 360 * np.sign(m[0]), m[1])
+    if math.hypot(m[0] - (p[0] + q[0]) / 2, m[1] - (p[1] + q[1]) / 2) <= tol:
+        return [q]
+    return gcsplit(p, m, tol, depth - 1) + gcsplit(m, q, tol, depth - 1)
+
+
+def lonlat2vec(p):
+    lon, lat = math.radians(p[0]), math.radians(p[1])
+    return np.array([math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat)])
@@ -0,0 +1,27 @@
+import shapely
+
+
+def simplifypolygon(poly, tol):
+    """
+    This function reduces the number of vertices of a polygon in latitudinal
+    coordinates, e.g., the uncovered area of the region of interest after
+    successive footprint subtractions: the polygon is simplified preserving
+    its topology, and its vertices are snapped to a grid of the same
+    tolerance (which merges the near-coincident vertices and slivers left by
+    the footprint boundaries)
+
+    Usage:        poly, nvertices = simplifypolygon(poly, tol)
+
+    Inputs:
+      > poly:         shapely Polygon or MultiPolygon
+      > tol:          simplification and snapping tolerance, in [deg]. It
+                      is typically tied to the footprint size
+
+    Outputs:
+      > poly:         simplified (valid) polygon
+      > nvertices:    number of vertices of the simplified polygon
+    """
+    if tol is not None and tol > 0 and not poly.is_empty:
+        poly = shapely.simplify(poly, tol, preserve_topology=True)
+        poly = shapely.set_precision(poly, tol)
+    return poly, int(shapely.get_num_coordinates(poly))
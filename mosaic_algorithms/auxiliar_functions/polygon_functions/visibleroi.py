@@ -73,18 +73,11 @@ def visibleroi(roi_, et, target, obs):
     # 2.- Sub-spacecraft point is not located at equator. In this case, limb's
     # longitude may be > 180º (and includes the north/south poles).
 
-    northpole = False
-    southpole = False
-    # Check north-pole
-    srfpoint = np.array([0, 90])
-    angle = emissionang(srfpoint, et, target, obs)
-    if angle < 90:
-        northpole = True
-    # Check south-pole
-    srfpoint = np.array([0, -90])
-    angle = emissionang(srfpoint, et, target, obs)
-    if angle < 90:
-        southpole = True
+    # Check north-pole and south-pole
+    srfpoint = np.array([[0, 90], [0, -90]])
+    angle = emissionang(srfpoint, et, target, obs)[0]
+    northpole = bool(angle[0] < 90)
+    southpole = bool(angle[1] < 90)
 
     # Case 1
     if not northpole and not southpole:
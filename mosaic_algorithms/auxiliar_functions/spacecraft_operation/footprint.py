@@ -410,18 +410,11 @@ def footprint(t, inst, sc, target, res, *args):
             # 2.- Sub-spacecraft point is not located at the equator. In this case, the limb's
             # longitude may be > 180º (and includes the north/south poles).
 
-            northpole = False
-            southpole = False
-            # Check north-pole
-            srfpoint = np.array([0, 90])
-            angle = emissionang(srfpoint, t, target, sc)
-            if angle < 90:
-                northpole = True
-            # Check south-pole
-            srfpoint = np.array([0, -90])
-            angle = emissionang(srfpoint, t, target, sc)
-            if angle < 90:
-                southpole = True
+            # Check north-pole and south-pole
+            srfpoint = np.array([[0, 90], [0, -90]])
+            angle = emissionang(srfpoint, t, target, sc)[0]
+            northpole = bool(angle[0] < 90)
+            southpole = bool(angle[1] < 90)
 
             # Case 1.
             if not northpole and not southpole:
@@ -522,10 +515,8 @@ def footprint(t, inst, sc, target, res, *args):
         elif fp['limb'] == 'partial':
             lblon = copy.deepcopy(vertices[:,0])
             lblat = copy.deepcopy(vertices[:,1])
-            # Check north-pole visibility:
-            northpole = fovray(inst, target, sc, t, 0, 90, fp['olon'], fp['olat'])
-            # Check south-pole visibility:
-            southpole = fovray(inst, target, sc, t, 0, -90, fp['olon'], fp['olat'])
+            # Check north-pole and south-pole visibility:
+            northpole, southpole = fovray(inst, target, sc, t, [0, 0], [90, -90], fp['olon'], fp['olat'])[0]
             # Case 1.
             if not northpole and not southpole:
                 lblon, lblat = amsplit(lblon, lblat)
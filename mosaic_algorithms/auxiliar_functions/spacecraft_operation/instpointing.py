@@ -11,6 +11,7 @@ from conversion_functions.mat2py_sincpt import mat2py_sincpt
 from conversion_functions.mat2py_reclat import mat2py_reclat
 from conversion_functions.mat2py_dpr    import mat2py_dpr
 from conversion_functions.mat2py_et2utc import mat2py_et2utc
+from conversion_functions.mat2py_bodvrd import mat2py_bodvrd
 
 def instpointing(inst, target, sc, t, *args):
     """
@@ -27,6 +28,9 @@ def instpointing(inst, target, sc, t, *args):
                   [fovbounds, boresight, rotmat, visible, lon, lat] = instorient(inst,
                       target, sc, t)
 
+                  See pointingstack for the pointing at N aim points at
+                  once
+
     Inputs:
       > inst:       string name of the instrument
       > target:     string name of the target body
@@ -156,3 +160,67 @@ def instpointing(inst, target, sc, t, *args):
         return fovbounds, boresight, rotmat, visible
     else:
         return fovbounds, boresight, rotmat, visible, lon, lat
+
+
+def pointingstack(inst, target, sc, t, lon, lat):
+    """
+    3-axis pointing of the instrument at N aim points (see instpointing).
+    The FOV is retrieved once, the observer states with a single query,
+    and the pointing matrices are built with array operations. It is the
+    batch counterpart of instpointing used by the slew durations (see
+    slewDur) and the multi-epoch FOV checks (see fovray)
+
+    Usage:        [fovbounds, boresight, rotmat, visible] = pointingstack(inst,
+                      target, sc, t, lon, lat)
+
+    Inputs:
+      > t:          observation time, or array of N observation times (one
+                    per aim point), in TDB seconds past J2000
+      > lon, lat:   arrays of N aim point coordinates, in [deg]. Other
+                    inputs as in instpointing
+
+    Returns:
+      > fovbounds:  (N,3,k) FOV bounds in the body-fixed reference frame
+      > boresight:  (N,3) FOV boresights in the body-fixed reference frame
+      > rotmat:     (N,3,3) rotation matrices from instrument frame to
+                    target frame
+      > visible:    (N,) booleans, True if the point is visible from the
+                    instrument's FOV
+    """
+    lon = np.radians(np.array(lon, dtype=float).reshape(-1))
+    lat = np.radians(np.array(lat, dtype=float).reshape(-1))
+    _, targetframe, _ = mat2py_cnmfrm(target)  # target frame ID in SPICE
+    shape, _, _, bounds = mat2py_getfov((mat2py_bodn2c(inst))[0], 4)
+    if shape in ["CIRCLE", "ELLIPSE"]:
+        raise ValueError("Circular and ellipsoidal FOV shapes have not been implemented yet")
+
+    # Rectangular coordinates of the target points (same as srfrec) and of
+    # the instrument, in the body-fixed reference frame
+    radii = mat2py_bodvrd(target, 'RADII', 3)
+    u = np.column_stack((np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)))
+    recpoint = u / np.sqrt(np.sum((u / radii) ** 2, axis=1))[:, np.newaxis]
+    t = np.array(t, dtype=float).reshape(-1)
+    instpos, _ = mat2py_spkpos(sc, t[0] if len(t) == 1 else t, targetframe, 'LT', target)
+    v1 = recpoint - np.reshape(np.transpose(instpos), (-1, 3))  # (3,N) positions if there are N epochs
+    boresight = v1 / np.linalg.norm(v1, axis=1)[:, np.newaxis]
+
+    rotmat = pointingrotation(boresight)
+
+    fovbounds = rotmat @ np.array(bounds).reshape(3, -1)
+    visible = np.sum(v1 * recpoint, axis=1) <= 0  # visible as seen from the instrument
+    return fovbounds, boresight, rotmat, visible
+
+
+def pointingrotation(boresight):
+    # Rotation matrices (N,3,3) from the instrument frame to the target frame
+    # of a 3-axis steerable instrument with the input (N,3) boresights (same
+    # construction as in instpointing)
+    # Reference vector (celestial north, or the y-axis if the boresight is
+    # aligned with it)
+    reference_vector = np.tile([0., 0., 1.], (len(boresight), 1))
+    reference_vector[np.abs(boresight[:, 2]) > 0.999] = [0., 1., 0.]
+    yinst = np.cross(boresight, reference_vector)
+    yinst = yinst / np.linalg.norm(yinst, axis=1)[:, np.newaxis]
+    xinst = np.cross(yinst, boresight)
+    xinst = xinst / np.linalg.norm(xinst, axis=1)[:, np.newaxis]
+    return np.stack((xinst, yinst, boresight), axis=2)
@@ -5,7 +5,9 @@ import copy
 from conversion_functions import mat2py_et2utc
 from mosaic_algorithms.auxiliar_functions.spacecraft_operation.footprint import footprint
 from mosaic_algorithms.auxiliar_functions.spacecraft_operation.slewDur import slewDur
-def processObservation(A, tour, fpList, poly1, t, slewRate, tobs, amIntercept, inst, sc, target, resolution):
+from mosaic_algorithms.auxiliar_functions.polygon_functions.simplifypolygon import simplifypolygon
+def processObservation(A, tour, fpList, poly1, t, slewRate, tobs, amIntercept, inst, sc, target, resolution,
+                       tol=None, pipeline=None):
     """
     This function handles the processing of an observation point by computing
     its footprint, updating the list of completed observations and adjusting
@@ -46,6 +48,13 @@ def processObservation(A, tour, fpList, poly1, t, slewRate, tobs, amIntercept, i
                      footprint calculation. It could be either 'lowres' or
                      'highres'. See footprint function for further
                      information
+     > tol:          (keyword) simplification tolerance of the uncovered
+                     area, in [deg] (see simplifypolygon). Default: None
+                     (the uncovered area is not simplified)
+     > pipeline:     (keyword) observationPipeline from which the
+                     speculative footprint and slew time are taken, if
+                     they have been computed for this observation.
+                     Default: None
 
     Returns:
       > A, tour, fpList, poly1, t: updated variables
@@ -69,7 +78,9 @@ def processObservation(A, tour, fpList, poly1, t, slewRate, tobs, amIntercept, i
 
     # Compute the observation's footprint
     print(f"Computing {inst} FOV projection on {target} at {mat2py_et2utc(t, 'C', 0)}...")
-    fprinti = footprint(t, inst, sc, target, resolution, a[0], a[1], 0)
+    fprinti = pipeline.footprint(t, a) if pipeline is not None else None
+    if fprinti is None:
+        fprinti = footprint(t, inst, sc, target, resolution, a[0], a[1], 0)
     # Body-fixed to inertial frame
     if np.size(fprinti['bvertices']) != 0:  # assuming 'fprinti' is a dictionary with 'bvertices' key
         print("\n")
@@ -114,6 +125,9 @@ def processObservation(A, tour, fpList, poly1, t, slewRate, tobs, amIntercept, i
 
         A.append(a)  # add it in the list of planned observations
         poly1 = (poly1.difference(poly2)).buffer(0)  # update uncovered area
+        if tol is not None:
+            poly1, nvertices = simplifypolygon(poly1, tol)  # vertex budget of the uncovered area
+            print(f"Uncovered area: {nvertices} vertices")
 
         # Save footprint struct
         fpList.append(fprinti)
@@ -122,7 +136,10 @@ def processObservation(A, tour, fpList, poly1, t, slewRate, tobs, amIntercept, i
         if len(tour)!= 0:
             p1 = [fprinti['olon'], fprinti['olat']]
             p2 = [tour[0][0], tour[0][1]]
-            t += tobs + slewDur(p1, p2, t, tobs, inst, target, sc, slewRate)
+            slew = pipeline.slew(t, a, p2) if pipeline is not None else None
+            if slew is None:
+                slew = slewDur(p1, p2, t, tobs, inst, target, sc, slewRate)
+            t += tobs + slew
     else:
         empty = True
         print(" Surface not reachable\n")
@@ -0,0 +1,78 @@
+import numpy as np
+
+from conversion_functions.mat2py_cnmfrm import mat2py_cnmfrm
+from conversion_functions.mat2py_spkpos import mat2py_spkpos
+from conversion_functions.mat2py_bodvrd import mat2py_bodvrd
+from mosaic_algorithms.auxiliar_functions.spacecraft_operation.instpointing import instpointing
+
+
+class projectionContext:
+    """
+    Geometry of the instrument focal plane at a given epoch and pointing,
+    shared by the projection functions (topo2inst, inst2topo, fovray...).
+    The instrument pointing (rotation matrix and FOV bounds), the observer
+    position and the focal plane are resolved once, so that the successive
+    projections at the same (et, lon, lat) do not repeat the SPICE queries.
+
+    Usage:        context = projectionContext(inst, sc, target, et, lon, lat)
+                  targetArea = topo2inst(roi, lon, lat, target, sc, inst, et, context=context)
+
+    Inputs:
+      > inst:         string name of the instrument
+      > sc:           string name of the spacecraft
+      > target:       string name of the target body
+      > et:           ephemeris time, TDB seconds past J2000 epoch
+      > lon:          longitude coordinate of the target body at which the
+                      instrument boresight is pointing, in [deg]
+      > lat:          latitude coordinate of the target body at which the
+                      instrument boresight is pointing, in [deg]
+
+    Attributes:
+      > fovbounds:    FOV bounds in the body-fixed reference frame (see
+                      instpointing)
+      > boresight:    FOV boresight in the body-fixed reference frame
+      > rotmat:       rotation matrix from instrument frame to target frame
+      > visible:      boolean that determines if the pointing point is
+                      visible from the instrument's FOV
+      > targetframe:  string name of the target body-fixed frame
+      > vertex:       observer position in the body-fixed reference frame,
+                      in [km]
+      > point:        point of the focal plane (vertex + first FOV bound)
+      > radii:        radii of the target body tri-axial ellipsoid, in [km]
+    """
+
+    def __init__(self, inst, sc, target, et, lon, lat):
+        self.key = (inst, sc, target, float(np.squeeze(et)), float(np.squeeze(lon)), float(np.squeeze(lat)))
+        self.fovbounds, self.boresight, self.rotmat, self.visible = instpointing(inst, target, sc, et, lon, lat)
+        _, self.targetframe, _ = mat2py_cnmfrm(target)  # target frame ID in SPICE
+        self.vertex, _ = mat2py_spkpos(sc, et, self.targetframe, 'NONE', target)
+        self.point = self.vertex + self.fovbounds[:, 0]
+        self.radii = mat2py_bodvrd(target, 'RADII', 3)
+
+    def matches(self, inst, sc, target, et, lon, lat):
+        """
+        Check if the context has been built for the input instrument,
+        spacecraft, target, epoch and pointing
+
+        Usage:        match = context.matches(inst, sc, target, et, lon, lat)
+        """
+        return self.key == (inst, sc, target, float(np.squeeze(et)), float(np.squeeze(lon)), float(np.squeeze(lat)))
+
+    @staticmethod
+    def get(context, inst, sc, target, et, lon, lat):
+        """
+        Return the input context if it matches the input geometry, or a new
+        one otherwise (e.g., if context is None)
+
+        Usage:        context = projectionContext.get(context, inst, sc, target, et, lon, lat)
+        """
+        if context is not None and context.matches(inst, sc, target, et, lon, lat):
+            return context
+        return projectionContext(inst, sc, target, et, lon, lat)
+
+    def instbounds(self):
+        # FOV bounds in the instrument frame
+        return self.rotmat.T @ self.fovbounds
+
+    def __repr__(self):
+        return 'projectionContext(%s, %s, %s, et=%s, lon=%s, lat=%s)' % self.key
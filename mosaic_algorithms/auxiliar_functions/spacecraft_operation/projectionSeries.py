@@ -0,0 +1,126 @@
+import copy
+
+import numpy as np
+
+from mosaic_algorithms.auxiliar_functions.spacecraft_operation.instpointing import pointingrotation
+from mosaic_algorithms.auxiliar_functions.spacecraft_operation.projectionContext import projectionContext
+
+
+class projectionSeries:
+    """
+    Time series of the projection geometry (projectionContext) of an
+    instrument pointing at a fixed point, e.g., the ROI centroid in the
+    online frontier repair. The geometry is computed exactly at epochs
+    spaced by a fixed step across the planning window (only the ones that
+    are needed, and only once), and it is interpolated in between: the
+    observer position and the boresight are interpolated with a quadratic
+    polynomial and the pointing matrix is rebuilt from the boresight. The
+    interpolation error is estimated from the difference with the cubic
+    interpolant; if it is above the tolerance, the exact geometry is
+    computed instead.
+
+    Usage:        series = projectionSeries(inst, sc, target, lon, lat, t0, step, tol)
+                  context = series.context(et)
+                  targetArea = topo2inst(roi, lon, lat, target, sc, inst, et, context=context)
+
+    Inputs:
+      > inst:         string name of the instrument
+      > sc:           string name of the spacecraft
+      > target:       string name of the target body
+      > lon, lat:     latitudinal coordinates of the point of the target
+                      body at which the instrument boresight is pointing,
+                      in [deg]
+      > t0:           start of the planning window, in TDB seconds past
+                      J2000 epoch
+      > step:         sampling step, in [s]. It is set to 300 s by default
+      > tol:          tolerance of the interpolation error, in [rad] (angle
+                      subtended by the errors of the observer position and
+                      the boresight). It is set to 1e-7 rad by default
+
+    Attributes:
+      > hits:         number of interpolated contexts
+      > misses:       number of contexts computed exactly because of the
+                      error estimate
+      > samples:      dict of the exactly computed contexts, indexed by
+                      sample number
+    """
+
+    def __init__(self, inst, sc, target, lon, lat, t0, step=300., tol=1e-7):
+        self.inst, self.sc, self.target = inst, sc, target
+        self.lon, self.lat = lon, lat
+        self.t0, self.step, self.tol = float(t0), float(step), tol
+        self.samples = {}
+        self.hits = 0
+        self.misses = 0
+
+    def sample(self, k):
+        # Exact context at the k-th sample epoch
+        if k not in self.samples:
+            self.samples[k] = projectionContext(self.inst, self.sc, self.target, self.t0 + k * self.step,
+                                                self.lon, self.lat)
+        return self.samples[k]
+
+    def context(self, et):
+        """
+        Projection context at the input epoch, interpolated from the
+        sampled epochs when the error estimate allows it
+
+        Usage:        context = series.context(et)
+        """
+        et = float(np.squeeze(et))
+        s = (et - self.t0) / self.step
+        k = int(np.floor(s))
+        if s == k:
+            return self.sample(k)
+
+        # Quadratic interpolant on the three nearest samples and cubic
+        # interpolant on the four samples around the epoch
+        nodes = [k - 1, k, k + 1, k + 2]
+        quad = nodes[:3] if s - k < 0.5 else nodes[1:]
+        vertex = np.array([self.sample(n).vertex for n in nodes])
+        boresight = np.array([self.sample(n).boresight for n in nodes])
+        v2, b2 = lagrange(s, quad, vertex[[nodes.index(n) for n in quad]]), \
+            lagrange(s, quad, boresight[[nodes.index(n) for n in quad]])
+        v3, b3 = lagrange(s, nodes, vertex), lagrange(s, nodes, boresight)
+
+        # Error estimate, as the angle subtended by the position and boresight
+        # differences
+        error = np.linalg.norm(v3 - v2) / np.linalg.norm(v2) + np.linalg.norm(b3 - b2)
+        if error > self.tol:
+            self.misses += 1
+            return projectionContext(self.inst, self.sc, self.target, et, self.lon, self.lat)
+        self.hits += 1
+
+        # Interpolated context: the pointing matrix is rebuilt from the
+        # boresight, and the FOV bounds are rotated from the instrument frame
+        ref = self.sample(k)
+        context = copy.copy(ref)
+        context.key = (self.inst, self.sc, self.target, et, float(np.squeeze(self.lon)), float(np.squeeze(self.lat)))
+        context.boresight = b2 / np.linalg.norm(b2)
+        context.rotmat = pointingrotation(context.boresight.reshape(1, 3))[0]
+        context.fovbounds = context.rotmat @ ref.instbounds()
+        context.vertex = v2
+        context.point = context.vertex + context.fovbounds[:, 0]
+
+        # Visibility of the pointing point from the interpolated position
+        # (same test as instpointing)
+        lon, lat = np.radians(float(np.squeeze(self.lon))), np.radians(float(np.squeeze(self.lat)))
+        u = np.array([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+        recpoint = u / np.sqrt(np.sum((u / np.reshape(ref.radii, 3)) ** 2))
+        context.visible = bool(np.dot(recpoint - v2, recpoint) <= 0)
+        return context
+
+    def __repr__(self):
+        return 'projectionSeries: %d samples, %d hits, %d misses' % (len(self.samples), self.hits, self.misses)
+
+
+def lagrange(s, nodes, values):
+    # Lagrange polynomial through (nodes, values), evaluated at s
+    result = np.zeros(np.shape(values)[1:])
+    for i, ni in enumerate(nodes):
+        w = 1.
+        for j, nj in enumerate(nodes):
+            if j != i:
+                w *= (s - nj) / (ni - nj)
+        result = result + w * values[i]
+    return result
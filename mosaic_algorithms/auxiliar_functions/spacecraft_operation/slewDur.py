@@ -1,5 +1,5 @@
 import numpy as np
-from mosaic_algorithms.auxiliar_functions.spacecraft_operation.instpointing import instpointing
+from mosaic_algorithms.auxiliar_functions.spacecraft_operation.instpointing import pointingstack
 def slewDur(p1, p2, t, tobs, inst, target, sc, slew_rate):
     """
     This function determines the time it takes for a spacecraft or an
@@ -38,15 +38,18 @@ def slewDur(p1, p2, t, tobs, inst, target, sc, slew_rate):
     maxit = 10
     epsilon = 1e-2
 
-    # Rotation matrix corresponding to the initial pointing direction using the
-    # instrument pointing information
-    _, _, R1, _ = instpointing(inst, target, sc, t, p1[0], p1[1])
-
     # Initial slew duration
     init_slew = 10.
+
+    # Rotation matrices corresponding to the initial pointing direction and to
+    # the first estimate of the final one, using the instrument pointing
+    # information (both in a single batch)
+    _, _, R, _ = pointingstack(inst, target, sc, [t, t + tobs + init_slew], [p1[0], p2[0]], [p1[1], p2[1]])
+    R1, R2 = R[0], R[1]
     for i in range(maxit):
         # Get final pointing matrix
-        _, _, R2, _ = instpointing(inst, target, sc, t + tobs + init_slew, p2[0], p2[1])
+        if i > 0:
+            R2 = pointingstack(inst, target, sc, t + tobs + init_slew, p2[0], p2[1])[2][0]
 
         # Relative rotation matrix between the two positions
         Rdelta = np.transpose(R1) @ R2
@@ -1,17 +1,26 @@
 import numpy as np
 import copy
+import time
+import warnings
 from shapely.geometry import MultiPolygon, Polygon
 
 from conversion_functions import mat2py_et2utc
 from mosaic_algorithms.auxiliar_functions.polygon_functions.visibleroi import visibleroi
+from mosaic_algorithms.auxiliar_functions.observation_geometry.visibilityIndex import visibilityIndex
 from mosaic_algorithms.auxiliar_functions.polygon_functions.interppolygon import interppolygon
 from mosaic_algorithms.sidewinder.planSidewinderTour import planSidewinderTour
 from mosaic_algorithms.auxiliar_functions.spacecraft_operation.footprint import footprint
 from mosaic_algorithms.auxiliar_functions.spacecraft_operation.processObservation import processObservation
 from mosaic_algorithms.auxiliar_functions.polygon_functions.sortcw import sortcw
+from mosaic_algorithms.auxiliar_functions.spacecraft_operation.projectionSeries import projectionSeries
 from mosaic_algorithms.online_frontier_repair.updateGrid import updateGrid
+from mosaic_algorithms.online_frontier_repair.frontierRepairState import frontierRepairState
+from mosaic_algorithms.online_frontier_repair.observationPipeline import observationPipeline
 
-def frontierRepair(startTime, endTime, tobs, inst, sc, target, inroi, olapx, olapy, slewRate, *args):
+def frontierRepair(startTime, endTime, tobs, inst, sc, target, inroi, olapx, olapy, slewRate, *args,
+                   coverage='exact', cache=None, fill='floodfill', search=None, track=None,
+                   reproject='full', projection='exact', simplify=None, visibility=None, pipeline=False,
+                   budget=None, hint=None):
     """
     This function adjusts the observation grid and planning tour in response
     to new observations. It takes into account changes in observation
@@ -51,6 +60,99 @@ def frontierRepair(startTime, endTime, tobs, inst, sc, target, inroi, olapx, ola
       > resolution:   string 'lowres' or 'highres' that determines the
                       footprint resolution calculation. It's set to 'lowres'
                       by default
+      > coverage:     (keyword) string 'exact' or 'raster' that determines
+                      how the tile coverage fractions are evaluated in the
+                      grid discretization and update: with polygon
+                      operations ('exact', default) or from a raster of the
+                      projected ROI, which is the fast path for large grids.
+                      A number sets the raster mode with that number of
+                      pixels per footprint side instead of the default one
+                      (32 pixels, see coverageRaster)
+      > cache:        (keyword) plannerCache object shared across calls
+                      (e.g., sweeps over the initial observation time). The
+                      initial Sidewinder grid and tour are reused from a
+                      previous call when the projected ROI has barely
+                      changed. Default: None
+      > fill:         (keyword) grid discretization algorithm, 'floodfill'
+                      (default) or 'multires' (coarse-to-fine, recommended
+                      for very large ROIs). See grid2D
+      > search:       (keyword) dict with the options of the grid origin and
+                      orientation search of the initial grid (see
+                      gridSearch). Only the grid origin is searched: the
+                      grid updates assume footprints aligned with the
+                      instrument axes, so non-zero 'angles' raise a
+                      ValueError. Default: None (grid seeded at the ROI
+                      centroid)
+      > track:        (keyword) groundtrackSeries of the spacecraft shared
+                      across calls, used to decide the initial sweep
+                      direction without SPICE calls. Default: None
+      > reproject:    (keyword) tour reprojection after each observation,
+                      'full' (default: the whole remaining tour is
+                      reprojected to topographical coordinates) or
+                      'incremental' (only the new tiles and those close to
+                      the limb are reprojected; the others keep their
+                      topographical coordinates while their drift is below
+                      a tolerance). A dict sets the incremental mode with
+                      the 'drift' (fraction of the footprint size) and
+                      'limb' (emission angle, in deg) thresholds. See
+                      updateGrid
+      > projection:   (keyword) projection geometry of the ROI at each
+                      iteration, 'exact' (default: computed from SPICE at
+                      every observation) or 'interpolated' (interpolated
+                      from a time series sampled across the planning window,
+                      with exact recomputation when the error estimate is
+                      above tolerance). A number sets the interpolated mode
+                      with that tolerance, in [rad]. See projectionSeries
+      > simplify:     (keyword) vertex budget of the uncovered area: the
+                      uncovered area is simplified after each observation,
+                      and the ROI is only densified where the great circle
+                      arcs require it, with a tolerance equal to this
+                      fraction of the footprint size (e.g., 0.01). See
+                      simplifypolygon and interppolygon. Default: None (no
+                      simplification)
+      > visibility:   (keyword) visibilityIndex of the ROI over the planning
+                      horizon (it may be shared across calls), or 'index' to
+                      build it over [startTime, endTime]. The visible area
+                      of the ROI is only computed (limb projection) while
+                      the ROI is partially visible. Default: None (the
+                      visible area is computed at every observation)
+      > pipeline:     (keyword) boolean. If True, the footprint of the next
+                      observation and the slew time to the following one
+                      are computed in a background SPICE worker process
+                      while the grid is updated, and used if the tour has
+                      kept the next point (see observationPipeline). The
+                      output is identical to the sequential mode. It
+                      requires reproject='incremental': the full
+                      reprojection moves every tour point, so that no
+                      speculative result is ever used (a warning is
+                      issued). Default: False
+      > budget:       (keyword) wall-clock budget of the planning, in
+                      seconds: a dict with the keys 'step' (budget of each
+                      observation step) and/or 'total' (budget of the whole
+                      call), or a number (total budget). When a step takes
+                      more than 80% of the step budget (or the remaining
+                      total budget is below it), the following steps are
+                      degraded to cheaper approximations: 'lowres'
+                      footprints, 'raster' tile coverage and the visible
+                      area of the previous step (no limb projection). The
+                      exact computations are retried after 5 degraded
+                      steps, unless the total budget is running out. The
+                      total budget includes the initial planning (and
+                      bounds its grid search); it is checked before the
+                      initial planning and before each step, which are
+                      not interrupted. When it is exhausted, the plan
+                      computed so far is returned. The footprints of
+                      fpList get a 'degraded' field. Default: None (no
+                      budget)
+      > hint:         (keyword) dict with the initial plan (grid, tour and
+                      sweeping directions) of a previous call, e.g., the
+                      previous initial time of a sweep. The initial grid and
+                      tour are seeded by shifting the previous plan to the
+                      current projection of the ROI, and only planned from
+                      scratch if it fails the feasibility checks (see
+                      warmStart). The dict is updated in place with the
+                      initial plan of this call, so the same dict (empty at
+                      first) can be passed along the sweep. Default: None
 
     Outputs:
       > A:            cell matrix of successive instrument observations,
@@ -65,17 +167,52 @@ def frontierRepair(startTime, endTime, tobs, inst, sc, target, inroi, olapx, ola
     Trowbridge, M. and Chien, S. (2018). Area coverage planning with 3-axis
     steerable, 2D framing sensors.
     """
+    if isinstance(reproject, dict):
+        if not set(reproject) <= {'drift', 'limb'}:
+            raise ValueError("reproject options must be 'drift' and/or 'limb'")
+        reprojopts, reproject = reproject, 'incremental'
+    elif reproject in ('full', 'incremental'):
+        reprojopts = {}
+    else:
+        raise ValueError("reproject must be 'full', 'incremental' or a dict of incremental options")
+    if pipeline and reproject != 'incremental':
+        warnings.warn("pipeline=True has no effect with reproject='full': the speculative footprints are computed "
+                      "for tour points that the full reprojection moves. Use reproject='incremental'")
+    if search is not None and any(angle != 0 for angle in search.get('angles', (0.,))):
+        raise ValueError("search angles must be 0: the grid updates do not model the instrument roll")
+    if isinstance(visibility, str):
+        if visibility != 'index':
+            raise ValueError("visibility must be None, 'index' or a visibilityIndex")
+        visibility = visibilityIndex(inroi, target, sc, startTime, endTime)
+    if isinstance(projection, str):
+        if projection not in ('exact', 'interpolated'):
+            raise ValueError("projection must be 'exact', 'interpolated' or a tolerance")
+        tol = 1e-7 if projection == 'interpolated' else None
+    else:
+        tol = float(projection)
+    if budget is not None:
+        if not isinstance(budget, dict):
+            budget = {'total': budget}
+        if not budget or not set(budget) <= {'step', 'total'} or \
+                any(not np.isscalar(v) or not v > 0 for v in budget.values()):
+            raise ValueError("budget must be a positive number or a dict with positive 'step' and/or 'total'")
+        clock0 = time.time()
+
     # Pre-allocate variables
     A = []  # List of observations (successive boresight ground track position)
     fpList = []
     amIntercept = False
+    state = frontierRepairState()  # planner state across the grid updates of this tour
     if len(args) == 1:
         resolution = args[0]
     else:
         resolution = 'lowres'
 
     # Check ROI visible area from spacecraft
-    vsbroi, _, visibilityFlag = visibleroi(inroi, startTime, target, sc)  # polygon vertices of the visible area
+    if visibility is not None:
+        vsbroi, _, visibilityFlag = visibility.visibleroi(inroi, startTime)
+    else:
+        vsbroi, _, visibilityFlag = visibleroi(inroi, startTime, target, sc)  # polygon vertices of the visible area
     if visibilityFlag:
         print("ROI is not visible from the instrument")
         return A, fpList
@@ -115,6 +252,8 @@ def frontierRepair(startTime, endTime, tobs, inst, sc, target, inroi, olapx, ola
 
     cx = poly1.centroid.x
     cy = poly1.centroid.y
+    worker = observationPipeline() if pipeline else None
+    series = projectionSeries(inst, sc, target, cx, cy, startTime, tol=tol) if tol is not None else None
 
     ## Frontier Repair algorithm
     # The first time iteration is the starting time in the planning horizon
@@ -122,108 +261,179 @@ def frontierRepair(startTime, endTime, tobs, inst, sc, target, inroi, olapx, ola
 
     # Boolean that defines when to stop covering the target area
     exit = False
-
-    while not exit:
-        # Initial 2D grid layout discretization: the instrument's FOV is going
-        # to be projected onto the uncovered area's centroid and the resulting
-        # footprint shape is used to set the grid spatial resolution
-
-        if (np.isnan(roi[:, 0])).any():
-            nanindex = np.where(np.isnan(roi[:, 0]))[0]
-            polygon_list = []
-            for i in range(len(nanindex)):
-                if i == 0:
-                    polygon_list.append(Polygon(list(zip(roi[:nanindex[0], 0], roi[:nanindex[0], 1]))))
-                else:
-                    polygon_list.append(Polygon(
-                        list(zip(roi[nanindex[i - 1] + 1:nanindex[i], 0], roi[nanindex[i - 1] + 1:nanindex[i], 1]))))
-            if ~ np.isnan(roi[-1, 0]):
-                polygon_list.append(Polygon(list(zip(roi[nanindex[-1] + 1:, 0], roi[nanindex[-1] + 1:, 1]))))
-            polyroi = MultiPolygon(polygon_list)
-        else:
-            polyroi = Polygon((list(zip(roi[:, 0], roi[:, 1]))))
-
-        polyroi = polyroi.buffer(0)
-        gamma = [polyroi.centroid.x,polyroi.centroid.y]
-        fprintc = footprint(t, inst, sc, target, resolution, gamma[0], gamma[1], 0)  # centroid footprint
-
-        # Initialize a list of dictionaries to save footprints
-        if t == startTime:
-            #fpList = [{} for _ in range(len(fprintc))]
-            fpList = [{}]
-            for fn in fprintc.keys():
-                fpList[0][fn] = []
-
-        # Check roi visibility
-        vsbroi, _, visibilityFlag = visibleroi(roi, t, target, sc)
-        if visibilityFlag:
-            print("ROI no longer reachable")
-            break
-        else:
-            roi = interppolygon(vsbroi)
-
-        # Discretize ROI area (grid) and plan Sidewinder tour based on a Boustrophedon approach
-        tour, grid, itour, grid_dirx, grid_diry, dir1, dir2 = planSidewinderTour(target, roi, sc, inst, t, olapx, olapy)
-
-        #for i in range(len(grid)):
-        #    for j in range(len(grid[i])):
-        #       if grid[i][j] is not None:
-        #            grid[i][j] = (grid[i][j]).reshape(1,2)
-
-        # Handle cases where the FOV projection is larger than the ROI area
-        if len(tour) < 1:
-            A.append(gamma)
-            fpList.append(fprintc)
-            exit = True
-            continue
-
-        seed = itour[0]
-        while len(tour)!= 0 and t < endTime:
-            # Update origin and tour
-            old_seed = seed
-            itour.pop(0)
-
-            # Process each point of the tour
-            A, tour, fpList, poly1, t, _  = processObservation(A, tour, fpList, poly1, t, slewRate, tobs, amIntercept, inst,
-                                                           sc, target, resolution)
-            if isinstance(poly1, Polygon):
-                # If polygon is completely covered, break loop
-                if not poly1.exterior.coords:
-                    break
-                # Update roi
-                roi = np.array(poly1.exterior.coords)
-            elif isinstance(poly1, MultiPolygon):
-                for i in range(len(poly1.geoms)):
+    stol = None  # simplification tolerance of the uncovered area
+    degraded = False  # cheaper approximations in the next steps (see budget)
+    ndegraded = 0  # consecutive degraded steps
+    vsbinter = None  # visible area of the previous step
+
+    try:
+        while not exit:
+            # Initial 2D grid layout discretization: the instrument's FOV is going
+            # to be projected onto the uncovered area's centroid and the resulting
+            # footprint shape is used to set the grid spatial resolution
+
+            if (np.isnan(roi[:, 0])).any():
+                nanindex = np.where(np.isnan(roi[:, 0]))[0]
+                polygon_list = []
+                for i in range(len(nanindex)):
                     if i == 0:
-                        roi = np.vstack((np.array(poly1.geoms[i].exterior.coords), [np.nan, np.nan]))
+                        polygon_list.append(Polygon(list(zip(roi[:nanindex[0], 0], roi[:nanindex[0], 1]))))
                     else:
-                        roi = np.vstack((roi, np.array(poly1.geoms[i].exterior.coords), [np.nan, np.nan]))
-                roi = roi[:-1,:]
-
-            # Check roi visibility
-            vsbroi, _, visibilityFlag = visibleroi(roi, t, target, sc)
+                        polygon_list.append(Polygon(
+                            list(zip(roi[nanindex[i - 1] + 1:nanindex[i], 0], roi[nanindex[i - 1] + 1:nanindex[i], 1]))))
+                if ~ np.isnan(roi[-1, 0]):
+                    polygon_list.append(Polygon(list(zip(roi[nanindex[-1] + 1:, 0], roi[nanindex[-1] + 1:, 1]))))
+                polyroi = MultiPolygon(polygon_list)
+            else:
+                polyroi = Polygon((list(zip(roi[:, 0], roi[:, 1]))))
+
+            polyroi = polyroi.buffer(0)
+            gamma = [polyroi.centroid.x,polyroi.centroid.y]
+            fprintc = footprint(t, inst, sc, target, resolution, gamma[0], gamma[1], 0)  # centroid footprint
+            if simplify is not None and np.size(fprintc['bvertices']) != 0:
+                bvertices = fprintc['bvertices']
+                stol = simplify * min(np.nanmax(bvertices[:, 0]) - np.nanmin(bvertices[:, 0]),
+                                      np.nanmax(bvertices[:, 1]) - np.nanmin(bvertices[:, 1]))
+
+            # Initialize a list of dictionaries to save footprints
+            if t == startTime:
+                #fpList = [{} for _ in range(len(fprintc))]
+                fpList = [{}]
+                for fn in fprintc.keys():
+                    fpList[0][fn] = []
+
+            # Check roi visibility (the anti-meridian split of the ROI is left to
+            # visibleroi)
+            if visibility is not None and not amIntercept:
+                vsbroi, _, visibilityFlag = visibility.visibleroi(roi, t)
+            else:
+                vsbroi, _, visibilityFlag = visibleroi(roi, t, target, sc)
             if visibilityFlag:
                 print("ROI no longer reachable")
                 break
             else:
-                roi = interppolygon(vsbroi)
-
-            if len(tour) == 0:
-                break
-            else:
-                gamma = tour[0]  # next observation point
-                seed = itour[0]  # next seed in the image plane
-
-                # Update previous grid with the new tile reference (footprint),
-                # looking for new potential tiles and/or disposable ones
-                seed, grid, itour, tour = updateGrid(roi, itour, grid, grid_dirx, grid_diry, cx, cy, olapx, olapy, dir1,
-                                                     dir2, seed, old_seed, gamma, t, inst, sc, target)
+                roi = interppolygon(vsbroi, stol)
+
+            # The initial planning counts against the total budget (the grid
+            # search, if any, is bounded by the remaining budget)
+            if budget is not None and 'total' in budget:
+                remaining = budget['total'] - (time.time() - clock0)
+                if remaining <= 0:
+                    print("Planning budget exhausted, returning partial plan")
+                    break
+                if search is not None:
+                    search = dict(search, budget=min(search.get('budget', np.inf), remaining))
+
+            # Discretize ROI area (grid) and plan Sidewinder tour based on a Boustrophedon approach
+            tour, grid, itour, grid_dirx, grid_diry, dir1, dir2 = planSidewinderTour(target, roi, sc, inst, t, olapx, olapy,
+                                                                                    coverage, cache, fill, search, track,
+                                                                                    hint)
+            state.frontier, state.map = None, None  # new grid
+
+            #for i in range(len(grid)):
+            #    for j in range(len(grid[i])):
+            #       if grid[i][j] is not None:
+            #            grid[i][j] = (grid[i][j]).reshape(1,2)
+
+            # Handle cases where the FOV projection is larger than the ROI area
+            if len(tour) < 1:
+                A.append(gamma)
+                fpList.append(fprintc)
+                exit = True
+                continue
+
+            seed = itour[0]
+            while len(tour)!= 0 and t < endTime:
+                # Update origin and tour
+                if budget is not None:
+                    clock = time.time()
+                    if clock - clock0 > budget.get('total', np.inf):
+                        print("Planning budget exhausted, returning partial plan")
+                        break
+                old_seed = seed
+                itour.pop(0)
+
+                # Process each point of the tour
+                nfp = len(fpList)
+                A, tour, fpList, poly1, t, _  = processObservation(A, tour, fpList, poly1, t, slewRate, tobs, amIntercept, inst,
+                                                               sc, target, 'lowres' if degraded else resolution, tol=stol,
+                                                               pipeline=None if degraded else worker)
+                if budget is not None and len(fpList) > nfp:
+                    fpList[-1]['degraded'] = degraded
+                if worker is not None and not degraded:
+                    # Speculative footprint of the next observation, while the
+                    # grid is updated (not in the degraded steps, which do not
+                    # use it)
+                    worker.submit(t, tour, inst, sc, target, resolution, tobs, slewRate)
+                if isinstance(poly1, Polygon):
+                    # If polygon is completely covered, break loop
+                    if not poly1.exterior.coords:
+                        break
+                    # Update roi
+                    roi = np.array(poly1.exterior.coords)
+                elif isinstance(poly1, MultiPolygon):
+                    for i in range(len(poly1.geoms)):
+                        if i == 0:
+                            roi = np.vstack((np.array(poly1.geoms[i].exterior.coords), [np.nan, np.nan]))
+                        else:
+                            roi = np.vstack((roi, np.array(poly1.geoms[i].exterior.coords), [np.nan, np.nan]))
+                    roi = roi[:-1,:]
+
+                # Check roi visibility
+                if degraded and vsbinter is not None and not amIntercept:
+                    # Visible area of the previous step (the limb has barely
+                    # moved in one observation)
+                    vsbroi, vsbinter, visibilityFlag = cachedvisibleroi(poly1, vsbinter)
+                elif visibility is not None and not amIntercept:
+                    vsbroi, vsbinter, visibilityFlag = visibility.visibleroi(roi, t)
+                else:
+                    vsbroi, vsbinter, visibilityFlag = visibleroi(roi, t, target, sc)
+                if visibilityFlag:
+                    print("ROI no longer reachable")
+                    break
+                else:
+                    roi = interppolygon(vsbroi, stol)
 
-        # For now, the stop criteria is the end of the tour, re-starts are not
-        # optimal for the purposes of the scheduling problem
-        # [Future work]: automated scheduling (in-situ). Re-starts may be
-        # considered, and we will need to define a criteria to prompt those.
-        exit = True
+                if len(tour) == 0:
+                    break
+                else:
+                    gamma = tour[0]  # next observation point
+                    seed = itour[0]  # next seed in the image plane
+
+                    # Update previous grid with the new tile reference (footprint),
+                    # looking for new potential tiles and/or disposable ones
+                    seed, grid, itour, tour = updateGrid(roi, itour, grid, grid_dirx, grid_diry, cx, cy, olapx, olapy, dir1,
+                                                         dir2, seed, old_seed, gamma, t, inst, sc, target,
+                                                         'raster' if degraded else coverage,
+                                                         tour if reproject == 'incremental' else None,
+                                                         projection=series, state=state, **reprojopts)
+
+                if budget is not None:
+                    # Degrade the next steps if this one has come close to the
+                    # step budget, or if the total budget is running out. The
+                    # exact computations are retried after 5 degraded steps
+                    ndegraded = ndegraded + 1 if degraded else 0
+                    elapsed = time.time() - clock
+                    remaining = budget.get('total', np.inf) - (time.time() - clock0)
+                    step = budget.get('step', 0.)
+                    if remaining < max(step, elapsed):
+                        slow = True
+                    elif degraded:
+                        slow = ndegraded < 5
+                    else:
+                        slow = bool(step) and elapsed > 0.8 * step
+                    if slow and not degraded and worker is not None:
+                        worker.discard()
+                    degraded = slow
+
+            # For now, the stop criteria is the end of the tour, re-starts are not
+            # optimal for the purposes of the scheduling problem
+            # [Future work]: automated scheduling (in-situ). Re-starts may be
+            # considered, and we will need to define a criteria to prompt those.
+            exit = True
+    finally:
+        if worker is not None:
+            worker.close()
 
     # OK message
     print('Online Frontier successfully executed')
@@ -233,3 +443,17 @@ def frontierRepair(startTime, endTime, tobs, inst, sc, target, inroi, olapx, ola
         fpList.pop(0)
 
     return A, fpList
+
+
+def cachedvisibleroi(poly1, inter):
+    # Visible area of the uncovered area poly1, from the visible area of the
+    # previous step (same outputs as visibleroi)
+    vis = poly1.intersection(inter).buffer(0)
+    if isinstance(vis, MultiPolygon):
+        vroi = np.vstack([np.vstack((np.array(geom.exterior.coords), [np.nan, np.nan]))
+                          for geom in vis.geoms])[:-1, :]
+    elif isinstance(vis, Polygon) and not vis.is_empty:
+        vroi = np.array(vis.exterior.coords)
+    else:
+        return np.empty((0, 2)), vis, True
+    return vroi, vis, False
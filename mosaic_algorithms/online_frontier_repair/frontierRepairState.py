@@ -0,0 +1,47 @@
+class frontierRepairState:
+    """
+    State of a frontier repair planner that persists across the successive
+    grid updates of a tour: the reference footprint, the initial pointing
+    and sweeping directions. Each frontierRepair call owns its state, so
+    that several planners (different ROIs, initial times or instruments)
+    can run in the same process, sequentially or concurrently, without
+    sharing it.
+
+    Usage:        state = frontierRepairState()
+                  [seed, inst_grid, inst_tour, topo_tour] = updateGrid(..., state=state)
+
+    Attributes:
+      > fpref:        reference footprint (dict with 'width', 'height' and
+                      'bvertices') in the instrument frame, built on the
+                      first grid update
+      > pointing0:    first pointing of the tour (ROI centroid), in [deg]
+      > sweepDir1, sweepDir2: sweeping directions of the Boustrophedon
+                      decomposition, set on the first grid update
+      > pdir1, pdir2: sweeping directions of the first taboo check (see
+                      checkTaboo)
+      > frontier:     frontierSet of the grid map, maintained across the grid
+                      updates (None until the first update, or after
+                      re-planning the grid)
+      > map:          growableMap of the grid (bounded by NaN rows and
+                      columns), edited in place across the grid updates
+                      (None until the first update, or after re-planning
+                      the grid)
+      > grid:         grid returned by the last update, which shares its
+                      points with 'map'. The map is only reused by the
+                      update that receives this same grid
+    """
+
+    def __init__(self):
+        self.fpref = None
+        self.pointing0 = None
+        self.sweepDir1 = None
+        self.sweepDir2 = None
+        self.pdir1 = None
+        self.pdir2 = None
+        self.frontier = None
+        self.map = None
+        self.grid = None
+
+    def __repr__(self):
+        return 'frontierRepairState(sweep=%s/%s, fpref=%s)' % (self.sweepDir1, self.sweepDir2,
+                                                               self.fpref is not None)
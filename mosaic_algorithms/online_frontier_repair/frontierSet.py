@@ -0,0 +1,135 @@
+import numpy as np
+from mosaic_algorithms.online_frontier_repair.growableMap import growableMap
+
+
+class frontierSet:
+    """
+    Frontier tiles of a map of grid points, maintained incrementally. The
+    number of (8-connected) neighbours of every grid point is kept along
+    with the set of frontier tiles (points with less than 8 neighbours), and
+    they are updated as cells are inserted or removed, so that the frontier
+    extraction of each grid update costs O(changed cells) instead of a full
+    map scan (see getFrontierTiles).
+
+    The cells are stored relative to a fixed map origin, so that the rows
+    and columns prepended to the map (see insertTiles) do not alter them.
+    The map must be edited through the frontier-aware helpers (insertTiles,
+    removeTiles) or along with add/remove. matches detects, in O(1), the
+    edits that change the map shape or, for a growableMap, its number of
+    grid points. With the 'debug' class flag set, it compares the grid
+    points of the whole map instead (a full scan, for testing only).
+
+    Usage:        frontier = frontierSet(map)
+                  frontier.remove(i, j)
+                  frontier.add(i, j)
+                  frontier.shift(nrows, ncols)
+                  tiles, indel = frontier.tiles(map)
+
+    Inputs:
+      > map:          cell matrix of grid points. In order to avoid
+                      mapping boundaries, map is bounded by NaN rows and
+                      columns (first and last). It may be a growableMap
+    """
+
+    neighbours = [(-1, 1), (0, 1), (1, 1), (-1, 0), (1, 0), (-1, -1), (0, -1), (1, -1)]
+    debug = False  # full map comparison in matches
+
+    def __init__(self, map):
+        self.origin = [0, 0]  # map position of the cell (0, 0)
+        if isinstance(map, growableMap):
+            self.shape = list(map.shape)
+            self.cells = {tuple(c) for c in map.points()[0]}
+        else:
+            self.shape = [len(map), len(map[0])]
+            self.cells = {(i, j) for i in range(len(map)) for j in range(len(map[i]))
+                          if map[i][j] is not None and not np.isnan(map[i][j]).any()}
+        self.count = {c: sum((c[0] + di, c[1] + dj) in self.cells for di, dj in self.neighbours)
+                      for c in self.cells}
+        self.frontier = {c for c in self.cells if self.count[c] < 8}
+
+    def matches(self, map):
+        """
+        Check if the input map has the shape and the number of grid points
+        (growableMap) of the maintained one, or its grid points if the
+        'debug' class flag is set
+
+        Usage:        match = frontier.matches(map)
+        """
+        if self.debug:
+            full = frontierSet(map)
+            cells = {(i - self.origin[0], j - self.origin[1]) for i, j in full.cells}
+            return self.shape == full.shape and cells == self.cells
+        if isinstance(map, growableMap):
+            return self.shape == map.shape and map.npoints == len(self.cells)
+        return self.shape == [len(map), len(map[0])]
+
+    def add(self, i, j):
+        """
+        Update the frontier with a grid point inserted at map position (i, j)
+
+        Usage:        frontier.add(i, j)
+        """
+        c = (i - self.origin[0], j - self.origin[1])
+        if c in self.cells:
+            return
+        self.cells.add(c)
+        n = 0
+        for di, dj in self.neighbours:
+            nb = (c[0] + di, c[1] + dj)
+            if nb in self.cells:
+                n += 1
+                self.count[nb] += 1
+                if self.count[nb] == 8:
+                    self.frontier.discard(nb)
+        self.count[c] = n
+        if n < 8:
+            self.frontier.add(c)
+
+    def remove(self, i, j):
+        """
+        Update the frontier with the grid point removed from map position
+        (i, j)
+
+        Usage:        frontier.remove(i, j)
+        """
+        c = (i - self.origin[0], j - self.origin[1])
+        if c not in self.cells:
+            return
+        self.cells.remove(c)
+        del self.count[c]
+        self.frontier.discard(c)
+        for di, dj in self.neighbours:
+            nb = (c[0] + di, c[1] + dj)
+            if nb in self.cells:
+                self.count[nb] -= 1
+                self.frontier.add(nb)
+
+    def shift(self, nrows, ncols):
+        """
+        Update the map shape with rows and columns prepended (positive) or
+        appended (negative) to the map
+
+        Usage:        frontier.shift(nrows, ncols)
+        """
+        self.origin[0] += max(nrows, 0)
+        self.origin[1] += max(ncols, 0)
+        self.shape[0] += abs(nrows)
+        self.shape[1] += abs(ncols)
+
+    def tiles(self, map):
+        """
+        Frontier tiles in the map, in the same (column-major) order as
+        getFrontierTiles
+
+        Usage:        tiles, indel = frontier.tiles(map)
+
+        Outputs:
+          > tiles:    cell array that contains the frontier tiles in the map
+          > indel:    cell array that contains the indices where the
+                      frontier tiles are located in 'map'
+        """
+        indel = sorted(([i + self.origin[0], j + self.origin[1]] for i, j in self.frontier),
+                       key=lambda ind: (ind[1], ind[0]))
+        if isinstance(map, growableMap):
+            return [map[i, j] for i, j in indel], indel
+        return [map[i][j] for i, j in indel], indel
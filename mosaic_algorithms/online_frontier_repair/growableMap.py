@@ -0,0 +1,120 @@
+import numpy as np
+
+
+class growableMap:
+    """
+    Map of grid points backed by an array with spare capacity on the four
+    sides. Rows and columns are added to the map (prepended or appended) by
+    moving its logical origin within the array, and the array is only
+    reallocated, doubling its capacity, when a side runs out of spare rows
+    or columns. The grid points are stored by reference (no copies), so the
+    insertion of tiles in the map costs amortized O(1). The map is meant to
+    be kept across the grid updates of a tour (see frontierRepairState) and
+    converted to a list of lists only at the interfaces that require one.
+
+    Usage:        grid = growableMap(map)
+                  grid.grow(top, bottom, left, right)
+                  grid[i, j] = point
+                  point = grid[i, j]
+                  cells, points = grid.points()
+                  map = grid.tolist()
+                  grid = grid.togrid()
+
+    Inputs:
+      > map:          list of lists of grid points. In order to avoid
+                      mapping boundaries, map is bounded by NaN rows and
+                      columns (first and last)
+
+    Attributes:
+      > shape:        [rows, columns] of the map
+      > npoints:      number of grid points in the map (empty cells, i.e.,
+                      None or NaN, excluded), kept up to date on every edit
+    """
+
+    def __init__(self, map):
+        self.shape = [len(map), len(map[0])]
+        self.cells = np.empty((2 * self.shape[0], 2 * self.shape[1]), dtype=object)
+        self.valid = np.zeros(self.cells.shape, dtype=bool)  # occupied cells
+        self.npoints = 0
+        self.origin = [self.shape[0] // 2, self.shape[1] // 2]  # array position of the map's [0, 0]
+        for i in range(self.shape[0]):
+            for j in range(self.shape[1]):
+                self[i, j] = map[i][j]
+
+    def grow(self, top=0, bottom=0, left=0, right=0):
+        """
+        Add empty rows (top, bottom) and columns (left, right) to the map
+
+        Usage:        grid.grow(top, bottom, left, right)
+        """
+        capacity = self.cells.shape
+        spare = [self.origin[0], capacity[0] - self.origin[0] - self.shape[0],
+                 self.origin[1], capacity[1] - self.origin[1] - self.shape[1]]
+        if top > spare[0] or bottom > spare[1] or left > spare[2] or right > spare[3]:
+            # Reallocate with double capacity (or the required one), centering
+            # the map in the new array
+            rows = max(2 * capacity[0], self.shape[0] + top + bottom)
+            cols = max(2 * capacity[1], self.shape[1] + left + right)
+            cells = np.empty((rows, cols), dtype=object)
+            valid = np.zeros((rows, cols), dtype=bool)
+            origin = [(rows - self.shape[0] - top - bottom) // 2 + top,
+                      (cols - self.shape[1] - left - right) // 2 + left]
+            new, old = self.window(origin), self.window(self.origin)
+            cells[new], valid[new] = self.cells[old], self.valid[old]
+            self.cells, self.valid, self.origin = cells, valid, origin
+        self.origin[0] -= top
+        self.origin[1] -= left
+        self.shape[0] += top + bottom
+        self.shape[1] += left + right
+
+    def window(self, origin):
+        # Array slices of the map placed at the input array position
+        return slice(origin[0], origin[0] + self.shape[0]), slice(origin[1], origin[1] + self.shape[1])
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, ind):
+        return self.cells[self.origin[0] + ind[0], self.origin[1] + ind[1]]
+
+    def __setitem__(self, ind, point):
+        i, j = self.origin[0] + ind[0], self.origin[1] + ind[1]
+        valid = point is not None and not np.isnan(point).any()
+        self.npoints += int(valid) - int(self.valid[i, j])
+        self.cells[i, j] = point if valid else None
+        self.valid[i, j] = valid
+
+    def points(self):
+        """
+        Grid points of the map and their positions
+
+        Usage:        cells, points = grid.points()
+
+        Outputs:
+          > cells:    list of [row, column] positions of the grid points in
+                      the map, in row-major order
+          > points:   list of the grid points
+        """
+        window = self.window(self.origin)
+        cells = np.argwhere(self.valid[window])
+        return cells.tolist(), self.cells[window][self.valid[window]].tolist()
+
+    def tolist(self):
+        """
+        List of lists representation of the map. Empty cells are [NaN NaN]
+
+        Usage:        map = grid.tolist()
+        """
+        return [[np.array([np.nan, np.nan]) if point is None else point for point in row]
+                for row in self.cells[self.window(self.origin)].tolist()]
+
+    def togrid(self):
+        """
+        Grid of the map, i.e., the map without its NaN boundaries (see
+        map2grid). Empty cells are None, and the grid points are shared
+        with the map
+
+        Usage:        grid = grid.togrid()
+        """
+        return self.cells[self.origin[0] + 1:self.origin[0] + self.shape[0] - 1,
+                          self.origin[1] + 1:self.origin[1] + self.shape[1] - 1].tolist()
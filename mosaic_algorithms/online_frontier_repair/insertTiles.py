@@ -1,9 +1,9 @@
-import copy
 import numpy as np
 from conversion_functions import *
+from mosaic_algorithms.online_frontier_repair.growableMap import growableMap
 
 
-def insertTiles(*args):
+def insertTiles(*args, frontier=None):
     """
     This function includes new observation points in a planned tour
     observations
@@ -12,31 +12,41 @@ def insertTiles(*args):
     Date:         06/2023
 
     Usage:        [tour, map] = insertTiles(map, newp, indp)
+                  map = insertTiles(map, newp, indp, frontier=frontier)
 
     Inputs:
       > map:       list of lists of grid points. In order to avoid
                    mapping boundaries, map is bounded by NaN rows and
-                   columns (first and last)
+                   columns (first and last). If it is a growableMap, it is
+                   updated in place (no conversions), which is how the
+                   successive grid updates of a tour edit it (see
+                   updateGrid)
       > newp:      list of lists of the new observation points to be
                    included in 'tour'
       > indp:      list of lists of the new observation points locations to
                    be included in 'map'
+      > frontier:  (keyword) frontierSet of the map, updated with the
+                   inserted points and the map relocations
 
     Returns:
-      > map:       updated list of lists of grid points
+      > map:       updated map (list of lists of grid points, or the input
+                   growableMap)
 
     """
 
-    map = args[0]
     newp = args[1]
     indp = args[2]
+    if len(newp) == 0:
+        return args[0]
+    aslist = not isinstance(args[0], growableMap)
+    map = growableMap(args[0]) if aslist else args[0]  # no copies of the map on relocations (spare capacity on the
+    # four sides)
 
     # Insert elements in map
     offcol = 0
     offrow = 0
 
     for i in range(len(newp)):
-        aux_map = copy.deepcopy(map)  # save the map at its current state (for potential relocation purposes)
         indel = indp[i]
 
         # Update index position
@@ -46,46 +56,54 @@ def insertTiles(*args):
         # If the index is in the boundaries (or even further) of the map, then
         # we will have to relocate the elements in map and create a bigger grid
 
-        offrow0 = copy.deepcopy(offrow)
-        offcol0 = copy.deepcopy(offcol)
+        offrow0 = offrow
+        offcol0 = offcol
 
-        if indel[0] >= (len(map) - 1):  # last row or more
-            nrows = 2 + indel[0] - len(map)  # number of additional rows in the grid (last rows)
+        if indel[0] >= (map.shape[0] - 1):  # last row or more
+            nrows = 2 + indel[0] - map.shape[0]  # number of additional rows in the grid (last rows)
 
             # Map relocation
-            map =  aux_map + [[np.array([np.nan,np.nan]) for _ in range(len(map[0]))] for _ in range(nrows)]
+            map.grow(bottom=nrows)
+            if frontier is not None:
+                frontier.shift(-nrows, 0)
 
         elif indel[0] <= 0:  # First row or less
             nrows = 1 - indel[0]  # Number of additional rows in the grid (first rows)
             offrow += nrows # rows offset
 
             # Map relocation
-            map = [[np.array([np.nan,np.nan]) for _ in range(len(map[0]))] for _ in range(nrows)] + aux_map
+            map.grow(top=nrows)
+            if frontier is not None:
+                frontier.shift(nrows, 0)
 
-        aux_map = copy.deepcopy(map)
-
-        if indel[1] >= (len(map[0]) -1) :  # last column or more
-            ncols = 2 + indel[1] - len(map[0])  # number of additional columns
+        if indel[1] >= (map.shape[1] -1) :  # last column or more
+            ncols = 2 + indel[1] - map.shape[1]  # number of additional columns
             # in the grid (last columns)
 
             # Map relocation
-            map = [row + [np.array([np.nan, np.nan])] * ncols for row in aux_map]
+            map.grow(right=ncols)
+            if frontier is not None:
+                frontier.shift(0, -ncols)
 
         elif indel[1] <= 0:  # First column or less
             ncols = 1 - indel[1]  # number of additional columns in the grid (first columns)
             offcol += ncols # columns offset
 
             # Map relocation
-            map = [[np.array([np.nan, np.nan])] * ncols + row for row in aux_map]
+            map.grow(left=ncols)
+            if frontier is not None:
+                frontier.shift(0, ncols)
 
         # Update the current element index
         indel[0] += (offrow - offrow0)
         indel[1] += (offcol - offcol0)
 
         # Include elements in map
-        map[indel[0]][indel[1]] = newp[i]
+        map[indel[0], indel[1]] = newp[i]
+        if frontier is not None:
+            frontier.add(indel[0], indel[1])
 
-    return map
+    return map.tolist() if aslist else map
 
 # The following is a MATLAB code that must be translated in Python. Since it is a comment, it is not used so it is not
 # translated for now.
@@ -0,0 +1,132 @@
+import copy
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from conversion_functions import mat2py_furnsh, mat2py_kdata, mat2py_ktotal
+from mosaic_algorithms.auxiliar_functions.spacecraft_operation.footprint import footprint
+from mosaic_algorithms.auxiliar_functions.spacecraft_operation.slewDur import slewDur
+
+
+class observationPipeline:
+    """
+    Speculative computation of the next observation of a frontier repair
+    tour in a background SPICE worker process. While the grid is updated
+    after an observation, the worker computes the footprint of the next
+    point in the tour and the slew time to the following one. The next
+    observation takes the speculative result only if it is computed at the
+    same epoch and for the same points (the tour may change with the grid
+    update); otherwise, the result is discarded and computed again, so the
+    output is identical to the sequential computation.
+
+    Usage:        pipeline = observationPipeline()
+                  pipeline.submit(t, tour, inst, sc, target, resolution, tobs, slewRate)
+                  fprinti = pipeline.footprint(t, a)
+                  slew = pipeline.slew(t, a, p2)
+                  pipeline.close()
+
+    Attributes:
+      > hits:         number of speculative results that have been used
+      > misses:       number of speculative results that have been
+                      discarded
+    """
+
+    def __init__(self):
+        # Kernels loaded in this process (the ones that are not loaded by a
+        # meta-kernel), to be loaded by the worker if it does not inherit them
+        kernels = []
+        for i in range(mat2py_ktotal('ALL')):
+            file, _, srcfil, _, found = mat2py_kdata(i, 'ALL')
+            if found and not srcfil:
+                kernels.append(file)
+        self.pool = ProcessPoolExecutor(max_workers=1, initializer=loadkernels, initargs=(kernels,))
+        self.future = None
+        self.key = None
+        self.result = None
+        self.hits = 0
+        self.misses = 0
+
+    def submit(self, t, tour, inst, sc, target, resolution, tobs, slewRate):
+        """
+        Start the computation of the footprint of the next point in the tour
+        (tour[0]) at epoch t, and of the slew time to tour[1]
+
+        Usage:        pipeline.submit(t, tour, inst, sc, target, resolution, tobs, slewRate)
+        """
+        self.discard()
+        if len(tour) == 0:
+            return
+        a = copy.deepcopy(tour[0])
+        if a[0] > 180:  # a.m. intercept (as in processObservation)
+            a[0] -= 360
+        p2 = [tour[1][0], tour[1][1]] if len(tour) > 1 else None
+        self.key = (t, np.array(a, dtype=float), None if p2 is None else np.array(p2, dtype=float))
+        self.future = self.pool.submit(speculate, t, a, p2, inst, sc, target, resolution, tobs, slewRate)
+
+    def matches(self, t, a, p2=None):
+        return self.key is not None and self.key[0] == t and np.array_equal(self.key[1], np.array(a, dtype=float)) \
+            and (p2 is None or (self.key[2] is not None and np.array_equal(self.key[2], np.array(p2, dtype=float))))
+
+    def footprint(self, t, a):
+        """
+        Speculative footprint of point a at epoch t, or None if it has not
+        been computed
+
+        Usage:        fprinti = pipeline.footprint(t, a)
+        """
+        if self.future is not None and self.matches(t, a):
+            self.result = self.future.result()
+            self.future = None
+            self.hits += 1
+            return self.result[0]
+        self.discard()
+        return None
+
+    def slew(self, t, a, p2):
+        """
+        Speculative slew time from the footprint of point a at epoch t to
+        point p2, or None if it has not been computed
+
+        Usage:        slew = pipeline.slew(t, a, p2)
+        """
+        if self.result is not None and self.matches(t, a, p2):
+            return self.result[1]
+        return None
+
+    def discard(self):
+        # Discard the current speculative computation (if any)
+        if self.future is not None:
+            self.future.cancel()
+            self.misses += 1
+        self.future = None
+        self.key = None
+        self.result = None
+
+    def close(self):
+        """
+        Shut down the worker process
+
+        Usage:        pipeline.close()
+        """
+        self.discard()
+        self.pool.shutdown(wait=True, cancel_futures=True)
+
+    def __repr__(self):
+        return 'observationPipeline: %d hits, %d misses' % (self.hits, self.misses)
+
+
+def loadkernels(kernels):
+    # Worker initialization: load the SPICE kernels, unless they have been
+    # inherited from the parent process
+    if mat2py_ktotal('ALL') == 0:
+        mat2py_furnsh(kernels)
+
+
+def speculate(t, a, p2, inst, sc, target, resolution, tobs, slewRate):
+    # Footprint of point a at epoch t, and slew time to point p2 (same
+    # computations as processObservation)
+    fprinti = footprint(t, inst, sc, target, resolution, a[0], a[1], 0)
+    slew = None
+    if p2 is not None and np.size(fprinti['bvertices']) != 0:
+        slew = slewDur([fprinti['olon'], fprinti['olat']], p2, t, tobs, inst, target, sc, slewRate)
+    return fprinti, slew
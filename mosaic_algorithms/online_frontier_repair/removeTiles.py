@@ -1,7 +1,8 @@
 import numpy as np
+from mosaic_algorithms.online_frontier_repair.growableMap import growableMap
 
 
-def removeTiles(map, tiles):
+def removeTiles(map, tiles, registry=None, frontier=None):
     """
     This function removes disposable observation points within the grid.
 
@@ -9,18 +10,49 @@ def removeTiles(map, tiles):
     Date:         06/2023
 
     Usage:        map = removeTiles(map, tiles)
+                  map = removeTiles(map, tiles, registry, frontier)
 
     Inputs:
     > map_grid:   list of lists representing grid points. In order to avoid
                   mapping boundaries, map is bounded by NaN rows and
-                  columns (first and last)
+                  columns (first and last). If it is a growableMap, it is
+                  updated in place
     > tiles:      list of disposable observation points to be
                   removed from 'tour' and 'grid'
+    > registry:   (optional) tileRegistry of the grid. If provided, the
+                  tiles are located in the map by their lattice
+                  coordinates, instead of scanning the map for each tile
+    > frontier:   (optional) frontierSet of the map, updated with the
+                  removed tiles
 
     Outputs:
-    > map:   updated list of lists representing grid points
+    > map:   updated list of lists representing grid points (or the input
+             growableMap)
     """
 
+    if isinstance(map, growableMap):
+        if registry is not None:
+            index = registry.index(map)
+            cells = [index[key] for key in registry.keys(tiles) if key in index]
+        else:
+            cells = [ind for ind, point in zip(*map.points())
+                     if any(np.linalg.norm(point - tile) < 1e-5 for tile in tiles)]
+        for ii, jj in cells:
+            map[ii, jj] = None
+            if frontier is not None:
+                frontier.remove(ii, jj)
+        return map
+
+    if registry is not None:
+        index = registry.index(map)
+        for key in registry.keys(tiles):
+            if key in index:
+                ii, jj = index[key]
+                map[ii][jj] = [np.nan, np.nan]
+                if frontier is not None:
+                    frontier.remove(ii, jj)
+        return map
+
     for i in range(len(tiles)):
         # For each observation point in the removal list...
 
@@ -30,5 +62,7 @@ def removeTiles(map, tiles):
                     
                     # Remove elements from the grid ([NaN, NaN])
                     map[ii][jj] = [np.nan, np.nan]
+                    if frontier is not None:
+                        frontier.remove(ii, jj)
 
     return map
\ No newline at end of file
@@ -0,0 +1,85 @@
+import numpy as np
+from mosaic_algorithms.online_frontier_repair.growableMap import growableMap
+
+
+class tileRegistry:
+    """
+    Integer lattice indexing of the frontier repair grid. Every grid point
+    (tile center) in the instrument frame is identified by its integer
+    coordinates (i, j) along the grid directions, relative to a fixed grid
+    origin, so that the membership tests of the grid update (tour, covering
+    and disposable tiles, open list...) become set lookups instead of
+    distance scans. The coordinate transform is applied once per point.
+
+    Usage:        registry = tileRegistry(origin, dx, dy, w, h, olapx, olapy)
+                  key = registry.key(point)
+                  keys = registry.keys(points)
+                  index = registry.index(map)
+
+    Inputs:
+      > origin:       grid point taken as the lattice origin, in the
+                      instrument frame
+      > dx:           vector that expresses the x-direction in the grid
+      > dy:           vector that expresses the y-direction in the grid
+      > w:            width (x-direction) of the footprint
+      > h:            height (y-direction) of the footprint
+      > olapx:        grid footprint overlap in the x direction,
+                      in percentage (width)
+      > olapy:        grid footprint overlap in the y direction,
+                      in percentage (height)
+    """
+
+    def __init__(self, origin, dx, dy, w, h, olapx, olapy):
+        self.origin = np.array(origin, dtype=float).reshape(2)
+
+        # Lattice basis: grid spacing along each grid direction (as in
+        # getNeighbours)
+        basis = np.column_stack(((w - olapx * w / 100) * np.reshape(dx, 2),
+                                 (h - olapy * h / 100) * np.reshape(dy, 2)))
+        self.inverse = np.linalg.inv(basis)
+
+    def keys(self, points):
+        """
+        Lattice coordinates of a set of grid points
+
+        Usage:        keys = registry.keys(points)
+
+        Outputs:
+          > keys:     list of (i, j) integer tuples, one per point
+        """
+        if len(points) == 0:
+            return []
+        points = np.array([np.reshape(p, 2) for p in points], dtype=float)
+        ij = np.rint((points - self.origin) @ self.inverse.T).astype(int)
+        return [tuple(k) for k in ij.tolist()]
+
+    def key(self, point):
+        """
+        Lattice coordinates of a grid point
+
+        Usage:        key = registry.key(point)
+        """
+        return self.keys([point])[0]
+
+    def index(self, map):
+        """
+        Positions of the grid points in a map
+
+        Usage:        index = registry.index(map)
+
+        Inputs:
+          > map:      list of lists of grid points, bounded by NaN rows and
+                      columns (see grid2map), or growableMap
+
+        Outputs:
+          > index:    dict that maps the lattice coordinates of the map
+                      points to their [row, column] position in 'map'
+        """
+        if isinstance(map, growableMap):
+            cells, points = map.points()
+        else:
+            cells = [(i, j) for i in range(len(map)) for j in range(len(map[i]))
+                     if map[i][j] is not None and not np.isnan(map[i][j]).any()]
+            points = [map[i][j] for i, j in cells]
+        keys = self.keys(points)
+        return {k: [i, j] for k, (i, j) in zip(keys, cells)}
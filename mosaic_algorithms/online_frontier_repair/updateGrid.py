@@ -1,6 +1,7 @@
 import copy
 
 import numpy as np
+import shapely
 from shapely.geometry import MultiPolygon, Polygon
 import matplotlib.pyplot as plt
 from conversion_functions import *
@@ -8,20 +9,25 @@ from mosaic_algorithms.online_frontier_repair.checkTaboo import checkTaboo
 from mosaic_algorithms.online_frontier_repair.removeTiles import removeTiles
 from mosaic_algorithms.online_frontier_repair.insertTiles import insertTiles
 from mosaic_algorithms.online_frontier_repair.grid2map import grid2map
-from mosaic_algorithms.online_frontier_repair.map2grid import map2grid
-from mosaic_algorithms.online_frontier_repair.getFrontierTiles import getFrontierTiles
+from mosaic_algorithms.online_frontier_repair.growableMap import growableMap
+from mosaic_algorithms.online_frontier_repair.frontierSet import frontierSet
 from mosaic_algorithms.online_frontier_repair.getNeighbours import getNeighbours
+from mosaic_algorithms.online_frontier_repair.tileRegistry import tileRegistry
+from mosaic_algorithms.online_frontier_repair.frontierRepairState import frontierRepairState
 from mosaic_algorithms.auxiliar_functions.grid_functions.inst2topo import inst2topo
 from mosaic_algorithms.auxiliar_functions.grid_functions.topo2inst import topo2inst
+from mosaic_algorithms.auxiliar_functions.spacecraft_operation.projectionContext import projectionContext
 from mosaic_algorithms.auxiliar_functions.grid_functions.boustrophedon import boustrophedon
+from mosaic_algorithms.auxiliar_functions.grid_functions.coverageRaster import coverageRaster
+from mosaic_algorithms.auxiliar_functions.observation_geometry.emissionang import emissionang
+from scipy.spatial import cKDTree
 
-fpref = None
-pointing0 = None
-sweepDir1 = None
-sweepDir2 = None
+# Planner state of the calls that do not provide one (shared across calls)
+defaultState = frontierRepairState()
 
 def updateGrid(roi, inst_tour, inst_grid, grid_dirx, grid_diry, cx, cy, olapx, olapy,
-               insweepDir1, insweepDir2, seed, old_seed, gamma, et, inst, sc, target):
+               insweepDir1, insweepDir2, seed, old_seed, gamma, et, inst, sc, target, coverage='exact',
+               topo_tour=None, projection=None, state=None, drift=0.01, limb=80.):
     """
     This function dynamically updates the grid of observations by
     incorporating new observation points, adjusting for changes in the
@@ -34,7 +40,9 @@ def updateGrid(roi, inst_tour, inst_grid, grid_dirx, grid_diry, cx, cy, olapx, o
 
     Usage:        [seed, inst_grid, inst_tour, topo_tour] = updateGrid(roi,
                    inst_tour, inst_grid, grid_dirx, grid_diry, cx, cy, olapx, olapy,
-                   insweepDir1, insweepDir2, seed, old_seed, gamma, et, inst, sc, target)
+                   insweepDir1, insweepDir2, seed, old_seed, gamma, et, inst, sc, target,
+                   coverage, topo_tour, projection=projection, state=state, drift=drift,
+                   limb=limb)
 
     Inputs:
       > roi:          matrix containing the vertices of the uncovered area
@@ -63,6 +71,40 @@ def updateGrid(roi, inst_tour, inst_grid, grid_dirx, grid_diry, cx, cy, olapx, o
       > inst:         string name of the instrument
       > sc:           string name of the spacecraft
       > target:       string name of the target body
+      > coverage:     (optional) string 'exact' or 'raster' that determines
+                      how the tile coverage fractions are evaluated: with
+                      polygon operations ('exact', default) or from a raster
+                      of the projected ROI (see coverageRaster), with 32
+                      pixels per footprint side. A number sets the raster
+                      mode with that number of pixels per footprint side
+                      (accuracy knob)
+      > topo_tour:    (optional) tour path of the previous iteration in
+                      topographical coordinates, matching inst_tour. If
+                      provided, the tour is reprojected incrementally: the
+                      tiles that were already in the tour keep their
+                      topographical coordinates (they move with the grid
+                      shift in the instrument frame), and only the new
+                      tiles, the tiles close to the limb (whose
+                      visibility may have changed) and the tiles that have
+                      drifted (see drift) are reprojected.
+                      Default: None (the whole tour is reprojected)
+      > projection:   (keyword) projectionSeries of the pointing at (cx, cy)
+                      from which the projection geometry at et is
+                      interpolated. Default: None (the geometry is computed
+                      exactly)
+      > state:        (keyword) frontierRepairState of the planner, which
+                      keeps the reference footprint and the sweeping
+                      directions across the calls of the same tour.
+                      Default: None (a module-level state shared by all the
+                      calls without one)
+      > drift:        (keyword) incremental reprojection: maximum drift of a
+                      tile that keeps its topographical coordinates, i.e.,
+                      distance between their projection onto the focal
+                      plane and the tile position, in fraction of the
+                      footprint size. Default: 0.01
+      > limb:         (keyword) incremental reprojection: emission angle
+                      above which the tiles are reprojected, in [deg].
+                      Default: 80
 
     Outputs:
       > seed, inst_grid, inst_tour: updated variables
@@ -75,14 +117,16 @@ def updateGrid(roi, inst_tour, inst_grid, grid_dirx, grid_diry, cx, cy, olapx, o
     """
 
     # Pre-allocate variables...
-    global fpref, pointing0, sweepDir1, sweepDir2
+    if state is None:
+        state = defaultState
 
-    if sweepDir1 is None:
-        sweepDir1 = insweepDir1
-        sweepDir2 = insweepDir2
+    if state.sweepDir1 is None:
+        state.sweepDir1 = insweepDir1
+        state.sweepDir2 = insweepDir2
+    sweepDir1, sweepDir2 = state.sweepDir1, state.sweepDir2
 
-    if pointing0 is None:
-        pointing0 = np.array([cx, cy])
+    if state.pointing0 is None:
+        state.pointing0 = np.array([cx, cy])
 
     cin = []  # set of new observations (inside or outside from 'tour')
     cind = []  # map indices of the new observation (potential placement in the map)
@@ -93,9 +137,9 @@ def updateGrid(roi, inst_tour, inst_grid, grid_dirx, grid_diry, cx, cy, olapx, o
     epsilon = 0.02
 
     # Build reference tile (it's always going to be the same in subsequent calls)
-    if fpref is None:
+    if state.fpref is None:
         # We need to craft the tile reference that we are going to use throughout the heuristic operations. To avoid
-        # repetitions, we initialize fpref to None and calculate it only on the first call of the function, ensuring
+        # repetitions, we initialize fpref to None and calculate it only on the first call of the planner, ensuring
         # that it is set only once.
 
         _,_,_,bounds = mat2py_getfov(mat2py_bodn2c(inst)[0], 4)  # get fovbounds in the instrument's reference frame
@@ -109,14 +153,20 @@ def updateGrid(roi, inst_tour, inst_grid, grid_dirx, grid_diry, cx, cy, olapx, o
         xbox = np.array([xlimit[0], xlimit[0], xlimit[1], xlimit[1], xlimit[0]])
         ybox = np.array([ylimit[0], ylimit[1], ylimit[1], ylimit[0], ylimit[0]])
 
-        fpref = {
+        state.fpref = {
             'width': width,
             'height': height,
             'bvertices': np.column_stack((xbox, ybox))
         }
+    fpref = state.fpref
 
-    # Project ROI topographical coordinates to instrument's focal plane
-    targetArea = topo2inst(roi, cx, cy, target, sc, inst, et)
+    # Project ROI topographical coordinates to instrument's focal plane. The
+    # projection geometry is shared by all the projections of this step
+    if projection is not None:
+        context = projection.context(et)
+    else:
+        context = projectionContext(inst, sc, target, et, cx, cy)
+    targetArea = topo2inst(roi, cx, cy, target, sc, inst, et, context=context)
     if (np.isnan(targetArea[:, 0])).any():
         nanindex = np.where(np.isnan(targetArea[:, 0]))[0]
         polygon_list = []
@@ -132,6 +182,13 @@ def updateGrid(roi, inst_tour, inst_grid, grid_dirx, grid_diry, cx, cy, olapx, o
     else:
         targetpshape = Polygon(zip(targetArea[:, 0], targetArea[:, 1]))
     targetpshape = targetpshape.buffer(0)
+
+    # Raster of the projected ROI, to evaluate the tiles coverage in O(1)
+    res = coverageRaster.resolution(coverage)
+    if res is not None:
+        raster = coverageRaster(targetpshape, fpref['width'], fpref['height'], res)
+    else:
+        raster = None
     # [Future work]: orientation angle may change over the course of the mosaic
     # targetArea = topo2inst(roi, gamma_topo[0], gamma_topo[1], target, sc, inst, et) #current roi coordinates in the
     # instrument reference frame, when the instrument is pointing at the current grid origin point (next observation)
@@ -157,7 +214,7 @@ def updateGrid(roi, inst_tour, inst_grid, grid_dirx, grid_diry, cx, cy, olapx, o
     # target_polygon = Polygon(orientedArea) # Create a polygon shape
 
     # Get grid shifting due to observation geometry update
-    updated_seed = (topo2inst(np.array([np.array(gamma)]), cx, cy, target, sc, inst, et))
+    updated_seed = (topo2inst(np.array([np.array(gamma)]), cx, cy, target, sc, inst, et, context=context))
 
     if not np.isnan(updated_seed).all() and np.size(updated_seed)!=0:
         updated_seed = updated_seed[0]
@@ -178,30 +235,59 @@ def updateGrid(roi, inst_tour, inst_grid, grid_dirx, grid_diry, cx, cy, olapx, o
     for i in range(len(inst_tour)):
         inst_tour[i] += shift
 
-    # UPDATE GRID
-    # Update map by removing the previous element in the tour (next observation)
-    # Find which position does gamma occupy in this grid
-    ind_row, ind_col = None, None
-    for j in range(len(inst_grid[0])):
-        for i in range(len(inst_grid)):
-            if inst_grid[i][j] is not None and np.linalg.norm(inst_grid[i][j] - old_seed) < 1e-3:
-                ind_row, ind_col = i, j
-                break
-    if old_seed is not None:
-        inst_grid[ind_row][ind_col] = None
+    # Previous tour (shifted) and its topographical coordinates, for the
+    # incremental reprojection
+    if topo_tour is not None and len(topo_tour) == len(inst_tour) and len(inst_tour) > 0:
+        prevtour = cKDTree(np.array([np.reshape(x, 2) for x in inst_tour], dtype=float))
+        prevtopo = np.array([np.reshape(x, 2) for x in topo_tour], dtype=float)
+    else:
+        prevtour, prevtopo = None, None
+
+    # Tiles are identified by their integer coordinates in the grid lattice
+    # (the grid has been shifted, so the lattice origin is the current seed)
+    registry = tileRegistry(seed, grid_dirx, grid_diry, fpref['width'], fpref['height'], olapx, olapy)
 
+    # UPDATE GRID
     # Enclose grid in a bigger matrix (with first and last rows and columns
-    # with NaN values, so we can explore neighbours adequately)
-    map = grid2map(inst_grid)
+    # with NaN values, so we can explore neighbours adequately). The map is
+    # kept in the planner state and edited in place across the updates of the
+    # grid: it shares its points with the grid returned by the previous update
+    # (so they have already been shifted), and it is only built from the grid
+    # on the first update (or on every call without an explicit planner state)
+    if state.map is None or state is defaultState or inst_grid is not state.grid:
+        state.map = growableMap(grid2map(inst_grid))
+        state.frontier = None
+    map = state.map
+
+    # Update map by removing the previous element in the tour (next observation)
+    # Find which position does gamma occupy in this map
+    ind_row, ind_col = registry.index(map).get(registry.key(old_seed), (None, None))
+    if ind_row is not None:
+        inst_grid[ind_row - 1][ind_col - 1] = None  # map indices are shifted by the NaN boundaries
+        map[ind_row, ind_col] = None
 
     # Obtain the frontier tiles in the map: points that have less than 8
-    # neighbours in the grid
-    frontier, indel = getFrontierTiles(map)
+    # neighbours in the grid. The frontier is maintained across the updates
+    # of the grid of a planner, and only built from the whole map on the
+    # first one (or on every call without an explicit planner state)
+    if state.frontier is not None and ind_row is not None:
+        state.frontier.remove(ind_row, ind_col)  # gamma
+    if state.frontier is None or not state.frontier.matches(map):
+        state.frontier = frontierSet(map)
+    frontier, indel = state.frontier.tiles(map)
 
     # Update grid
     openList = copy.deepcopy(frontier) # open list starts as frontier set F
     s = copy.deepcopy(openList)  # seeds: initial open list (frontier tiles)
 
+    # Lattice coordinates of the tour, seeds, open list and evaluated tiles
+    tourkeys = set(registry.keys(inst_tour))
+    seedkeys = set(registry.keys(s))
+    openkeys = set(registry.keys(openList))
+    cinkeys = set()
+    coutkeys = set()
+    wave = {}  # coverage of the evaluated tiles (lattice keys)
+
     while openList:
 
         # For each element in the openList array of grid points...
@@ -211,6 +297,8 @@ def updateGrid(roi, inst_tour, inst_grid, grid_dirx, grid_diry, cx, cy, olapx, o
         # Visited elements are deleted
         indel.pop(0)
         openList.pop(0)
+        okey = registry.key(o)
+        openkeys.discard(okey)
 
         # Pre-allocate variables
         membershipChanged = False  # boolean variable that indicates if the observation point has changed its membership
@@ -220,56 +308,32 @@ def updateGrid(roi, inst_tour, inst_grid, grid_dirx, grid_diry, cx, cy, olapx, o
 
         # Previous check: is the current observation point inside the seeding list? in case it is, let's analyze the
         # neighbouring points (after checking their membership in tour, next point)
-        for i in range(len(s)):
-            if np.array_equal(s[i], o):
-                inSeed = True
-                break
-
-        # Analyze the current element's membership in tour
-        # Compute the current footprint's covered area
-        aux = np.array(o) + np.array(fpref['bvertices'])
-        if (np.isnan(aux[:, 0])).any():
-            nanindex = np.where(np.isnan(aux[:, 0]))[0]
-            polygon_list = []
-            for i in range(len(nanindex)):
-                if i == 0:
-                    polygon_list.append(Polygon(list(zip(aux[:nanindex[0], 0], aux[:nanindex[0], 1]))))
-                else:
-                    polygon_list.append(Polygon(
-                        list(zip(aux[nanindex[i - 1] + 1:nanindex[i], 0], aux[nanindex[i - 1] + 1:nanindex[i], 1]))))
-            if ~ np.isnan(aux[-1, 0]):
-                polygon_list.append(Polygon(list(zip(aux[nanindex[-1] + 1:, 0], aux[nanindex[-1] + 1:, 1]))))
-            fpshape = MultiPolygon(polygon_list)
-        else:
-            fpshape = Polygon((list(zip(aux[:, 0], aux[:, 1]))))
-
-        fpshape = fpshape.buffer(0)
+        inSeed = okey in seedkeys
 
-        inter = (targetpshape.difference(fpshape)).buffer(0)
-        areaI = inter.area
-        areaT = targetpshape.area
-        fpArea = fpshape.area
+        # Analyze the current element's membership in tour. The tiles of the
+        # open list are evaluated together, in waves: when a tile has not been
+        # evaluated yet, it is evaluated with the rest of the open list
+        if okey not in wave:
+            wavetiles = [o] + [p for p, key in zip(openList, registry.keys(openList)) if key not in wave]
+            wave.update(zip(registry.keys(wavetiles), coverTiles(wavetiles, targetpshape, raster, fpref, epsilon)))
+        covered = wave[okey]
 
-        if (areaT - areaI) / fpArea >= epsilon:  # if the observation covers at least a minimum ROI area
+        if covered:  # if the observation covers at least a minimum ROI area
             cin.append(o)  # Add it to the list of covering tiles
             cind.append(currind)
+            cinkeys.add(okey)
 
             # Identify if the observation was already included in the planned tour
-            for i in range(len(inst_tour)):
-                if np.array_equal(o, inst_tour[i].reshape(1,2)):
-                    insideTour = True
-                    break
+            insideTour = okey in tourkeys
             if not insideTour:
                 # If it wasn't included, then its membership changed
                 membershipChanged = True
         else:  # Otherwise (the observation's footprint falls outside the ROI)
             cout.append(o)  # Add it to the list of disposal tiles
+            coutkeys.add(okey)
 
             # Identify if the observation was already included in the planned tour
-            for i in range(len(inst_tour)):
-                if np.array_equal(o, inst_tour[i].reshape(1,2)):
-                    insideTour = True
-                    break
+            insideTour = okey in tourkeys
             if insideTour:
                 # If it was included, then its membership changed
                 membershipChanged = True
@@ -281,71 +345,45 @@ def updateGrid(roi, inst_tour, inst_grid, grid_dirx, grid_diry, cx, cy, olapx, o
 
             # Check if the neighbors are already inside tour (in that case it is not necessary to include them in
             # the openlist for re-evaluation)
-            nindel = []
-            for i in range(len(n)):
-                inTour=False
-                for j in range(len(inst_tour)):
-                    if np.linalg.norm(n[i]-inst_tour[j]) < 1e-5:
-                        inTour=True
-                        break
-                if inTour:
-                    nindel.append(i)
-
-            n = [n[i] for i in range(len(n)) if i not in nindel]
-            nind = [nind[i] for i in range(len(nind)) if i not in nindel]
-
+            nkeys = registry.keys(n)
             for i in range(len(n)):
-
-                # Check if the neighbors are included in the cin or cout sets
-                in1=False
-                in2=False
-                in1 = any(np.linalg.norm(cin_point - n[i]) < 1e-5 for cin_point in cin)
-                in2 = any(np.linalg.norm(cout_point - n[i]) < 1e-5 for cout_point in cout)
+                if nkeys[i] in tourkeys:
+                    continue
 
                 # If the neighbour node is not in the cin list nor in the cout list... then add it to the openList
                 # for evaluation (if not already included)
-                if not in1 and not in2:
-                    if not any(np.linalg.norm(open_point - n[i]) < 1e-5 for open_point in openList): # if it's not
-                    # in openList, then add it
-                        openList.append(n[i])
-                        indel.append(nind[i])
+                if nkeys[i] not in cinkeys and nkeys[i] not in coutkeys and nkeys[i] not in openkeys:
+                    openList.append(n[i])
+                    indel.append(nind[i])
+                    openkeys.add(nkeys[i])
 
     # Identify new tiles N = Cin - Tour
-    for i, c in enumerate(cin):
-        if not any(np.linalg.norm(c - tour_point) < 1e-5 for tour_point in inst_tour): # if c is checked to be outside, include it in the new tiles set
-            N.append(c)
+    for i, key in enumerate(registry.keys(cin)):
+        if key not in tourkeys:  # if c is checked to be outside, include it in the new tiles set
+            N.append(cin[i])
             Nind.append(cind[i])
 
     # Check that new identified tiles are not taboo  (moving backwards in the coverage path)
-    ind_row, ind_col = None, None
-
-    for j in range(len(map[0])):
-        for i in range(len(map)):
-            if not ((j == 0 and i == 0) or (j == len(map[0]) -1 and i == len(map) -1)):
-                if not np.isnan(map[i][j]).all() and np.linalg.norm(map[i][j] - seed) < 1e-3:
-                    ind_row, ind_col = i , j
-                    break
+    ind_row, ind_col = registry.index(map).get(registry.key(seed), (None, None))
 
     # Check that N is not coincident with old_seed...
-    for i in range(len(N)):
-        if np.linalg.norm(N[i] - old_seed) < 1e-5:
+    oldkey = registry.key(old_seed)
+    for i, key in enumerate(registry.keys(N)):
+        if key == oldkey:
             N.pop(i)
             Nind.pop(i)
             break
-    N, Nind = checkTaboo(N, Nind, map, ind_row, ind_col, sweepDir1, sweepDir2)
+    N, Nind = checkTaboo(N, Nind, map, ind_row, ind_col, sweepDir1, sweepDir2, state)
 
     # Identify tiles to remove: X = Cout - Tour
-    X = []
-    for c in cout:
-        if any(np.linalg.norm(c - tour_point) < 1e-5 for tour_point in inst_tour): #if c is checked to be
-            # in 'tour', include it in the  disposable tiles set
-            X.append(c)
+    X = [c for c, key in zip(cout, registry.keys(cout)) if key in tourkeys]  # if c is checked to be in 'tour',
+    # include it in the disposable tiles set
 
     # Remove disposable tiles
-    map = removeTiles(map, X)
+    map = removeTiles(map, X, registry, state.frontier)
 
     # Insert new tiles
-    map = insertTiles(map, N, Nind)
+    map = insertTiles(map, N, Nind, frontier=state.frontier)
 
     # # Plot grid
     # plt.figure()
@@ -361,42 +399,89 @@ def updateGrid(roi, inst_tour, inst_grid, grid_dirx, grid_diry, cx, cy, olapx, o
     # plt.show()
 
     # Boustrophedon decomposition
-    inst_grid = map2grid(map)
-    inst_tour = boustrophedon(inst_grid, sweepDir1, sweepDir2)
+    inst_grid = map.togrid()
+    inst_tour, tourind = boustrophedon(inst_grid, sweepDir1, sweepDir2)
 
-    if inst_tour:
-        topo_tour = inst2topo([inst_tour], cx, cy, target, sc, inst, et)[0]
+    if len(inst_tour) > 0:
+        if prevtour is None:
+            topo_tour, visible = inst2topo([inst_tour], cx, cy, target, sc, inst, et, context=context)
+            topo_tour, visible = topo_tour[0], visible[0]
+        else:
+            topo_tour, visible = reproject(inst_tour, prevtour, prevtopo, cx, cy, target, sc, inst, et, context,
+                                           drift * min(fpref['width'], fpref['height']), limb)
         # Remove empty elements from the tour, which may result from unobservable
         # regions within the planned path
-        emptyCells = [x is None for x in topo_tour]
-        indEmpty = [i for i, x in enumerate(emptyCells) if x]  # find indices of empty cells
-        for k in range(len(indEmpty)):
-            emptyEl = inst_tour[indEmpty[k]]
-            for i in range(len(map)):
-                for j in range(len(map[0])):
-                    if map[i][j] is not None:
-                        if np.linalg.norm(map[i][j] - emptyEl) < 1e-5:
-                            map[i][j] = None
-        topo_tour = [x for i, x in enumerate(topo_tour) if i not in indEmpty]  # remove empty cells
-        # Boustrophedon decomposition
-        inst_grid = map2grid(map)
-        inst_tour = boustrophedon(inst_grid, sweepDir1, sweepDir2)
+        for irow, icol in tourind[~visible]:
+            map[irow + 1, icol + 1] = None  # grid indices are shifted by the map's NaN boundaries
+            state.frontier.remove(irow + 1, icol + 1)
+        topo_tour = [x for x in topo_tour if x is not None]  # remove empty cells
+        # Boustrophedon decomposition: removing cells from the grid does not
+        # alter the sweeping order of the remaining ones
+        inst_grid = map.togrid()
+        inst_tour = list(inst_tour[visible])
         if inst_tour:
             seed = inst_tour[0]
         else:
             seed = None
 
-        # inst_tour = [x for i, x in enumerate(inst_tour) if i not in indEmpty]  # remove empty cells
-        # seed = inst_tour[0]
-        # for i in range(len(emptyCells)):
-        #     if not emptyCells[i]:
-        #         seed = inst_tour[i]
-        #         break
-
     else:
         seed = None
+        inst_tour = []
         topo_tour = []
 
+    state.grid = inst_grid
     return seed, inst_grid, inst_tour, topo_tour
 
 
+def coverTiles(tiles, targetpshape, raster, fpref, epsilon):
+    # Tiles (footprints centered at the input points) that cover at least a
+    # fraction epsilon of the projected ROI, evaluated as a batch
+    centers = np.array([np.reshape(p, 2) for p in tiles], dtype=float)
+    covered = np.zeros(len(centers), dtype=bool)
+    exact = np.ones(len(centers), dtype=bool)
+    if raster is not None:
+        # The raster decides unless the error bound straddles the threshold
+        fraction, bound = raster.fraction(centers)
+        exact = np.abs(fraction - epsilon) <= bound
+        covered[~exact] = fraction[~exact] >= epsilon
+    if exact.any():
+        # Footprints covered area, with a single vectorized polygon operation
+        # (the footprints that do not intersect the ROI have zero coverage)
+        x, y = centers[exact, 0], centers[exact, 1]
+        w, h = fpref['width'], fpref['height']
+        fpshapes = shapely.box(x - w / 2, y - h / 2, x + w / 2, y + h / 2)
+        shapely.prepare(targetpshape)
+        hit = shapely.intersects(targetpshape, fpshapes)
+        fraction = np.zeros(len(fpshapes))
+        areaI = shapely.area(shapely.buffer(shapely.difference(targetpshape, fpshapes[hit]), 0))
+        fraction[hit] = (targetpshape.area - areaI) / shapely.area(fpshapes[hit])
+        covered[exact] = fraction >= epsilon
+    return covered
+
+
+def reproject(inst_tour, prevtour, prevtopo, cx, cy, target, sc, inst, et, context, drift, limb):
+    # Incremental reprojection of the tour: the tiles of the previous tour
+    # keep their topographical coordinates, and only the new ones, those
+    # close to the limb (emission angle above limb) and those whose
+    # coordinates project farther than drift from the tile are projected
+    dist, ind = prevtour.query(inst_tour)
+    known = dist < 1e-5
+    topo = np.zeros((len(inst_tour), 2))
+    topo[known] = prevtopo[ind[known]]
+    if known.any():
+        angle = emissionang(topo[known], et, target, sc)[0]
+        known[np.nonzero(known)[0][angle > limb]] = False
+    if known.any():
+        instpoints = np.reshape(topo2inst(topo[known], cx, cy, target, sc, inst, et, context=context), (-1, 2))
+        tiles = np.reshape(np.asarray(inst_tour, dtype=float), (-1, 2))[known]
+        with np.errstate(invalid='ignore'):
+            moved = ~(np.linalg.norm(instpoints - tiles, axis=1) <= drift)
+        known[np.nonzero(known)[0][moved]] = False
+
+    visible = known.copy()
+    if (~known).any():
+        newtopo, newvisible = inst2topo([inst_tour[~known]], cx, cy, target, sc, inst, et, context=context)
+        visible[~known] = newvisible[0]
+        topo[np.nonzero(~known)[0][newvisible[0]]] = np.reshape([x for x in newtopo[0] if x is not None], (-1, 2))
+    topo_tour = [list(topo[k]) if visible[k] else None for k in range(len(inst_tour))]
+    return topo_tour, visible
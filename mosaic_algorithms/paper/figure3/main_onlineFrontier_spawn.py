@@ -3,6 +3,8 @@ import importlib
 import sys
 from mosaic_algorithms.auxiliar_functions.multiprocess.dataHandling import dataHandling
 from mosaic_algorithms.online_frontier_repair.frontierRepair import frontierRepair
+from mosaic_algorithms.sidewinder.plannerCache import plannerCache
+from mosaic_algorithms.auxiliar_functions.plot.groundtrackSeries import groundtrackSeries
 from mosaic_algorithms.paper.figure3.input_data_fig3 import *  # Load mission info (kernels, SPICE ids, etc.)
 
 
@@ -33,10 +35,14 @@ for i in range(firstroi,lastroi):
     roi = np.array(roistruct[i]['vertices'])
     times = np.linspace(roistruct[i]['inittime'], stoptime, npoints)
     makespan = []
+    cache = plannerCache()  # reuse the initial grid across adjacent initial times
+    hint = {}  # seed each initial time with the plan of the previous one
+    track = groundtrackSeries(sc, target, times[0], times[-1] + 500)  # ground track over the initial times
 
     for init_time in times:
         # Online Frontier
-        A, fpList = frontierRepair(init_time, stoptime, tcadence, inst, sc, target, roi, olapx, olapy, 3 * 1e-3)
+        A, fpList = frontierRepair(init_time, stoptime, tcadence, inst, sc, target, roi, olapx, olapy, 3 * 1e-3,
+                                   cache=cache, track=track, hint=hint)
         if not fpList == []:
             makespan.append(fpList[-1]['t'] + tcadence - init_time)
         else:
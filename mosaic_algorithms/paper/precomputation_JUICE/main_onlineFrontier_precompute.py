@@ -1,5 +1,7 @@
 from area_coverage_planning_python.mosaic_algorithms.auxiliar_functions.multiprocess.dataHandling import dataHandling
 from area_coverage_planning_python.mosaic_algorithms.online_frontier_repair.frontierRepair import frontierRepair
+from area_coverage_planning_python.mosaic_algorithms.sidewinder.plannerCache import plannerCache
+from area_coverage_planning_python.mosaic_algorithms.auxiliar_functions.plot.groundtrackSeries import groundtrackSeries
 from area_coverage_planning_python.mosaic_algorithms.auxiliar_functions.spacecraft_operation.computeResMosaic import computeResMosaic
 from mosaic_algorithms.auxiliar_functions.planetary_coverage.roicoverage import roicoverage
 
@@ -32,11 +34,14 @@ def mosaicOnlineFrontier(timeint, inst, sc, ROIob, instrument, int):
     tcadence = 8.5  # [s] between observations
     olapx = 20  # [%] of overlap in x direction
     olapy = 20  # [%] of overlap in y direction
-
+    cache = plannerCache()  # reuse the initial grid across adjacent initial times
+    hint = {}  # seed each initial time with the plan of the previous one
+    track = groundtrackSeries(sc, target, timeint[0], timeint[-1] + 500)  # ground track over the initial times
 
     for init_time in timeint:
         # Online Frontier
-        A, fpList = frontierRepair(init_time, stoptime, tcadence, inst, sc, target, roi, olapx, olapy, 3 * 1e-3)
+        A, fpList = frontierRepair(init_time, stoptime, tcadence, inst, sc, target, roi, olapx, olapy, 3 * 1e-3,
+                                   cache=cache, track=track, hint=hint)
         if not fpList == []:
             makespan.append(fpList[-1]['t'] + tcadence - init_time)
             nImg.append(len(fpList))
@@ -4,14 +4,19 @@ from conversion_functions import *
 from conversion_functions import mat2py_getfov
 from mosaic_algorithms.auxiliar_functions.grid_functions.boustrophedon import boustrophedon
 from mosaic_algorithms.auxiliar_functions.grid_functions.grid2D import grid2D
+from mosaic_algorithms.auxiliar_functions.grid_functions.gridSearch import gridSearch
 from mosaic_algorithms.auxiliar_functions.grid_functions.inst2topo import inst2topo
 from mosaic_algorithms.auxiliar_functions.grid_functions.topo2inst import topo2inst
+from mosaic_algorithms.auxiliar_functions.spacecraft_operation.projectionContext import projectionContext
 from mosaic_algorithms.auxiliar_functions.polygon_functions.closestSide import closestSide
 from mosaic_algorithms.auxiliar_functions.polygon_functions.minimumWidthDirection import minimumWidthDirection
 from mosaic_algorithms.auxiliar_functions.plot.groundtrack import groundtrack
+from mosaic_algorithms.sidewinder.plannerCache import planentry
+from mosaic_algorithms.sidewinder.warmStart import warmStart
 
 
-def planSidewinderTour(target, roi, sc, inst, inittime, olapx, olapy):
+def planSidewinderTour(target, roi, sc, inst, inittime, olapx, olapy, coverage='exact', cache=None,
+                       fill='floodfill', search=None, track=None, hint=None):
     """
     This function plans an observation tour using a modified Boustrophedon
     decomposition method. It calculates an optimal path for observing a ROI
@@ -26,7 +31,8 @@ def planSidewinderTour(target, roi, sc, inst, inittime, olapx, olapy):
     Date:         09/2022
 
     Usage:        topo_tour, inst_grid, inst_tour, grid_dirx, grid_diry, sweepDir1, sweepDir2 = ...
-                    planSidewinderTour(target, roi, sc, inst, inittime, olapx, olapy, angle)
+                    planSidewinderTour(target, roi, sc, inst, inittime, olapx, olapy, coverage, cache, fill,
+                                       search, track, hint)
     Inputs:
        > target:       string name of the target body
        > roi:          matrix containing the vertices of the uncovered area
@@ -40,6 +46,37 @@ def planSidewinderTour(target, roi, sc, inst, inittime, olapx, olapy):
                        in percentage (width)
        > olapy:        grid footprint overlap in the y direction (latitude),
                        in percentage (height)
+       > coverage:     (optional) tile coverage evaluation mode in the grid
+                       discretization, 'exact' (default) or 'raster'. See
+                       grid2D
+       > cache:        (optional) plannerCache object. If provided, the grid
+                       and tour of a previous planning epoch are reused when
+                       the projected ROI has barely changed, and the current
+                       ones are stored otherwise. Default: None
+       > fill:         (optional) grid discretization algorithm, 'floodfill'
+                       (default) or 'multires'. See grid2D
+       > search:       (optional) dict with the options of the grid origin
+                       and orientation search ('noffsets', 'angles',
+                       'budget', 'processes', and the 'coverage' and 'fill'
+                       modes of the grid builder that ranks the candidates;
+                       see gridSearch). If provided, the grid is built
+                       (with the coverage and fill modes above) only for the
+                       configuration that needs the fewest tiles, instead of
+                       being seeded at the projected ROI centroid.
+                       Default: None (no search)
+       > track:        (optional) groundtrackSeries of the spacecraft that
+                       covers the planning epoch (and 500 s after it), from
+                       which the ground track positions are interpolated.
+                       Default: None (ground track computed with SPICE)
+       > hint:         (optional) dict with the plan of a previous epoch
+                       (e.g., the previous initial time of a sweep), used
+                       to seed the grid and tour when the cache misses: the
+                       previous plan is shifted to the current projection
+                       and kept unless it fails the feasibility checks (see
+                       warmStart). A warm-started plan is also stored in
+                       the cache. The dict is updated in place with the
+                       current plan ('warm' is True if the hint has been
+                       used). An empty dict is a missing hint. Default: None
 
     Returns:
        > topo_tour:    tour path in topographical coordinates (lat/lon on the
@@ -83,8 +120,10 @@ def planSidewinderTour(target, roi, sc, inst, inittime, olapx, olapy):
 
 
 
-    # Project ROI to the instrument plane
-    targetArea = topo2inst(roi, cx, cy, target, sc, inst, inittime)
+    # Project ROI to the instrument plane. The projection geometry at the
+    # initial time is shared by all the projections at that epoch
+    context = projectionContext(inst, sc, target, inittime, cx, cy)
+    targetArea = topo2inst(roi, cx, cy, target, sc, inst, inittime, context=context)
     if (np.isnan(targetArea[:, 0])).any():
         nanindex = np.where(np.isnan(targetArea[:, 0]))[0]
         polygon_list = []
@@ -106,17 +145,31 @@ def planSidewinderTour(target, roi, sc, inst, inittime, olapx, olapy):
     origin[0], origin[1] = poly_aux.centroid.x, poly_aux.centroid.y
 
 
-    # Get minimum width direction of the footprint
-    angle,_,_,_ = minimumWidthDirection(targetArea[:,0],targetArea[:,1])
-    # observation angle, influencing the orientation of the observation footprints and,
-    # therefore, the coverage path orientation
-
     # Retrieve the field of view (FOV) bounds of the instrument and calculate
     # the dimensions of a reference observation footprint
     _, _, _, bounds = mat2py_getfov(mat2py_bodn2c(inst)[0], 4) # get fovbounds in the instrument's reference frame
     maxx, minx = np.max(bounds[0, :]), np.min(bounds[0, :])
     maxy, miny = np.max(bounds[1, :]), np.min(bounds[1, :])
 
+    # Warm start: reuse the grid of a previous planning epoch if the projected
+    # ROI has barely changed since then
+    key = (target, sc, inst, olapx, olapy, coverage, repr(search))
+    entry = None
+    if cache is not None:
+        entry = cache.lookup(key, targetArea, origin, {'width': maxx - minx, 'height': maxy - miny})
+    warm = False
+    if entry is None and hint is not None:
+        entry = warmStart(hint, key, targetArea, origin, {'width': maxx - minx, 'height': maxy - miny})
+        warm = entry is not None
+
+    # Get minimum width direction of the footprint
+    if entry is None:
+        angle,_,_,_ = minimumWidthDirection(targetArea[:,0],targetArea[:,1])
+    else:
+        angle = 0.
+    # observation angle, influencing the orientation of the observation footprints and,
+    # therefore, the coverage path orientation
+
     # Define the footprint reference dimensions and orientation
     fpref = {
         'width': maxx - minx,
@@ -137,29 +190,73 @@ def planSidewinderTour(target, roi, sc, inst, inittime, olapx, olapy):
         angle = 0.
     fpref['angle'] = angle
 
+    # Grid origin (seed) and orientation search: keep the configuration that
+    # discretizes the ROI with the fewest tiles. The candidates are ranked
+    # with the search's (fast) grid builder, and only the selected one is
+    # built below with the requested coverage and fill modes
+    seed = origin
+    if entry is not None:
+        angle = entry['angle']
+    elif search is not None:
+        seed, angle, _ = gridSearch(fpref, olapx, olapy, origin, targetArea, **search)
+        fpref['angle'] = angle
+
     gt1 = np.array([0.,0.])
     gt2 = np.array([0.,0.])
     # Closest polygon side to the spacecraft's ground track position (this
     # will determine the coverage path)
-    gt1[0],gt1[1] = groundtrack(sc, inittime, target) # initial ground track position
-    gt2[0],gt2[1] = groundtrack(sc, inittime + 500, target) # future ground track position
-    gt1 = topo2inst(gt1, cx, cy, target, sc, inst, inittime) # projected initial position
+    if track is not None:
+        gt1[0],gt1[1] = track(inittime) # initial ground track position
+        gt2[0],gt2[1] = track(inittime + 500) # future ground track position
+    else:
+        gt1[0],gt1[1] = groundtrack(sc, inittime, target) # initial ground track position
+        gt2[0],gt2[1] = groundtrack(sc, inittime + 500, target) # future ground track position
+    gt1 = topo2inst(gt1, cx, cy, target, sc, inst, inittime, context=context) # projected initial position
     gt2 = topo2inst(gt2, cx, cy, target, sc, inst, inittime + 500) # projected future position
 
     # Calculate the closest side of the target area to the spacecraft's ground track,
     # determining the observation sweep direction
     sweepDir1, sweepDir2 = closestSide(gt1, gt2, targetArea, angle)
 
-    # Focal plane grid discretization based on the reference footprint (FOV
-    # plane) and specified overlap
-    inst_grid, grid_dirx, grid_diry = grid2D(fpref, olapx, olapy, origin, targetArea)
+    if entry is None:
+        # Focal plane grid discretization based on the reference footprint (FOV
+        # plane) and specified overlap
+        inst_grid, grid_dirx, grid_diry = grid2D(fpref, olapx, olapy, seed, targetArea, coverage, fill)
+
+        # Boustrophedon decomposition to generate grid traversal
+        inst_tour, _ = boustrophedon(inst_grid, sweepDir1, sweepDir2)
+        inst_tour = list(inst_tour)
+
+        if cache is not None:
+            cache.store(key, targetArea, origin, inst_grid, inst_tour, grid_dirx, grid_diry, sweepDir1, sweepDir2,
+                        angle)
+    else:
+        # The stored grid (shifted and adjusted to the current projection) is
+        # reused. The tour is only re-planned if the grid or the sweeping
+        # directions have changed
+        inst_grid, grid_dirx, grid_diry = entry['grid'], entry['dirx'], entry['diry']
+        if entry['adjusted'] or (sweepDir1, sweepDir2) != (entry['sweepDir1'], entry['sweepDir2']):
+            inst_tour, _ = boustrophedon(inst_grid, sweepDir1, sweepDir2)
+            inst_tour = list(inst_tour)
+        else:
+            inst_tour = entry['tour']
 
-    # Boustrophedon decomposition to generate grid traversal
-    inst_tour = boustrophedon(inst_grid, sweepDir1, sweepDir2)
+        if cache is not None and warm:
+            # Refresh the cache with the warm-started plan, so that the next
+            # epochs are compared with the current projection
+            cache.store(key, targetArea, origin, inst_grid, inst_tour, grid_dirx, grid_diry, sweepDir1, sweepDir2,
+                        angle)
 
+    if hint is not None:
+        hint.clear()
+        hint.update(planentry(targetArea, origin, inst_grid, inst_tour, grid_dirx, grid_diry, sweepDir1, sweepDir2,
+                              angle))
+        hint['key'] = key
+        hint['warm'] = warm
 
     # Convert grid and tour from instrument frame to topographical coordinates
-    topo_tour = inst2topo([inst_tour], cx, cy, target, sc, inst, inittime)[0]
+    topo_tour, _ = inst2topo([inst_tour], cx, cy, target, sc, inst, inittime, context=context)
+    topo_tour = topo_tour[0]
 
     # Remove empty elements from the tour, which may result from unobservable regions
     # within the planned path 
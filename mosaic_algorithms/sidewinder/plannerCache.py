@@ -0,0 +1,148 @@
+import copy
+
+import numpy as np
+import shapely
+
+from mosaic_algorithms.auxiliar_functions.grid_functions.coverageRaster import coverageRaster
+from mosaic_algorithms.auxiliar_functions.grid_functions.multiresFill import polygonshape
+
+
+class plannerCache:
+    """
+    Cache of the Sidewinder planning products (projected ROI, grid and
+    tour in the instrument focal plane) across planning epochs. Sweeps over
+    the initial observation time re-plan the same ROI at epochs only minutes
+    apart, when the projection of the ROI onto the focal plane barely
+    changes. If the new projected ROI matches the stored one (up to a
+    translation) within a shape-distance tolerance, the stored grid is
+    shifted to the new projection and adjusted, instead of being rebuilt.
+
+    Usage:        cache = plannerCache(tol)
+                  topo_tour, ... = planSidewinderTour(..., cache=cache)
+
+    Inputs:
+      > tol:          shape-distance tolerance, in fraction of the footprint
+                      size (minimum of its width and height). Two projected
+                      ROIs match if their Hausdorff distance, once their
+                      centroids are aligned, is below this tolerance. It is
+                      set to 0.05 by default
+
+    Attributes:
+      > hits:         number of planning epochs that reused a stored grid
+      > misses:       number of planning epochs that rebuilt the grid
+    """
+
+    def __init__(self, tol=0.05):
+        self.tol = tol
+        self.hits = 0
+        self.misses = 0
+        self.entries = {}
+
+    def lookup(self, key, targetArea, origin, fpref):
+        """
+        Look for a stored grid that can be reused for the input projected
+        ROI. Returns None (cache miss) or the stored grid, shifted to the new
+        ROI projection and with the tiles that no longer cover the ROI
+        removed
+
+        Usage:        entry = cache.lookup(key, targetArea, origin, fpref)
+
+        Inputs:
+          > key:          tuple that identifies the planning problem (target,
+                          spacecraft, instrument, overlaps...)
+          > targetArea:   matrix containing the vertices of the projected ROI
+                          polygon in the instrument focal plane
+          > origin:       centroid of the projected ROI
+          > fpref:        dict with the reference footprint ('width',
+                          'height')
+
+        Outputs:
+          > entry:        dict with the reused planning products: 'grid',
+                          'tour', 'dirx', 'diry', 'sweepDir1', 'sweepDir2',
+                          'angle' and 'adjusted' (True if tiles have been removed
+                          from the grid)
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        # Shape distance between the stored and the new projections, once
+        # their centroids are aligned
+        shift = np.array(origin) - entry['origin']
+        shape = polygonshape(targetArea)
+        dist = shapely.hausdorff_distance(entry['shape'], shapely.transform(shape, lambda x: x - shift))
+        if not dist < self.tol * min(fpref['width'], fpref['height']):
+            self.misses += 1
+            return None
+        self.hits += 1
+        grid, tour, adjusted = shiftgrid(entry, shift, shape.buffer(0), fpref)
+
+        return {
+            'grid': grid,
+            'tour': tour,
+            'dirx': entry['dirx'],
+            'diry': entry['diry'],
+            'sweepDir1': entry['sweepDir1'],
+            'sweepDir2': entry['sweepDir2'],
+            'angle': entry['angle'],
+            'adjusted': adjusted
+        }
+
+    def store(self, key, targetArea, origin, grid, tour, dirx, diry, sweepDir1, sweepDir2, angle=0.):
+        """
+        Store the planning products of the current epoch
+
+        Usage:        cache.store(key, targetArea, origin, grid, tour, dirx, diry,
+                                  sweepDir1, sweepDir2, angle)
+        """
+        self.entries[key] = planentry(targetArea, origin, grid, tour, dirx, diry, sweepDir1, sweepDir2, angle)
+
+    def clear(self):
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return 'plannerCache: %d hits, %d misses' % (self.hits, self.misses)
+
+
+def planentry(targetArea, origin, grid, tour, dirx, diry, sweepDir1, sweepDir2, angle=0.):
+    # Planning products of an epoch (copies, since the grid is modified by
+    # the grid updates of the planner)
+    return {
+        'shape': polygonshape(targetArea),
+        'origin': np.array(origin, dtype=float),
+        'grid': copy.deepcopy(grid),
+        'tour': [np.array(point, dtype=float) for point in tour],
+        'dirx': dirx,
+        'diry': diry,
+        'sweepDir1': sweepDir1,
+        'sweepDir2': sweepDir2,
+        'angle': angle
+    }
+
+
+def shiftgrid(entry, shift, shape, fpref, epsilon=0.05):
+    # Grid and tour of a stored entry shifted to a new projection, with the
+    # tiles that no longer cover the minimum ROI area (shape) removed (same
+    # criterion as the flood-fill algorithm)
+    grid = copy.deepcopy(entry['grid'])
+    for i in range(len(grid)):
+        for j in range(len(grid[i])):
+            if grid[i][j] is not None:
+                grid[i][j] = grid[i][j] + shift
+    tour = [point + shift for point in entry['tour']]
+
+    raster = coverageRaster(shape, fpref['width'], fpref['height'])
+    adjusted = False
+    for i in range(len(grid)):
+        for j in range(len(grid[i])):
+            if grid[i][j] is not None:
+                fraction, bound = raster.fraction(grid[i][j])
+                if abs(fraction - epsilon) <= bound:
+                    fraction = raster.exact(grid[i][j])
+                if not fraction > epsilon:
+                    grid[i][j] = None
+                    adjusted = True
+    return grid, tour, adjusted
@@ -0,0 +1,74 @@
+import numpy as np
+import shapely
+
+from mosaic_algorithms.auxiliar_functions.grid_functions.multiresFill import polygonshape
+from mosaic_algorithms.sidewinder.plannerCache import shiftgrid
+
+
+def warmStart(hint, key, targetArea, origin, fpref, epsilon=0.05):
+    """
+    Seed the Sidewinder grid and tour of a planning epoch with the plan of a
+    previous epoch (hint). The previous grid and tour are shifted to the new
+    projection of the ROI onto the focal plane, and the tiles that no longer
+    cover the minimum ROI area are removed. Unlike the plannerCache lookup,
+    the previous plan is not required to match the new projection: it is
+    accepted as long as it passes the feasibility checks, i.e., it belongs
+    to the same planning problem and its tiles still cover the projected
+    ROI.
+
+    Usage:        entry = warmStart(hint, key, targetArea, origin, fpref)
+
+    Inputs:
+      > hint:         dict with the planning products of a previous epoch
+                      ('key', 'shape', 'origin', 'grid', 'tour', 'dirx',
+                      'diry', 'sweepDir1', 'sweepDir2', 'angle'; see
+                      planSidewinderTour). An empty dict is a missing hint
+      > key:          tuple that identifies the planning problem (target,
+                      spacecraft, instrument, overlaps...)
+      > targetArea:   matrix containing the vertices of the projected ROI
+                      polygon in the instrument focal plane
+      > origin:       centroid of the projected ROI
+      > fpref:        dict with the reference footprint ('width', 'height')
+      > epsilon:      maximum uncovered area of the projected ROI, in
+                      fraction of the footprint area. It is set to 0.05 by
+                      default (minimum tile coverage of the flood-fill
+                      algorithm)
+
+    Outputs:
+      > entry:        None if the hint is rejected, or dict with the seeded
+                      planning products: 'grid', 'tour', 'dirx', 'diry',
+                      'sweepDir1', 'sweepDir2', 'angle' and 'adjusted' (True
+                      if tiles have been removed from the grid)
+    """
+    if not hint or hint.get('key') != key:
+        return None
+
+    # Shift the previous plan to the new projection
+    shift = np.array(origin) - hint['origin']
+    shape = polygonshape(targetArea).buffer(0)
+    grid, tour, adjusted = shiftgrid(hint, shift, shape, fpref, epsilon)
+
+    # Feasibility checks: the shifted tiles (footprints oriented along the
+    # grid directions) must cover the projected ROI
+    points = np.array([np.ravel(point)[:2] for row in grid for point in row
+                       if point is not None and not np.isnan(point).any()])
+    if points.size == 0 or len(tour) == 0:
+        return None
+    dirx = np.asarray(hint['dirx'], dtype=float) * fpref['width'] / 2
+    diry = np.asarray(hint['diry'], dtype=float) * fpref['height'] / 2
+    corners = np.stack((points - dirx - diry, points + dirx - diry, points + dirx + diry,
+                        points - dirx + diry), axis=1)
+    tiles = shapely.union_all(shapely.polygons(corners))
+    if shape.difference(tiles).area > epsilon * fpref['width'] * fpref['height']:
+        return None
+
+    return {
+        'grid': grid,
+        'tour': tour,
+        'dirx': hint['dirx'],
+        'diry': hint['diry'],
+        'sweepDir1': hint['sweepDir1'],
+        'sweepDir2': hint['sweepDir2'],
+        'angle': hint['angle'],
+        'adjusted': adjusted
+    }
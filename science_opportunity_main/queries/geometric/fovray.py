@@ -1,48 +1,130 @@
 import numpy as np
+import shapely
+from shapely.geometry import Polygon
 from conversion_functions import *
-from mosaic_algorithms.auxiliar_functions.grid_functions.topo2inst import topo2inst
+from mosaic_algorithms.auxiliar_functions.spacecraft_operation.instpointing import pointingstack
 from mosaic_algorithms.auxiliar_functions.plot.trgobsvec import trgobsvec
 
-def fovray(inst, target, obs, et, lon, lat, *varargin):
-    # Pre-allocate variables
-    _, rframe, _ = mat2py_cnmfrm(target)  # target frame ID in SPICE
+def fovray(inst, target, obs, et, lon, lat, *varargin, context=None):
+    """
+    This function determines if a set of target surface points are inside
+    the instrument FOV at a set of epochs
+
+    Usage:        visible = fovray(inst, target, obs, et, lon, lat)
+                  visible = fovray(inst, target, obs, et, lon, lat, blon, blat, context=context)
+
+    Inputs:
+      > inst:         string name of the instrument
+      > target:       string name of the target body
+      > obs:          string name of the observer (spacecraft)
+      > et:           epoch or array of M epochs, TDB seconds past J2000
+      > lon:          longitude of the N surface points, in [deg]
+      > lat:          latitude of the N surface points, in [deg]
+      > blon, blat:   (optional) latitudinal coordinates at which the
+                      instrument boresight is pointing (3-axis steerable
+                      spacecraft), in [deg]. If they are not provided, the
+                      spacecraft attitude is retrieved from the CK
+      > context:      (keyword) projectionContext of the epoch and pointing,
+                      reused instead of querying the pointing again (only
+                      with a single epoch)
+
+    Outputs:
+      > visible:      boolean if et, lon and lat are scalars. Otherwise,
+                      (M,N) boolean matrix, True if the n-th point is inside
+                      the FOV at the m-th epoch
+    """
+    scalar = np.ndim(et) == 0 and np.ndim(lon) == 0 and np.ndim(lat) == 0
+    ets = np.array(et, dtype=float).reshape(-1)
+    coords = np.column_stack((np.array(lon, dtype=float).reshape(-1), np.array(lat, dtype=float).reshape(-1)))
+    visible = np.zeros((len(ets), len(coords)), dtype=bool)
 
     if len(varargin) > 0:
         # Determine spacecraft attitude according to lon, lat boresight pointing
         blon = varargin[0]
         blat = varargin[1]
-        if np.isscalar(lon) and np.isscalar(lat):
-            coords = np.array([[lon, lat]])
+
+        # Pointing at the M epochs (rotation matrices from the instrument
+        # frame to the target frame, and FOV bounds), in a single batch
+        if context is not None and len(ets) == 1 and context.matches(inst, obs, target, ets[0], blon, blat):
+            fovbounds, rotmat, vertex = context.fovbounds[None], context.rotmat[None], context.vertex[None]
         else:
-            coords = np.column_stack((lon, lat))
+            fovbounds, _, rotmat, _ = pointingstack(inst, target, obs, ets, np.full(len(ets), blon),
+                                                    np.full(len(ets), blat))
+            _, targetframe, _ = mat2py_cnmfrm(target)  # target frame ID in SPICE
+            vertex, _ = mat2py_spkpos(obs, ets[0] if len(ets) == 1 else ets, targetframe, 'NONE', target)
+            vertex = np.reshape(np.transpose(vertex), (-1, 3))
 
         # Project latitudinal coordinates on body surface to focal plane
-        instpoint = topo2inst(coords, blon, blat, target, obs, inst, et)
-        if np.isnan(instpoint).any() or instpoint.size == 0:
-            # Point is not visible
-            visible = False
-            return visible
-
-        # If point is visible, let's check if it is inside the FOV limits
-        # Retrieve FOV parameters
-        _, _, _, bounds = mat2py_getfov(mat2py_bodn2c(inst)[0],4)  # instrument FOV's boundary vectors in the
-        # instrument frame
-        # Get min-max FOV boundaries in the focal plane
-        maxx = np.max(bounds[0, :])
-        minx = np.min(bounds[0, :])
-        maxy = np.max(bounds[1, :])
-        miny = np.min(bounds[1, :])
-
-        if minx <= instpoint[0][0] <= maxx and miny <= instpoint[0][1] <= maxy:
-            # Point is visible and in FOV
-            visible = True
-        else:
-            # Point is visible but not in FOV
-            visible = False
+        # (same projection as topo2inst), for all epochs and points: (M,N)
+        radii = mat2py_bodvrd(target, 'RADII', 3)
+        rlon, rlat = np.radians(coords[:, 0]), np.radians(coords[:, 1])
+        u = np.column_stack((np.cos(rlat) * np.cos(rlon), np.cos(rlat) * np.sin(rlon), np.sin(rlat)))
+        srfpoints = u / np.sqrt(np.sum((u / radii) ** 2, axis=1))[:, np.newaxis]
+        dirs = srfpoints[np.newaxis] - vertex[:, np.newaxis]
+        boresight = rotmat[:, :, 2]
+        den = np.einsum('mnk,mk->mn', dirs, boresight)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            s = np.einsum('mk,mk->m', boresight, fovbounds[:, :, 0])[:, np.newaxis] / den
+            instpoint = s[..., np.newaxis] * np.einsum('mnk,mkj->mnj', dirs, rotmat)[..., :2]
+        instpoint[~((den != 0) & (s >= 0))] = np.nan
+
+        # FOV parameters: instrument FOV's boundary vectors in the
+        # instrument frame. Get min-max FOV boundaries in the focal plane
+        bounds = np.einsum('mki,mkj->mij', rotmat, fovbounds)
+        maxx, minx = np.max(bounds[:, 0, :], axis=1)[:, None], np.min(bounds[:, 0, :], axis=1)[:, None]
+        maxy, miny = np.max(bounds[:, 1, :], axis=1)[:, None], np.min(bounds[:, 1, :], axis=1)[:, None]
+
+        # Points that are projected (not NaN) and inside the FOV limits
+        with np.errstate(invalid='ignore'):
+            visible[:] = ((minx <= instpoint[..., 0]) & (instpoint[..., 0] <= maxx) &
+                          (miny <= instpoint[..., 1]) & (instpoint[..., 1] <= maxy))
     else:
-        # Check point in FOV by retrieving spacecraft attitude from CK
-        abcorr = 'NONE'
-        raydir = -trgobsvec([lon, lat], et, target, obs)
-        visible = mat2py_fovray(inst, raydir, rframe, abcorr, obs, et)
+        # Check point in FOV by retrieving spacecraft attitude from CK: the
+        # FOV and the instrument attitude are resolved once per epoch, and
+        # the rays to all the points are tested at once in the instrument
+        # frame
+        _, rframe, _ = mat2py_cnmfrm(target)  # target frame ID in SPICE
+        shape, instframe, boresight, bounds = mat2py_getfov(mat2py_bodn2c(inst)[0], 4)
+
+        # Ray directions from the observer to the surface points, for all
+        # epochs and points: (M,N,3)
+        raydir = np.ascontiguousarray(-trgobsvec(coords, ets, target, obs)[0])
+        for m in range(len(ets)):
+            rays = raydir[m] @ np.array(mat2py_pxform(rframe, instframe, ets[m])).T
+            visible[m, :] = raysinfov(rays, shape, boresight, bounds)
 
+    if scalar:
+        return bool(visible[0, 0])
     return visible
+
+
+def raysinfov(rays, shape, boresight, bounds):
+    # Rays (N,3) inside the FOV, in the instrument frame. The rays and the
+    # FOV boundary vectors are projected onto the plane orthogonal to the
+    # boresight, at the boresight distance (same test as SPICE's fovray)
+    b = boresight / np.linalg.norm(boresight)
+    depth = rays @ b
+    if shape == 'CIRCLE':
+        cosfov = (bounds[:, 0] @ b) / np.linalg.norm(bounds[:, 0])
+        return depth / np.linalg.norm(rays, axis=1) >= cosfov
+
+    # In-plane basis: first boundary vector direction and its orthogonal
+    e1 = bounds[:, 0] - (bounds[:, 0] @ b) * b
+    e1 = e1 / np.linalg.norm(e1)
+    e2 = np.cross(b, e1)
+    fbounds = bounds / (b @ bounds)
+    fbounds = np.column_stack((e1 @ fbounds, e2 @ fbounds))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        points = rays / depth[:, None]
+    x, y = points @ e1, points @ e2
+    front = depth > 0
+    if shape == 'ELLIPSE':
+        # Semi-axes given by the two boundary vectors
+        a, c = np.linalg.norm(fbounds[0]), np.linalg.norm(fbounds[1])
+        u, v = fbounds[0] / a, fbounds[1] / c
+        with np.errstate(invalid='ignore'):
+            return front & (((x * u[0] + y * u[1]) / a) ** 2 + ((x * v[0] + y * v[1]) / c) ** 2 <= 1)
+    # Rectangle or polygon
+    inside = np.zeros(len(rays), dtype=bool)
+    inside[front] = shapely.contains_xy(Polygon(fbounds).buffer(1e-12), x[front], y[front])
+    return inside
@@ -46,7 +46,7 @@ def main():
     dir2 = 'east'  # Secondary direction ('north', 'south', 'east', 'west')
 
     # Call the boustrophedon function
-    tour = boustrophedon(grid, dir1, dir2)
+    tour, _ = boustrophedon(grid, dir1, dir2)
 
     # Visualization
     visualize_tour(grid, tour, grid_spacing, num_rows, num_cols)
@@ -0,0 +1,88 @@
+"""
+Test Script for boustrophedon Function ('bearing' query)
+
+This script tests the `boustrophedon` function with the 'bearing' query, which returns the sweeping directions at
+the first observation point of the tour, against the reference implementation (boustrophedonMod) that walked the
+grid cell by cell. Random grids with empty rows and columns are evaluated for every pair of sweeping directions.
+"""
+
+# Import external packages
+import numpy as np
+
+# Import local packages
+from mosaic_algorithms.auxiliar_functions.grid_functions.boustrophedon import boustrophedon
+
+
+def boustrophedonMod(grid, dir1, dir2):
+    # Reference implementation: the grid is walked cell by cell until the
+    # first observation point, switching the coverage direction after each
+    # row (or column)
+    sweep = dir2 in ['east', 'south']
+    currdir1, currdir2 = dir1, dir2
+    start = False
+    bearing = sweep
+    if dir1 in ['north', 'south']:  # Horizontal sweep
+        for i in range(len(grid)):
+            irow = i if dir1 == 'south' else len(grid) - i - 1
+            for j in range(len(grid[0])):
+                icol = j if bearing else len(grid[0]) - j - 1
+                if grid[irow][icol] is not None:
+                    start = True
+                    break
+            if start:
+                break
+            bearing = not bearing
+    elif dir1 in ['east', 'west']:  # Vertical sweep
+        for i in range(len(grid[0])):
+            icol = len(grid[0]) - i - 1 if dir1 == 'west' else i
+            for j in range(len(grid)):
+                irow = j if bearing else len(grid) - j - 1
+                if grid[irow][icol] is not None:
+                    start = True
+                    break
+            if start:
+                break
+            bearing = not bearing
+
+    # Adjust direction after sweeping
+    if bearing:
+        if dir2 == 'west':
+            currdir2 = 'east'
+        elif dir2 == 'north':
+            currdir2 = 'south'
+    else:
+        if dir2 == 'east':
+            currdir2 = 'west'
+        elif dir2 == 'south':
+            currdir2 = 'north'
+    return currdir1, currdir2
+
+
+# Define the main function
+def main():
+    """
+    Main function to execute the boustrophedon bearing test.
+
+    - Builds random sparse grids (with empty rows and columns).
+    - Queries the sweeping directions with both implementations.
+    - Compares the results.
+    """
+
+    np.random.seed(0)
+    directions = [('north', 'east'), ('north', 'west'), ('south', 'east'), ('south', 'west'),
+                  ('east', 'north'), ('east', 'south'), ('west', 'north'), ('west', 'south')]
+    mismatches = 0
+    cases = 0
+    for k in range(200):
+        rows, cols = np.random.randint(1, 8, size=2)
+        density = np.random.choice([0.05, 0.2, 0.6])
+        grid = [[np.random.rand(2) if np.random.rand() < density else None for _ in range(cols)] for _ in range(rows)]
+        for dir1, dir2 in directions:
+            cases += 1
+            mismatches += boustrophedon(grid, dir1, dir2, 'bearing') != boustrophedonMod(grid, dir1, dir2)
+
+    print(f"boustrophedon 'bearing': {mismatches} mismatches with boustrophedonMod in {cases} cases")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Test Script for coverageRaster Class
+
+This script tests the `coverageRaster` class by evaluating the coverage fraction of a set of tiles over a simple
+polygonal region, both from the raster and with exact polygon operations.
+It visualizes the raster error of every tile against its error bound to verify the correctness of the bound, and
+checks that, on a large region, the tiles along the boundary rarely fall back to the exact computation.
+"""
+
+# Import external packages
+import numpy as np
+import matplotlib.pyplot as plt
+import shapely
+from shapely.geometry import Polygon
+
+# Import local packages
+from mosaic_algorithms.auxiliar_functions.grid_functions.coverageRaster import coverageRaster
+
+
+def tolerance(polygon, w, h):
+    # Round-off error of the exact coverage fraction, which is computed as the
+    # difference of two polygon areas
+    return 64 * np.finfo(float).eps * (polygon.area + w * h) / (w * h)
+
+
+# Define the main function
+def main():
+    """
+    Main function to execute the coverage raster test.
+
+    - Defines a target area (polygon).
+    - Builds the raster for several resolutions, and for a large target area.
+    - Compares the raster coverage fractions with the exact ones.
+    - Checks the fraction of exact fallbacks along the boundary of the large target area.
+    - Visualizes the results.
+    """
+
+    # Define the target area as a simple polygon (e.g., a rectangle with a triangular cutout)
+    target_area = np.array([
+        [0, 0],
+        [10, 0],
+        [10, 5],
+        [5, 8],
+        [0, 5],
+        [0, 0]
+    ])
+    polygon = Polygon(target_area)
+
+    # Tile (footprint) parameters
+    w, h = 1.0, 0.8
+
+    # Random tile centers around the target area
+    centers = np.random.uniform([-1, -1], [11, 9], size=(500, 2))
+
+    fig, ax = plt.subplots(figsize=(8, 6))
+    for res in [8, 16, 32, 'auto']:
+        raster = coverageRaster(polygon, w, h, res)
+        fraction, bound = raster.fraction(centers)
+        exact = np.array([raster.exact(c) for c in centers])
+        error = np.abs(fraction - exact)
+        error = np.maximum(error - tolerance(polygon, w, h), 0.)
+        print(f"res = {res}: max error = {error.max():.2e}, max bound = {bound.max():.2e}, "
+              f"worst-case error = {raster.maxerror:.2e}, bound violations = {np.sum(error > bound)}")
+        ax.scatter(bound, error, s=10, label=f'{min(w, h) / raster.pxsize:.0f} px per footprint side')
+
+    # The default resolution is kept for large ROIs (here, ~1000 footprints across): only the raster blocks along
+    # the boundary store pixels
+    large = Polygon(target_area * 100)
+    raster = coverageRaster(large, w, h)
+    centers_large = np.random.uniform([-1, -1], [1001, 801], size=(200, 2))
+    fraction, bound = raster.fraction(centers_large)
+    exact = np.array([raster.exact(c) for c in centers_large])
+    print(f"large ROI: {raster.npixels} of {raster.nx * raster.ny} pixels stored, "
+          f"{min(w, h) / raster.pxsize:.2f} px per footprint side, "
+          f"bound violations = {np.sum(np.abs(fraction - exact) > bound + tolerance(large, w, h))}")
+
+    # Tiles along the boundary of the large ROI: the keep/discard decisions (coverage threshold of the grid
+    # builders) that fall back to the exact computation must be rare
+    epsilon = 0.05
+    distance = np.random.uniform(0, large.exterior.length, 2000)
+    centers_boundary = shapely.get_coordinates(shapely.line_interpolate_point(large.exterior, distance))
+    centers_boundary += np.random.uniform([-w, -h], [w, h], size=(2000, 2))
+    fraction, bound = raster.fraction(centers_boundary)
+    fallback = np.mean(np.abs(fraction - epsilon) <= bound)
+    print(f"large ROI: {100 * fallback:.1f}% of the boundary tiles fall back to the exact computation")
+    assert fallback < 0.02
+
+    # Errors must lie below the diagonal
+    ax.plot([0, 0.1], [0, 0.1], 'k--')
+    ax.legend()
+    ax.set_title('Coverage Raster Test')
+    ax.set_xlabel('Error bound')
+    ax.set_ylabel('Coverage fraction error')
+    plt.show()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Test Script for frontierSet and tileRegistry Classes
+
+This script tests the incremental frontier of the frontier repair grid (`frontierSet`) and the lattice indexing of
+its grid points (`tileRegistry`) on a randomly edited map. After every insertion (through `insertTiles`, including
+map relocations) and removal, the maintained frontier is compared with the full-map scan of `getFrontierTiles`.
+It visualizes the map and its frontier tiles at the end of the edits.
+"""
+
+# Import external packages
+import numpy as np
+import matplotlib.pyplot as plt
+
+# Import local packages
+from mosaic_algorithms.online_frontier_repair.frontierSet import frontierSet
+from mosaic_algorithms.online_frontier_repair.getFrontierTiles import getFrontierTiles
+from mosaic_algorithms.online_frontier_repair.grid2map import grid2map
+from mosaic_algorithms.online_frontier_repair.growableMap import growableMap
+from mosaic_algorithms.online_frontier_repair.insertTiles import insertTiles
+from mosaic_algorithms.online_frontier_repair.tileRegistry import tileRegistry
+
+
+# Define the main function
+def main():
+    """
+    Main function to execute the frontier set test.
+
+    - Builds a rotated grid of points with random holes.
+    - Checks the lattice keys of the grid points.
+    - Inserts and removes random tiles, comparing the frontier with getFrontierTiles.
+    - Checks the detection of untracked edits.
+    - Visualizes the results.
+    """
+
+    np.random.seed(0)
+
+    # Grid parameters (rotated lattice)
+    w, h = 1.0, 0.8
+    olapx, olapy = 20, 10
+    angle = np.deg2rad(20)
+    dirx = np.array([np.cos(angle), np.sin(angle)])
+    diry = np.array([-np.sin(angle), np.cos(angle)])
+    origin = np.array([3.0, -2.0])
+    dx, dy = w * (1 - olapx / 100) * dirx, h * (1 - olapy / 100) * diry
+
+    # Grid of 8 x 10 points with random holes: grid[i][j] has lattice key (j, -i)
+    grid = [[origin + j * dx - i * dy if np.random.rand() > 0.2 else None for j in range(10)] for i in range(8)]
+    map = grid2map(grid)
+
+    # Lattice keys of the grid points
+    registry = tileRegistry(origin, dirx, diry, w, h, olapx, olapy)
+    index = registry.index(map)
+    wrong = sum(index.get((j, -i)) != [i + 1, j + 1] for i in range(8) for j in range(10) if grid[i][j] is not None)
+    print(f"tileRegistry: {len(index)} grid points, {wrong} wrong keys")
+
+    # Random edits of the map (matches compares the grid points of the whole map)
+    frontierSet.debug = True
+    frontier = frontierSet(map)
+    mismatches = 0
+    for k in range(300):
+        if np.random.rand() < 0.5:
+            # Insertion at a random position (possibly beyond the map boundaries)
+            i = np.random.randint(-1, len(map) + 1)
+            j = np.random.randint(-1, len(map[0]) + 1)
+            map = insertTiles(map, [np.random.rand(2)], [[i, j]], frontier=frontier)
+        else:
+            # Removal of a random grid point
+            cells = [(i, j) for i in range(len(map)) for j in range(len(map[0])) if not np.isnan(map[i][j]).any()]
+            i, j = cells[np.random.randint(len(cells))]
+            map[i][j] = np.array([np.nan, np.nan])
+            frontier.remove(i, j)
+
+        tiles, indel = frontier.tiles(map)
+        reftiles, refindel = getFrontierTiles(map)
+        if not frontier.matches(map) or indel != refindel:
+            mismatches += 1
+    print(f"frontierSet: {mismatches} mismatches with getFrontierTiles in 300 random edits")
+
+    # Edits of a growableMap outside of the frontier-aware helpers are detected by its point count
+    frontierSet.debug = False
+    growable = growableMap(map)
+    frontier = frontierSet(growable)
+    i, j = frontier.tiles(growable)[1][0]
+    growable[i, j] = None
+    print(f"frontierSet: untracked removal detected = {not frontier.matches(growable)}")
+
+    # Visualization of the final map and its frontier
+    fig, ax = plt.subplots(figsize=(8, 6))
+    cells = np.array([[i, j] for i in range(len(map)) for j in range(len(map[0])) if not np.isnan(map[i][j]).any()])
+    indel = np.array(frontier.tiles(map)[1])
+    ax.scatter(cells[:, 1], -cells[:, 0], c='lightgray', label='Grid points')
+    ax.scatter(indel[:, 1], -indel[:, 0], c='red', s=10, label='Frontier tiles')
+    ax.legend()
+    ax.set_title('Frontier Set Test')
+    ax.set_xlabel('Column')
+    ax.set_ylabel('Row')
+    plt.show()
+
+
+if __name__ == "__main__":
+    main()
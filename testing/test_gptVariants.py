@@ -0,0 +1,80 @@
+"""
+Test Script for the _gpt Function Variants
+
+This script checks that the callers of the `_gpt` function variants (e.g., planSidewinderTour2_gpt) stay consistent
+with the functions they import, which are independent of their non-`_gpt` counterparts: every module is imported,
+the number of values unpacked at each call site is compared with the number of values returned by the callee, and
+boustrophedon_gpt is called on a toy grid.
+"""
+
+# Import external packages
+import ast
+import importlib
+import inspect
+import textwrap
+
+# Import local packages
+from mosaic_algorithms.auxiliar_functions.grid_functions.boustrophedon_gpt import boustrophedon
+
+
+def returncount(func):
+    # Number of values returned by a function (None if it varies or is unknown)
+    tree = ast.parse(textwrap.dedent(inspect.getsource(func)))
+    counts = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Return) and node.value is not None:
+            counts.add(len(node.value.elts) if isinstance(node.value, ast.Tuple) else 1)
+    return counts.pop() if len(counts) == 1 else None
+
+
+def callsites(module):
+    # Call sites of the _gpt functions imported by a module: (line, function
+    # name, callee module, number of unpacked values)
+    tree = ast.parse(inspect.getsource(module))
+    imported = {}
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom) and node.module and node.module.endswith('_gpt'):
+            for alias in node.names:
+                imported[alias.asname or alias.name] = (node.module, alias.name)
+    sites = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign) and isinstance(node.value, ast.Call) and \
+                isinstance(node.value.func, ast.Name) and node.value.func.id in imported:
+            target = node.targets[0]
+            nvalues = len(target.elts) if isinstance(target, ast.Tuple) else 1
+            sites.append((node.lineno, node.value.func.id, imported[node.value.func.id], nvalues))
+    return sites
+
+
+# Define the main function
+def main():
+    """
+    Main function to execute the _gpt variants smoke check.
+
+    - Imports the modules that call _gpt variants.
+    - Compares the unpacked values of every call site with the callee returns.
+    - Calls boustrophedon_gpt on a toy grid.
+    """
+
+    callers = ['mosaic_algorithms.sidewinder.planSidewinderTour2_gpt']
+    mismatches = 0
+    for name in callers:
+        module = importlib.import_module(name)
+        for lineno, func, (modname, funcname), nvalues in callsites(module):
+            nreturn = returncount(getattr(importlib.import_module(modname), funcname))
+            if nreturn is not None and nreturn != nvalues:
+                mismatches += 1
+                print(f"{name}:{lineno}: {func} returns {nreturn} value(s), {nvalues} unpacked")
+
+    # boustrophedon_gpt returns the tour only (a list of grid points)
+    grid = [[None, [1, 2], None],
+            [[3, 4], None, [5, 6]],
+            [None, [7, 8], None]]
+    tour = boustrophedon(grid, 'north', 'east')
+    mismatches += not (isinstance(tour, list) and len(tour) == 4 and all(len(point) == 2 for point in tour))
+
+    print(f"_gpt variants: {mismatches} inconsistent call sites")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Test Script for gridSearch Function
+
+This script tests the `gridSearch` function, which looks for the grid origin that discretizes a region of interest
+with the fewest tiles. For random regions, the selected grid must never need more tiles than the (non-empty) grid
+seeded at the input point, and the reported number of tiles must match the grid built with the selected origin.
+"""
+
+# Import external packages
+import numpy as np
+
+# Import local packages
+from mosaic_algorithms.auxiliar_functions.grid_functions.grid2D import grid2D
+from mosaic_algorithms.auxiliar_functions.grid_functions.gridSearch import gridSearch
+
+
+def tiles(grid):
+    return sum(cell is not None for row in grid for cell in row)
+
+
+# Define the main function
+def main():
+    """
+    Main function to execute the grid search test.
+
+    - Defines random target areas (star-shaped polygons).
+    - Searches the grid origin (sequentially and with a time budget).
+    - Checks the number of tiles against the seeded grid.
+    """
+
+    rng = np.random.default_rng(1)
+    worse = wrong = 0
+    saved = []
+    for k in range(20):
+        n = rng.integers(5, 12)
+        ang = np.sort(rng.uniform(0, 2 * np.pi, n))
+        r = rng.uniform(2, 6, n)
+        target_area = np.column_stack((r * np.cos(ang), r * np.sin(ang)))
+        fpref = {'width': rng.uniform(0.5, 1.5), 'height': rng.uniform(0.5, 1.5), 'angle': 0.}
+        seed = [0., 0.]
+
+        base = tiles(grid2D(fpref, 20, 20, seed, target_area, fill='multires')[0])
+        gamma, angle, ntiles = gridSearch(fpref, 20, 20, seed, target_area, noffsets=3, fill='multires')
+        best = tiles(grid2D(fpref, 20, 20, gamma, target_area, fill='multires')[0])
+        # An empty seeded grid (seed outside of the ROI) is not a valid configuration
+        worse += 0 < base < ntiles
+        wrong += ntiles != best
+        if base > 0:
+            saved.append(base - ntiles)
+
+        # With an exhausted budget, only the input configuration is evaluated
+        _, _, nbudget = gridSearch(fpref, 20, 20, seed, target_area, noffsets=3, budget=0., fill='multires')
+        wrong += nbudget != base
+
+    print(f"gridSearch: {worse} searches worse than the seeded grid, {wrong} wrong tile counts, "
+          f"{np.mean(saved):.1f} tiles saved on average")
+
+
+if __name__ == "__main__":
+    main()
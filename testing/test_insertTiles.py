@@ -0,0 +1,91 @@
+"""
+Test Script for insertTiles Function
+
+This script tests the `insertTiles` function, backed by a growable map, against the reference implementation that
+deep-copies the map on every relocation. Random tiles are inserted inside and beyond the map boundaries, both in a
+list of lists and in a growableMap kept across the insertions (edited in place), and the resulting maps must be
+identical.
+"""
+
+# Import external packages
+import copy
+import numpy as np
+
+# Import local packages
+from mosaic_algorithms.online_frontier_repair.grid2map import grid2map
+from mosaic_algorithms.online_frontier_repair.growableMap import growableMap
+from mosaic_algorithms.online_frontier_repair.insertTiles import insertTiles
+
+
+def samemap(a, b):
+    return len(a) == len(b) and all(len(x) == len(y) for x, y in zip(a, b)) and \
+        all(np.array_equal(p, q, equal_nan=True) for x, y in zip(a, b) for p, q in zip(x, y))
+
+
+def insertTilesReference(map, newp, indp):
+    # Reference implementation: the map is deep-copied and rebuilt on every
+    # relocation
+    offcol = 0
+    offrow = 0
+    for i in range(len(newp)):
+        aux_map = copy.deepcopy(map)
+        indel = indp[i]
+        indel[0] += offrow
+        indel[1] += offcol
+        offrow0 = offrow
+        offcol0 = offcol
+        if indel[0] >= (len(map) - 1):
+            nrows = 2 + indel[0] - len(map)
+            map = aux_map + [[np.array([np.nan, np.nan]) for _ in range(len(map[0]))] for _ in range(nrows)]
+        elif indel[0] <= 0:
+            nrows = 1 - indel[0]
+            offrow += nrows
+            map = [[np.array([np.nan, np.nan]) for _ in range(len(map[0]))] for _ in range(nrows)] + aux_map
+        aux_map = copy.deepcopy(map)
+        if indel[1] >= (len(map[0]) - 1):
+            ncols = 2 + indel[1] - len(map[0])
+            map = [row + [np.array([np.nan, np.nan])] * ncols for row in aux_map]
+        elif indel[1] <= 0:
+            ncols = 1 - indel[1]
+            offcol += ncols
+            map = [[np.array([np.nan, np.nan])] * ncols + row for row in aux_map]
+        indel[0] += (offrow - offrow0)
+        indel[1] += (offcol - offcol0)
+        map[indel[0]][indel[1]] = newp[i]
+    return map
+
+
+# Define the main function
+def main():
+    """
+    Main function to execute the insert tiles test.
+
+    - Builds a random grid of points.
+    - Inserts batches of random tiles with both implementations (and in a growableMap).
+    - Compares the resulting maps.
+    """
+
+    np.random.seed(0)
+    mismatches = 0
+    for k in range(300):
+        rows, cols = np.random.randint(1, 6, size=2)
+        grid = [[np.random.rand(2) if np.random.rand() > 0.3 else None for _ in range(cols)] for _ in range(rows)]
+        map = grid2map(grid)
+        growable = growableMap(map)
+
+        # Batches of new tiles, inside and beyond the map boundaries
+        for batch in range(3):
+            n = np.random.randint(1, 5)
+            newp = [np.random.rand(2) for _ in range(n)]
+            indp = [[np.random.randint(-3, len(map) + 3), np.random.randint(-3, len(map[0]) + 3)] for _ in range(n)]
+
+            new = insertTiles(copy.deepcopy(map), newp, copy.deepcopy(indp))
+            growable = insertTiles(growable, newp, copy.deepcopy(indp))
+            map = insertTilesReference(map, newp, copy.deepcopy(indp))
+            mismatches += not samemap(new, map) or not samemap(growable.tolist(), map)
+
+    print(f"insertTiles: {mismatches} mismatches with the reference implementation in 900 random insertion batches")
+
+
+if __name__ == "__main__":
+    main()
@@ -52,7 +52,7 @@ def main():
     et = spice.str2et('1998 MAY 30 00:00:00.000 TDB')  # Ephemeris time
 
     # Call inst2topo to convert instrument frame grid to topographical coordinates
-    grid_topo = inst2topo(grid, lon, lat, target, sc, inst, et)
+    grid_topo, _ = inst2topo(grid, lon, lat, target, sc, inst, et)
 
     # Call topo2inst to convert topographical coordinates back to instrument frame
     grid_reconstructed = topo2inst(grid_topo, lon, lat, target, sc, inst, et)
@@ -0,0 +1,89 @@
+"""
+Test Script for multiresFill Function
+
+This script tests the coarse-to-fine grid discretization (`multiresFill`, grid2D with fill='multires') against the
+flood-fill algorithm (`floodFillAlgorithm`, grid2D with fill='floodfill') on random regions of interest: star-shaped
+polygons, polygons with cutouts and regions split in two. Both must yield the same grid.
+It visualizes the grid points of both algorithms over the last region.
+"""
+
+# Import external packages
+import time
+import numpy as np
+import matplotlib.pyplot as plt
+from shapely.geometry import Point, Polygon
+
+# Import local packages
+from mosaic_algorithms.auxiliar_functions.grid_functions.grid2D import grid2D
+
+
+def gridkey(grid):
+    # Grid points rounded to the lattice precision (the lattice coordinates of
+    # both algorithms may differ by floating point rounding)
+    return [[None if cell is None else tuple(np.round(cell, 8)) for cell in row] for row in grid]
+
+
+# Define the main function
+def main():
+    """
+    Main function to execute the multi-resolution fill test.
+
+    - Defines random target areas.
+    - Discretizes them with both algorithms (exact and raster coverage).
+    - Compares the grids.
+    - Visualizes the results.
+    """
+
+    rng = np.random.default_rng(5)
+    mismatches = 0
+    tflood = tmulti = 0.
+    for k in range(60):
+        kind = k % 3
+        if kind == 0:  # star-shaped polygon
+            n = rng.integers(5, 15)
+            ang = np.sort(rng.uniform(0, 2 * np.pi, n))
+            r = rng.uniform(2, 6, n)
+            target_area = np.column_stack((r * np.cos(ang), r * np.sin(ang)))
+        elif kind == 1:  # disk with a hole cutout and a notch
+            shape = Point(0, 0).buffer(4).difference(Point(rng.uniform(-2, 2), rng.uniform(-2, 2)).buffer(1.5))
+            shape = shape.difference(Polygon([(0, 0), (6, -1), (6, 1)]))
+            target_area = np.array(shape.exterior.coords)
+        else:  # two separate regions
+            target_area = np.vstack((np.array(Point(-3, 0).buffer(2).exterior.coords), [np.nan, np.nan],
+                                     np.array(Point(3, rng.uniform(-1, 1)).buffer(rng.uniform(0.2, 2)).exterior.coords)))
+        fpref = {'width': rng.uniform(0.3, 1.5), 'height': rng.uniform(0.3, 1.5), 'angle': 0.}
+        seed = list(rng.uniform(-3, 3, 2)) if k % 4 == 0 else [0., 0.]
+        olap = rng.choice([0, 10, 20])
+
+        t0 = time.time()
+        grid_flood, _, _ = grid2D(fpref, olap, olap, seed, target_area)
+        t1 = time.time()
+        grid_multi, _, _ = grid2D(fpref, olap, olap, seed, target_area, fill='multires')
+        t2 = time.time()
+        grid_raster, _, _ = grid2D(fpref, olap, olap, seed, target_area, 'raster', 'multires')
+        tflood += t1 - t0
+        tmulti += t2 - t1
+        if gridkey(grid_flood) != gridkey(grid_multi) or gridkey(grid_flood) != gridkey(grid_raster):
+            mismatches += 1
+            print(f"Mismatch in region {k}")
+
+    print(f"multiresFill: {mismatches} mismatches with floodFillAlgorithm in 60 regions "
+          f"(flood-fill {tflood:.2f} s, multi-resolution {tmulti:.2f} s)")
+
+    # Visualization of the last region
+    fig, ax = plt.subplots(figsize=(8, 6))
+    ax.plot(target_area[:, 0], target_area[:, 1], 'k-')
+    flood = np.reshape([cell for row in grid_flood for cell in row if cell is not None], (-1, 2))
+    multi = np.reshape([cell for row in grid_multi for cell in row if cell is not None], (-1, 2))
+    ax.scatter(flood[:, 0], flood[:, 1], s=40, facecolors='none', edgecolors='blue', label='floodFillAlgorithm')
+    ax.scatter(multi[:, 0], multi[:, 1], s=10, c='red', label='multiresFill')
+    ax.legend()
+    ax.set_title('Multi-resolution Fill Test')
+    ax.set_xlabel('X')
+    ax.set_ylabel('Y')
+    ax.set_aspect('equal')
+    plt.show()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Test Script for pointingstack Function
+
+This script tests the `pointingstack` function, the batch counterpart of `instpointing`, by pointing the instrument
+at a few aim points (at one epoch, and at one epoch per aim point) and comparing the rotation matrices, FOV bounds,
+boresights and visibility flags with the ones of `instpointing`, computed point by point.
+It visualizes the boresights of both functions in a 3D plot.
+"""
+
+# Import external modules
+import numpy as np
+import matplotlib.pyplot as plt
+from pySPICElib import kernelFetch
+
+# Import local modules
+from mosaic_algorithms.auxiliar_functions.spacecraft_operation.instpointing import instpointing, pointingstack
+
+
+def main():
+    """
+    Main function to execute the pointingstack test.
+
+    - Sets up parameters for a sample instrument, target, and spacecraft.
+    - Points the instrument at several aim points with both functions.
+    - Compares the results and visualizes the boresights.
+    """
+
+    # Load SPICE kernels
+    kf = kernelFetch(textFilesPath_='../')
+    kf.ffFile(metaK='input/galileo/inputkernels.txt', forceDownload=False)
+
+    # Instrument, target, spacecraft parameters
+    inst = 'GLL_SSI'  # Instrument identifier
+    target = 'EUROPA'  # Target body
+    sc = 'GALILEO ORBITER'  # Spacecraft identifier
+    t = 1000  # Observation time in seconds
+
+    # Aim points (in degrees), including some on the far side of the target
+    lon = np.array([45., 50., 40., 120., -135., 0.])
+    lat = np.array([-30., -25., -35., 10., 60., 89.99])
+
+    for epochs in [t, t + 60. * np.arange(len(lon))]:
+        fovbounds, boresight, rotmat, visible = pointingstack(inst, target, sc, epochs, lon, lat)
+        errors = np.zeros(3)
+        mismatches = 0
+        for k in range(len(lon)):
+            tk = epochs if np.ndim(epochs) == 0 else epochs[k]
+            fb, b, R, v = instpointing(inst, target, sc, tk, lon[k], lat[k])
+            errors = np.maximum(errors, [np.max(np.abs(rotmat[k] - R)), np.max(np.abs(fovbounds[k] - fb)),
+                                         np.max(np.abs(boresight[k] - b))])
+            mismatches += bool(visible[k]) != bool(v)
+        print(f"pointingstack ({np.size(epochs)} epoch(s)): max. error of the rotation matrices = {errors[0]:.1e}, "
+              f"FOV bounds = {errors[1]:.1e}, boresights = {errors[2]:.1e}, visibility mismatches = {mismatches}")
+
+    # Visualization of the boresights
+    fig = plt.figure()
+    ax = fig.add_subplot(111, projection='3d')
+    for k in range(len(lon)):
+        b = instpointing(inst, target, sc, t, lon[k], lat[k])[1]
+        ax.quiver(0, 0, 0, b[0], b[1], b[2], color='blue')
+    boresight = pointingstack(inst, target, sc, t, lon, lat)[1]
+    ax.quiver(0, 0, 0, boresight[:, 0], boresight[:, 1], boresight[:, 2], color='red', linestyle='--')
+    ax.set_title('Boresights: instpointing (blue) and pointingstack (red)')
+    plt.show()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Test Script for plannerCache Class and warmStart Function
+
+This script tests the reuse of the Sidewinder grid across planning epochs. A grid and tour are planned over a
+projected region of interest and stored; the region is then translated (the projection of the ROI at a nearby
+epoch) and slightly deformed. The plannerCache must reuse the grid only for matching shapes, while warmStart must
+accept the previous plan as long as its tiles still cover the new region, and reject it otherwise.
+"""
+
+# Import external packages
+import numpy as np
+
+# Import local packages
+from mosaic_algorithms.auxiliar_functions.grid_functions.boustrophedon import boustrophedon
+from mosaic_algorithms.auxiliar_functions.grid_functions.grid2D import grid2D
+from mosaic_algorithms.sidewinder.plannerCache import plannerCache, planentry
+from mosaic_algorithms.sidewinder.warmStart import warmStart
+
+
+# Define the main function
+def main():
+    """
+    Main function to execute the warm start test.
+
+    - Plans a grid and tour over a target area and stores them.
+    - Looks them up for translated, deformed and enlarged target areas.
+    - Prints whether each plan is reused.
+    """
+
+    # Projected target area (focal plane units) and reference footprint
+    target_area = np.array([[-4., -3.], [4., -3.], [5., 2.], [0., 4.], [-5., 2.], [-4., -3.]])
+    fpref = {'width': 1.0, 'height': 0.8, 'angle': 0.}
+    origin = np.mean(target_area[:-1], axis=0)
+    key = ('EUROPA', 'SC', 'INST', 20, 20)
+
+    grid, dirx, diry = grid2D(fpref, 20, 20, origin, target_area)
+    tour, _ = boustrophedon(grid, 'north', 'east')
+    tour = list(tour)
+    cache = plannerCache()
+    cache.store(key, target_area, origin, grid, tour, dirx, diry, 'north', 'east')
+    hint = planentry(target_area, origin, grid, tour, dirx, diry, 'north', 'east')
+    hint['key'] = key
+
+    cases = {
+        'translated': target_area + [0.3, -0.2],
+        'deformed': target_area * [1.03, 1.0] + [0.3, -0.2],
+        'enlarged': target_area * 1.5,
+    }
+    expected = {'translated': (True, True), 'deformed': (False, True), 'enlarged': (False, False)}
+    wrong = 0
+    for name, area in cases.items():
+        neworigin = np.mean(area[:-1], axis=0)
+        cached = cache.lookup(key, area, neworigin, fpref) is not None
+        warm = warmStart(hint, key, area, neworigin, fpref) is not None
+        wrong += (cached, warm) != expected[name]
+        print(f"{name}: cache reuse = {cached}, warm start = {warm}")
+
+    # A hint of a different planning problem is always rejected
+    wrong += warmStart(hint, ('EUROPA', 'SC', 'INST', 10, 10), target_area, origin, fpref) is not None
+    print(f"warmStart: {wrong} unexpected results ({cache})")
+
+
+if __name__ == "__main__":
+    main()